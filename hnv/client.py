@@ -14,26 +14,800 @@
 
 """This module contains all the available HNV resources."""
 
+# pylint: disable=protected-access
+
+import collections
+import functools
 import re
+import string
+import sys
+import threading
 import time
 import uuid
+import weakref
 
+from concurrent import futures
 from oslo_log import log as logging
+import requests
+import six
 
 from hnv.common import constant
 from hnv.common import exception
 from hnv.common import model
+from hnv.common import query
 from hnv.common import utils
 from hnv import config as hnv_config
 
 LOG = logging.getLogger(__name__)
 CONFIG = hnv_config.CONFIG
 
+_API_VERSION = re.compile("/networking/v[0-9]+")
+
+
+class _EndpointTemplate(object):
+
+    """An endpoint template compiled for building the URLs.
+
+    The template is parsed only once, into positional templates for the
+    URLs and for the resource references (without the API version), so
+    building them does not require keyword formatting or any regular
+    expression.
+    """
+
+    _ARGUMENTS = ("resource_id", "parent_id", "grandparent_id")
+
+    _templates = {}
+
+    __slots__ = ("_url", "_reference")
+
+    def __init__(self, template):
+        url = []
+        for literal, name, _, _ in string.Formatter().parse(template):
+            url.append(literal.replace("{", "{{").replace("}", "}}"))
+            if name is not None:
+                url.append("{%d}" % self._ARGUMENTS.index(name))
+
+        self._url = "".join(url)
+        self._reference = _API_VERSION.sub("", self._url, count=1)
+
+    @classmethod
+    def get(cls, template):
+        """Return the compiled version of the received template."""
+        endpoint = cls._templates.get(template)
+        if endpoint is None:
+            endpoint = cls._templates[template] = cls(template)
+        return endpoint
+
+    def url(self, resource_id=None, parent_id=None, grandparent_id=None):
+        """Build the URL of a resource; the missing identifiers are
+        left empty."""
+        return self._url.format(resource_id or "", parent_id or "",
+                                grandparent_id or "")
+
+    def reference(self, resource_id, parent_id, grandparent_id):
+        """Build the resource reference for the received identifiers."""
+        return self._reference.format(resource_id, parent_id,
+                                      grandparent_id)
+
+
+def _fetch_page(model_cls, headers, link):
+    """Retrieve a page of a listing, retrying on server errors.
+
+    :param model_cls:   The model of the listed resources.
+    :param headers:     Additional HTTP headers for the request.
+    :param link:        The link of the page.
+    """
+    client = model_cls._get_client()
+    retries = 0
+    while True:
+        try:
+            if headers:
+                return client.get_resource(link, headers=headers)
+            return client.get_resource(link)
+        except requests.HTTPError as exc:
+            if exc.response is None or exc.response.status_code < 500:
+                raise
+            retries += 1
+            if retries > CONFIG.HNV.retry_count:
+                raise
+            LOG.debug("Failed to retrieve %s: %s", link, exc)
+            time.sleep(CONFIG.HNV.retry_interval)
+
+
+class _PagePrefetcher(object):
+
+    """Retrieve the pages of a listing in a background thread.
+
+    :param fetch:   The function used for retrieving a page.
+    :param link:    The link of the first page.
+    :param depth:   The maximum number of pages retrieved in advance.
+
+    The pages are retrieved by following their `nextLink` until the end
+    of the listing, or until the first error, which is reported when the
+    failed page is required.
+    """
+
+    _POLL_INTERVAL = 0.1
+
+    def __init__(self, fetch, link, depth):
+        self._pages = six.moves.queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+        thread = threading.Thread(target=self._run, args=(fetch, link))
+        thread.daemon = True
+        thread.start()
+
+    def _put(self, item):
+        """Queue the received item, unless the prefetching was stopped."""
+        while not self._stopped.is_set():
+            try:
+                self._pages.put(item, timeout=self._POLL_INTERVAL)
+                return True
+            except six.moves.queue.Full:
+                continue
+        return False
+
+    def _run(self, fetch, link):
+        """Retrieve the pages of the listing."""
+        while link:
+            try:
+                page = fetch(link)
+            except Exception:   # pylint: disable=broad-except
+                self._put((None, sys.exc_info()))
+                return
+            if not self._put((page, None)):
+                return
+            link = page.get("nextLink") or None
+
+    def get(self):
+        """Return the next page of the listing."""
+        page, error = self._pages.get()
+        if error is not None:
+            six.reraise(*error)
+        return page
+
+    def stop(self):
+        """Stop retrieving the pages."""
+        self._stopped.set()
+
+
+class ResourceIterator(object):
+
+    """Iterator over all the resources from a paginated listing.
+
+    The position of the iterator is kept in the `cursor` property: the
+    link of the current page and the number of resources already consumed
+    from it. If a page cannot be retrieved the exception is raised, but
+    the position is kept, so the iteration can be resumed from the failed
+    page by calling `next` again, or later on by creating a new iterator
+    with the saved cursor.
+
+    :param model_cls:       The model of the listed resources.
+    :param parent_id:       The identifier for the specific ancestor
+                            resource within the resource type.
+    :param grandparent_id:  The identifier that is associated with
+                            network objects that are ancestors of the
+                            parent of the necessary resource.
+    :param cursor:          The position from where the iteration starts.
+    :param raw:             Whether to return the raw content of the
+                            resources instead of models.
+    :param fields:          The names of the fields which should be
+                            loaded, all of them if it is not provided.
+    :param where:           The filter for the resources, as described
+                            by `hnv.common.query.build`. It is applied on
+                            the raw content, before creating the models.
+                            When the `odata_filter` option is enabled the
+                            predicates on the fields which are not part
+                            of a list are also sent to the API.
+    :param page_size:       The maximum number of resources requested for
+                            each page, the value of the `page_size` option
+                            is used if it is not provided.
+    :param prefetch_depth:  The number of pages retrieved in a background
+                            thread while the current page is processed,
+                            the value of the `prefetch_depth` option is
+                            used if it is not provided.
+    """
+
+    def __init__(self, model_cls, parent_id=None, grandparent_id=None,
+                 cursor=None, raw=False, fields=None, where=None,
+                 page_size=None, prefetch_depth=None):
+        self._prefetcher = None
+        self._model_cls = model_cls
+        self._parent_id = parent_id
+        self._grandparent_id = grandparent_id
+        self._raw = raw
+        self._fields = fields
+        self._where = query.build(where)
+        self._page = None
+
+        if page_size is None:
+            page_size = CONFIG.HNV.page_size
+        self._headers = None
+        if page_size:
+            self._headers = {"Prefer": "odata.maxpagesize=%d" % page_size}
+
+        if prefetch_depth is None:
+            prefetch_depth = CONFIG.HNV.prefetch_depth
+        self._prefetch_depth = prefetch_depth
+
+        if cursor is None:
+            link = model_cls._get_endpoint().url(
+                parent_id=parent_id, grandparent_id=grandparent_id)
+            odata_filter = None
+            if CONFIG.HNV.odata_filter:
+                # The OData equality does not match the items of a list,
+                # those predicates are applied only on the client side.
+                odata_filter = query.select(
+                    self._where,
+                    functools.partial(_is_scalar_path, model_cls))
+            if odata_filter is not None:
+                link += "?" + six.moves.urllib.parse.urlencode(
+                    {"$filter": odata_filter.to_odata()})
+            cursor = (link, 0)
+        self._link, self._offset = cursor
+
+    @property
+    def cursor(self):
+        """The position of the iterator in the listing."""
+        return (self._link, self._offset)
+
+    def __iter__(self):
+        return self
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """Stop retrieving the following pages in the background."""
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+            self._prefetcher = None
+
+    def _get_page(self):
+        """Retrieve the current page.
+
+        When the prefetching is enabled the pages are retrieved by a
+        background thread; after a failure the thread is started again
+        from the failed page.
+        """
+        fetch = functools.partial(_fetch_page, self._model_cls,
+                                  self._headers)
+        if not self._prefetch_depth:
+            return fetch(self._link)
+
+        if self._prefetcher is None:
+            # The thread should not keep the iterator alive, so that the
+            # prefetching stops when the iterator is dropped.
+            self._prefetcher = _PagePrefetcher(fetch, self._link,
+                                               self._prefetch_depth)
+        try:
+            return self._prefetcher.get()
+        except Exception:
+            self._prefetcher = None
+            raise
+
+    def __next__(self):
+        while self._link:
+            if self._page is None:
+                self._page = self._get_page()
+
+            resources = self._page.get("value", [])
+            if self._offset < len(resources):
+                raw_data = resources[self._offset]
+                self._offset += 1
+                if self._where is None or self._where(raw_data):
+                    break
+                continue
+
+            self._link = self._page.get("nextLink") or None
+            self._offset = 0
+            self._page = None
+        else:
+            raise StopIteration()
+
+        if self._raw:
+            return raw_data
+
+        return self._model_cls._from_response(
+            raw_data, self._fields, parent_id=self._parent_id,
+            grandparent_id=self._grandparent_id)
+
+    next = __next__     # Python 2 compatibility
+
+
+class _ReferenceField(model.ModelField):
+
+    """Field for a resource reference which can also be sent as a list.
+
+    If a list is received, the last reference from it is used.
+    """
+
+    def load(self, raw_data, inherited=(), lazy=False):
+        """Create the model for the received raw data."""
+        if isinstance(raw_data, list):
+            raw_data = raw_data[-1] if raw_data else None
+        return super(_ReferenceField, self).load(raw_data, inherited, lazy)
+
+
+class ResourceMetadata(model.Model):
+
+    """Model for Resource Metadata.
+
+    Structured data that the client provides to the server. This is an
+    optional element but it is suggested that all clients fill in the
+    data that is applicable to them.
+    """
+
+    client = model.Field(name="client", key="client",
+                         is_property=False, is_required=False)
+    """Indicates the client that creates or updates the resource.
+    Although this element is optional, it is strongly recommended that it
+    contain an appropriate value."""
+
+    tenant_id = model.Field(name="tenant_id", key="tenantId",
+                            is_property=False, is_required=False)
+    """The identifier of the tenant in the client environment.
+    Provides linkage between the resource in the Network Controller
+    and the tenant in the client network."""
+
+    group_id = model.Field(name="group_id", key="groupId",
+                           is_property=False, is_required=False)
+    """The identifier of the group that the tenant belongs to within
+    the client environment. This is usually used in environments that
+    contain multiple tenants that are aggregated into groups that the
+    client manages. This provides linkage between the resource in the
+    Network Controller and the group that the tenant belongs to in the
+    client network."""
+
+    resource_name = model.Field(name="resource_name", key="resourceName",
+                                is_property=False, is_required=False)
+    """Indicates the globally unique name of the resource. If it
+    is not assigned a value then it will be blank."""
+
+    name = model.Field(name="name", key="name",
+                       is_property=False, is_required=False)
+    """Indicates the globally unique name of the resource. If it
+    is not assigned a value then it will be blank."""
+
+    original_href = model.Field(name="original_href", key="originalHref",
+                                is_property=False, is_required=False)
+    """The original URI of the resource if the client uses a URI based
+    system to organize resources."""
+
+
+class ConfigurationState(model.Model):
+
+    """Model for configuration state."""
+
+    uuid = model.Field(name="uuid", key="id",
+                       is_property=False, is_required=False)
+    status = model.Field(name="status", key="status",
+                         is_property=False, is_required=False)
+    last_update = model.Field(name="last_update", key="lastUpdatedTime",
+                              is_property=False, is_required=False)
+    detailed_info = model.Field(name="detailed_info", key="detailedInfo",
+                                is_property=False, is_required=False)
+    interface_errors = model.Field(name="interface_errors",
+                                   key="virtualNetworkInterfaceErrors",
+                                   is_property=False, is_required=False)
+    host_errors = model.Field(name="host_erros", key="hostErrors",
+                              is_property=False, is_required=False)
+
+
+class IdentityMap(object):
+
+    """Keep a single model for every resource retrieved in a session.
+
+    While the identity map is active (used as a context manager) the
+    resources retrieved from the API with the same reference and etag
+    are represented by the same model, so the resources referenced from
+    many places are created and refreshed only once. The models are
+    weakly referenced, the identity map does not keep them alive.
+
+    The child collections embedded in the content of their parents are
+    served from the raw content of the parents kept by the identity map,
+    without retrieving the parents again. The content is revalidated
+    when the parent is refreshed and forgotten when the current client
+    changes one of the children.
+
+    The identity map is active only for the thread which uses it, the
+    functions called from other threads can be bound to it with `bind`.
+    """
+
+    _local = threading.local()
+
+    def __init__(self):
+        self._models = weakref.WeakValueDictionary()
+        self._contents = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _get_stack(cls):
+        """The identity maps used by the current thread."""
+        stack = getattr(cls._local, "stack", None)
+        if stack is None:
+            stack = cls._local.stack = []
+        return stack
+
+    def __enter__(self):
+        self._get_stack().append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._get_stack().pop()
+
+    def __len__(self):
+        return len(self._models)
+
+    @classmethod
+    def get_active(cls):
+        """Return the identity map used by the current session, if any."""
+        stack = getattr(cls._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def bind(self, function):
+        """Make the received function use the current identity map,
+        regardless of the thread which calls it."""
+        @functools.wraps(function)
+        def _function(*args, **kwargs):
+            with self:
+                return function(*args, **kwargs)
+        return _function
+
+    def get(self, model_cls, raw_data, fields=None):
+        """Return the model already created for the received content.
+
+        :param model_cls:   The model of the resource.
+        :param raw_data:    The raw content of the resource.
+        :param fields:      The names of the fields which are required,
+                            all of them if it is not provided.
+        """
+        if fields is not None:
+            # Fails for the unknown fields, as the models are created
+            # with the same parser when they are not cached.
+            model_cls._meta.get_parser(fields)
+
+        resource_ref = raw_data.get("resourceRef")
+        if not isinstance(resource_ref, six.string_types):
+            return None
+
+        with self._lock:
+            resource = self._models.get(resource_ref.lower())
+        if not isinstance(resource, model_cls):
+            return None
+        if resource.etag != raw_data.get("etag"):
+            return None
+        if not all(resource.is_loaded(name) for name in fields or [None]):
+            return None
+        return resource
+
+    def get_content(self, resource_ref):
+        """Return the raw content kept for the received resource
+        reference, regardless of its etag."""
+        with self._lock:
+            return self._contents.get(resource_ref.lower())
+
+    def add_content(self, resource_ref, raw_data):
+        """Keep the raw content of the received resource while the
+        identity map is used."""
+        with self._lock:
+            self._contents[resource_ref.lower()] = raw_data
+
+    def discard_ancestors(self, resource_ref):
+        """Forget the models and the contents of the ancestors of the
+        received resource, whose content might embed it."""
+        segments = resource_ref.lower().split("/")
+        with self._lock:
+            for index in range(2, len(segments)):
+                self._models.pop("/".join(segments[:index]), None)
+                self._contents.pop("/".join(segments[:index]), None)
+
+    def add(self, resource):
+        """Use the received model for its resource from now on."""
+        if resource.resource_ref:
+            with self._lock:
+                self._models[resource.resource_ref.lower()] = resource
+
+
+def _is_scalar_path(model_cls, path):
+    """Check if the received path of the raw content leads to a single
+    value, without crossing any list, using the fields of the model."""
+    keys = path.split(".")
+    while keys:
+        if model_cls is None:
+            # The content of the field is not described by a model.
+            return False
+
+        key = keys.pop(0)
+        is_property = key == "properties"
+        if is_property:
+            if not keys:
+                return False
+            key = keys.pop(0)
+
+        for field in model_cls._meta.fields.values():
+            if field.key == key and field.is_property == is_property:
+                break
+        else:
+            return False
+
+        if isinstance(field, model.ListField):
+            return False
+        model_cls = getattr(field, "model_class", None)
+    return model_cls is None
+
+
+def _in_session(function):
+    """Bind the received function to the identity map used by the
+    current thread, if any, in order to call it from a worker thread."""
+    identity_map = IdentityMap.get_active()
+    if identity_map is None:
+        return function
+    return identity_map.bind(function)
+
+
+class _NegativeCache(object):
+
+    """Remember for a short time the endpoints of the missing resources.
+
+    The endpoints expire after the received time to live, or when the
+    resources are created by the current client.
+    """
+
+    def __init__(self):
+        self._expiration = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, endpoint):
+        endpoint = endpoint.lower()
+        with self._lock:
+            expiration = self._expiration.get(endpoint)
+            if expiration is None:
+                return False
+            if expiration > time.time():
+                return True
+            del self._expiration[endpoint]
+            return False
+
+    def add(self, endpoint, ttl):
+        """Remember that the resource is missing for `ttl` seconds."""
+        with self._lock:
+            self._expiration[endpoint.lower()] = time.time() + ttl
+
+    def discard(self, endpoint):
+        """Forget the received endpoint and the ones of its children."""
+        endpoint = endpoint.lower()
+        prefix = endpoint.rstrip("/") + "/"
+        with self._lock:
+            for key in list(self._expiration):
+                if key == endpoint or key.startswith(prefix):
+                    del self._expiration[key]
+
+
+_MISSING_RESOURCES = _NegativeCache()
+
+
+class _ResourceRouter(object):
+
+    """Map the resource references to the models of the resources.
+
+    The endpoint templates are kept in a trie of path segments, so a
+    resource reference is resolved in a single pass over its segments,
+    regardless of the number of available models.
+    """
+
+    class _Node(object):
+
+        """A path segment from the endpoint templates."""
+
+        __slots__ = ("literals", "placeholder", "route")
+
+        def __init__(self):
+            self.literals = {}
+            self.placeholder = None
+            self.route = None
+
+    def __init__(self):
+        self._root = self._Node()
+
+    def add(self, model_cls, endpoint):
+        """Add the endpoint template of the received model.
+
+        :param model_cls:   The model of the resources.
+        :param endpoint:    The endpoint template of the model.
+        """
+        node, names = self._root, []
+        for segment in _API_VERSION.sub("", endpoint).split("/"):
+            if segment.startswith("{") and segment.endswith("}"):
+                names.append(segment[1:-1])
+                if node.placeholder is None:
+                    node.placeholder = self._Node()
+                node = node.placeholder
+            else:
+                node = node.literals.setdefault(segment.lower(),
+                                                self._Node())
+
+        if node.route is None:
+            node.route = (model_cls, tuple(names))
+
+    def _match(self, node, segments, index, values):
+        """Find the route for the segments starting from `index`."""
+        if index == len(segments):
+            return node.route
+
+        segment = segments[index]
+        child = node.literals.get(segment.lower())
+        if child is not None:
+            route = self._match(child, segments, index + 1, values)
+            if route is not None:
+                return route
+
+        if node.placeholder is not None and segment:
+            values.append(segment)
+            route = self._match(node.placeholder, segments, index + 1,
+                                values)
+            if route is not None:
+                return route
+            values.pop()
+
+        return None
+
+    def resolve(self, resource_ref):
+        """Resolve the received resource reference.
+
+        :param resource_ref:    A relative URI to a resource.
+
+        Returns a `(model_cls, resource_id, parent_id, grandparent_id)`
+        tuple, or None if there is no model for the resource reference.
+        """
+        values = []
+        route = self._match(self._root, resource_ref.split("/"), 0, values)
+        if route is None:
+            return None
+
+        model_cls, names = route
+        references = dict(zip(names, values))
+        return (model_cls, references.get("resource_id"),
+                references.get("parent_id"),
+                references.get("grandparent_id"))
+
+
+_ROUTER = _ResourceRouter()
+
+
+ModelInfo = collections.namedtuple(
+    "ModelInfo", ["model_cls", "endpoint", "parent_endpoint",
+                  "child_fields"])
+"""The description of a model registered in the model registry.
+
+The `parent_endpoint` is the endpoint template of the parent resource
+and `child_fields` are the names of the fields which embed the child
+resources of the model."""
+
+
+class _ModelRegistry(object):
+
+    """The models of the HNV resources, indexed by class, class name and
+    endpoint template.
+
+    The models are registered when their classes are created, so the
+    registry can be used without scanning the module.
+    """
+
+    def __init__(self):
+        self._models = collections.OrderedDict()
+        self._names = {}
+        self._endpoints = {}
+        self._children = {}
+
+    def __iter__(self):
+        return iter(list(self._models.values()))
+
+    def __len__(self):
+        return len(self._models)
+
+    @staticmethod
+    def _get_parent_endpoint(endpoint):
+        """Get the endpoint template of the parent resource."""
+        index = endpoint.find("{parent_id}")
+        if index == -1:
+            return None
+        endpoint = endpoint[:index] + "{resource_id}"
+        return endpoint.replace("{grandparent_id}", "{parent_id}")
+
+    def _get_child_fields(self, model_cls, endpoint):
+        """Get the fields of the model which embed the registered child
+        collections."""
+        child_fields = []
+        for field in model_cls._meta.fields.values():
+            child = self._models.get(getattr(field, "model_class", None))
+            if child is not None and child.parent_endpoint == endpoint:
+                child_fields.append(field.name)
+        return tuple(sorted(child_fields))
+
+    def _update(self, info):
+        """Refresh the child fields of an already registered model."""
+        updated = info._replace(child_fields=self._get_child_fields(
+            info.model_cls, info.endpoint))
+        if updated == info:
+            return
+
+        self._models[info.model_cls] = updated
+        for index, key in ((self._names, info.model_cls.__name__),
+                           (self._endpoints, info.endpoint)):
+            if index.get(key) is info:
+                index[key] = updated
+        siblings = self._children.get(info.parent_endpoint, [])
+        for position, sibling in enumerate(siblings):
+            if sibling is info:
+                siblings[position] = updated
+
+    def add(self, model_cls, endpoint):
+        """Register the received model.
+
+        :param model_cls:   The model of the resources.
+        :param endpoint:    The endpoint template of the model.
+        """
+        info = ModelInfo(model_cls, endpoint,
+                         self._get_parent_endpoint(endpoint),
+                         self._get_child_fields(model_cls, endpoint))
+        self._models[model_cls] = info
+        self._names.setdefault(model_cls.__name__, info)
+        self._endpoints.setdefault(endpoint, info)
+        if info.parent_endpoint is None:
+            return
+
+        self._children.setdefault(info.parent_endpoint, []).append(info)
+        # The parent can be registered before the model of its children.
+        for parent in list(self._models.values()):
+            if parent.endpoint == info.parent_endpoint:
+                self._update(parent)
+
+    def get(self, model_cls):
+        """Return the description of the received model, if any."""
+        return self._models.get(model_cls)
+
+    def get_by_name(self, name):
+        """Return the description of the model with the received name."""
+        return self._names.get(name)
+
+    def get_by_endpoint(self, endpoint):
+        """Return the description of the model which uses the received
+        endpoint template."""
+        return self._endpoints.get(endpoint)
+
+    def get_parent(self, model_cls):
+        """Return the description of the model of the parent resources."""
+        info = self._models.get(model_cls)
+        if info is None or info.parent_endpoint is None:
+            return None
+        return self._endpoints.get(info.parent_endpoint)
+
+    def get_children(self, model_cls):
+        """Return the descriptions of the models of the child resources."""
+        info = self._models.get(model_cls)
+        if info is None:
+            return []
+        return list(self._children.get(info.endpoint, ()))
+
+
+_MODELS = _ModelRegistry()
+
 
 class _BaseHNVModel(model.Model):
 
     _endpoint = CONFIG.HNV.url
 
+    _inherited_fields = (("parent_id", "resource_id"),
+                         ("grandparent_id", "parent_id"))
+    """The resources contained in another resource are its children."""
+
+    _key_field = "resource_id"
+
+    _identity_fields = ("resource_ref", "resource_id", "parent_id",
+                        "grandparent_id", "etag")
+    """The fields which are always loaded, even if they are not
+    required, in order to be able to refresh or update the resource."""
+
     resource_ref = model.Field(name="resource_ref", key="resourceRef",
                                is_property=False)
     """A relative URI to an associated resource."""
@@ -62,25 +836,25 @@ class _BaseHNVModel(model.Model):
 
     operation_id = model.Field(name="operation_id", key="operation-id",
                                is_property=False, is_required=False,
-                               is_read_only=True)
+                               is_read_only=True, is_volatile=True)
     """The value of the x-ms-request-id header returned by the resource
     provider."""
 
     instance_id = model.Field(name="instance_id", key="instanceId",
-                              is_property=False)
+                              is_property=False, is_volatile=True)
     """The globally unique Id generated and used internally by the Network
     Controller. The mapping resource that enables the client to map between
     the instanceId and the resourceId."""
 
-    resource_metadata = model.Field(name="resource_metadata",
-                                    key="resourceMetadata",
-                                    is_property=False, is_required=False)
+    resource_metadata = model.ModelField(
+        name="resource_metadata", key="resourceMetadata",
+        model_class=ResourceMetadata, is_property=False, is_required=False)
     """Structured data that the client provides to the server. This is an
     optional element but it is suggested that all clients fill in the data
     that is applicable to them."""
 
     etag = model.Field(name="etag", key="etag", is_property=False,
-                       is_read_only=True)
+                       is_read_only=True, is_volatile=True)
     """An opaque string representing the state of the resource at the
     time the response was generated. This header is returned for
     requests that target a single entity. The Network Controller will
@@ -92,16 +866,36 @@ class _BaseHNVModel(model.Model):
 
     provisioning_state = model.Field(name="provisioning_state",
                                      key="provisioningState",
-                                     is_read_only=True, is_required=False)
+                                     is_read_only=True, is_required=False,
+                                     is_volatile=True)
     """Indicates the various states of the resource. Valid values are
     Deleting, Failed, Succeeded, and Updating."""
 
-    configuration_state = model.Field(name="configuration_state",
-                                      key="configurationState",
-                                      is_read_only=True, is_required=False)
+    configuration_state = model.ModelField(
+        name="configuration_state", key="configurationState",
+        model_class=ConfigurationState, is_read_only=True, is_required=False)
     """"Configuration state indicates any failures in processing state
     corresponding to the resource it is contained in."""
 
+    @classmethod
+    def _prepare_class(cls):
+        """Register the model and its endpoint, used for resolving the
+        resource references."""
+        endpoint = cls.__dict__.get("_endpoint")
+        if isinstance(endpoint, six.string_types) and endpoint[:1] == "/":
+            _MODELS.add(cls, endpoint)
+            _ROUTER.add(cls, endpoint)
+
+    @classmethod
+    def _lazy_loading(cls):
+        """Whether to create the nested models only when they are used."""
+        return CONFIG.HNV.lazy_loading
+
+    @classmethod
+    def _get_endpoint(cls):
+        """Return the compiled endpoint template of the model."""
+        return _EndpointTemplate.get(cls._endpoint)
+
     def _reset_model(self, response):
         """Update the fields value with the received information."""
 
@@ -109,12 +903,15 @@ class _BaseHNVModel(model.Model):
 
         # Reset the model to the initial state
         self._provision_done = False    # Set back the provision flag
-        self._changes.clear()           # Clear the changes
+        self._changes = None            # Clear the changes
 
         # Process the raw data from the update response
         fields = self.process_raw_data(response)
         # Update the current model representation
         self._set_fields(fields)
+        self._finalize()
+        # The received content represents the loaded state of the model
+        self._apply_changes()
 
         # Lock the current model
         self._provision_done = True
@@ -145,38 +942,153 @@ class _BaseHNVModel(model.Model):
                                 ca_bundle=CONFIG.HNV.https_ca_bundle)
 
     @classmethod
-    def _get_all(cls, parent_id=None, grandparent_id=None):
-        """Retrives all the required resources."""
-        client = cls._get_client()
-        endpoint = cls._endpoint.format(resource_id="",
-                                        parent_id=parent_id or "",
-                                        grandparent_id=grandparent_id or "")
-        resources = []
-        while True:
-            response = client.get_resource(endpoint)
-            for raw_data in response.get("value", []):
-                raw_data["parentResourceID"] = parent_id
-                raw_data["grandParentResourceID"] = grandparent_id
-                resources.append(cls.from_raw_data(raw_data))
-            endpoint = response.get("nextLink")
-            if not endpoint:
+    def _get_all_raw(cls, parent_id=None, grandparent_id=None):
+        """Retrives the raw content of all the required resources."""
+        return ResourceIterator(cls, parent_id, grandparent_id, raw=True)
+
+    @classmethod
+    def _from_response(cls, raw_data, fields=None, **values):
+        """Create a new model using the raw content of the resource.
+
+        The raw content is not changed, so the same response can be
+        shared by multiple models.
+
+        :param fields:  The names of the fields which should be loaded,
+                        all of them if it is not provided.
+        :param values:  Values for some of the fields, which take
+                        precedence over the ones from the raw content.
+        """
+        identity_map = IdentityMap.get_active()
+        if identity_map is not None:
+            child_fields = getattr(_MODELS.get(cls), "child_fields", None)
+            resource_ref = raw_data.get("resourceRef")
+            if child_fields and isinstance(resource_ref, six.string_types):
+                # Serve the embedded child collections from this content.
+                identity_map.add_content(resource_ref, raw_data)
+
+            resource = identity_map.get(cls, raw_data, fields)
+            if resource is not None:
+                return resource
+
+        if fields is None:
+            resource = cls.from_raw_data(raw_data, **values)
+        else:
+            field_names = set(fields).union(cls._identity_fields)
+            resource = cls.from_partial_data(raw_data, field_names, **values)
+
+        if identity_map is not None:
+            identity_map.add(resource)
+        return resource
+
+    @classmethod
+    def _get_embedded(cls, parent_id, grandparent_id):
+        """Get the raw content of the resources embedded in the content
+        of their parent.
+
+        While an identity map is active, the content of the parent is
+        kept by the identity map and it is retrieved only if it was not
+        already received, so the same parent content is used for all its
+        child collections. Returns None if the resources are not embedded
+        in their parent.
+        """
+        identity_map = IdentityMap.get_active()
+        parent_info = _MODELS.get_parent(cls)
+        if identity_map is None or parent_info is None or not parent_id:
+            return None
+
+        parent_cls = parent_info.model_cls
+        for field_name in parent_info.child_fields:
+            field = parent_cls._meta.fields[field_name]
+            if field.model_class is cls:
                 break
-        return resources
+        else:
+            return None
+
+        endpoint = parent_cls._get_endpoint()
+        resource_ref = endpoint.reference(parent_id, grandparent_id, None)
+        raw_data = identity_map.get_content(resource_ref)
+        if raw_data is None:
+            client = parent_cls._get_client()
+            raw_data = client.get_resource(
+                endpoint.url(parent_id, grandparent_id))
+            identity_map.add_content(resource_ref, raw_data)
+
+        if field.is_property:
+            raw_data = raw_data.get("properties") or {}
+        return raw_data.get(field.key) or []
 
     @classmethod
-    def _get(cls, resource_id, parent_id, grandparent_id):
+    def _get_all(cls, parent_id=None, grandparent_id=None, fields=None,
+                 where=None):
+        """Retrives all the required resources."""
+        resources = cls._get_embedded(parent_id, grandparent_id)
+        if resources is None:
+            return list(cls.iter_all(parent_id, grandparent_id,
+                                     fields=fields, where=where))
+
+        where = query.build(where)
+        return [cls._from_response(raw_data, fields, parent_id=parent_id,
+                                   grandparent_id=grandparent_id)
+                for raw_data in resources
+                if where is None or where(raw_data)]
+
+    @classmethod
+    def iter_all(cls, parent_id=None, grandparent_id=None, cursor=None,
+                 fields=None, where=None, page_size=None,
+                 prefetch_depth=None):
+        """Iterate over all the required resources.
+
+        :param parent_id:        The identifier for the specific ancestor
+                                 resource within the resource type.
+        :param grandparent_id:   The identifier that is associated with
+                                 network objects that are ancestors of the
+                                 parent of the necessary resource.
+        :param cursor:           The `cursor` of a previous iterator, used
+                                 in order to resume an interrupted listing.
+        :param fields:           The names of the fields which should be
+                                 loaded, all of them if it is not provided.
+        :param where:            The filter for the resources, as described
+                                 by `hnv.common.query.build`.
+        :param page_size:        The maximum number of resources requested
+                                 for each page.
+        :param prefetch_depth:   The number of pages retrieved in advance,
+                                 while the current page is processed.
+        """
+        return ResourceIterator(cls, parent_id, grandparent_id,
+                                cursor=cursor, fields=fields, where=where,
+                                page_size=page_size,
+                                prefetch_depth=prefetch_depth)
+
+    @classmethod
+    def _get(cls, resource_id, parent_id, grandparent_id, fields=None,
+             where=None):
         """"Retrieves the required resource."""
+        endpoint = cls._get_endpoint().url(resource_id, parent_id,
+                                           grandparent_id)
+        ttl = CONFIG.HNV.negative_cache_ttl
+        if ttl and endpoint in _MISSING_RESOURCES:
+            raise exception.NotFound("Resource %(resource)r was not found.",
+                                     resource=endpoint)
+
         client = cls._get_client()
-        endpoint = cls._endpoint.format(resource_id=resource_id or "",
-                                        parent_id=parent_id or "",
-                                        grandparent_id=grandparent_id or "")
-        raw_data = client.get_resource(endpoint)
-        raw_data["parentResourceID"] = parent_id
-        raw_data["grandParentResourceID"] = grandparent_id
-        return cls.from_raw_data(raw_data)
+        try:
+            raw_data = client.get_resource(endpoint)
+        except exception.NotFound:
+            if ttl:
+                _MISSING_RESOURCES.add(endpoint, ttl)
+            raise
+
+        where = query.build(where)
+        if where is not None and not where(raw_data):
+            raise exception.NotFound(
+                "Resource %(resource)r does not match the filter.",
+                resource=endpoint)
+        return cls._from_response(raw_data, fields, parent_id=parent_id,
+                                  grandparent_id=grandparent_id)
 
     @classmethod
-    def get(cls, resource_id=None, parent_id=None, grandparent_id=None):
+    def get(cls, resource_id=None, parent_id=None, grandparent_id=None,
+            fields=None, where=None):
         """Retrieves the required resources.
 
         :param resource_id:      The identifier for the specific resource
@@ -186,12 +1098,23 @@ class _BaseHNVModel(model.Model):
         :param grandparent_id:   The identifier that is associated with
                                  network objects that are ancestors of the
                                  parent of the necessary resource.
+        :param fields:           The names of the fields which should be
+                                 loaded, all of them if it is not provided.
+                                 Reading one of the other fields raises
+                                 `NotLoaded` until the model is refreshed.
+        :param where:            The filter for the resources, as
+                                 described by `hnv.common.query.build`.
+                                 It is applied on the raw content, before
+                                 creating the models. When a single
+                                 resource is required, `NotFound` is
+                                 raised if it does not match the filter.
         """
 
         if not resource_id:
-            return cls._get_all(parent_id, grandparent_id)
+            return cls._get_all(parent_id, grandparent_id, fields, where)
         else:
-            return cls._get(resource_id, parent_id, grandparent_id)
+            return cls._get(resource_id, parent_id, grandparent_id, fields,
+                            where)
 
     @classmethod
     def remove(cls, resource_id, parent_id=None, grandparent_id=None,
@@ -220,10 +1143,13 @@ class _BaseHNVModel(model.Model):
         in that case).
         """
         client = cls._get_client()
-        endpoint = cls._endpoint.format(resource_id=resource_id or "",
-                                        parent_id=parent_id or "",
-                                        grandparent_id=grandparent_id or "")
+        endpoint = cls._get_endpoint().url(resource_id, parent_id,
+                                           grandparent_id)
         client.remove_resource(endpoint)
+        identity_map = IdentityMap.get_active()
+        if identity_map is not None:
+            identity_map.discard_ancestors(cls._get_endpoint().reference(
+                resource_id, parent_id, grandparent_id))
 
         elapsed_time = 0
         while wait:
@@ -243,21 +1169,49 @@ class _BaseHNVModel(model.Model):
             time.sleep(CONFIG.HNV.retry_interval)
 
     def refresh(self):
-        """Get the latest representation of the current model."""
+        """Get the latest representation of the current model.
+
+        While an identity map is active, the content kept for the
+        resource is revalidated against its etag and used again if the
+        resource was not changed in the meantime.
+        """
         client = self._get_client()
-        endpoint = self._endpoint.format(
-            resource_id=self.resource_id or "",
-            parent_id=self.parent_id or "",
-            grandparent_id=self.grandparent_id or "")
-        response = client.get_resource(endpoint)
-        self._reset_model(response)
-
-    def commit(self, if_match=None, wait=True, timeout=None):
+        endpoint = self._get_endpoint()
+        url = endpoint.url(self.resource_id, self.parent_id,
+                           self.grandparent_id)
+        identity_map = IdentityMap.get_active()
+        if identity_map is None:
+            self._reset_model(client.get_resource(url))
+            return
+
+        resource_ref = endpoint.reference(
+            self.resource_id, self.parent_id, self.grandparent_id)
+        raw_data = identity_map.get_content(resource_ref)
+        if raw_data is not None and raw_data.get("etag"):
+            response = client.get_resource(
+                url, headers={"If-None-Match": raw_data["etag"]})
+        else:
+            response = client.get_resource(url)
+        if response is not None:
+            raw_data = response
+            identity_map.add_content(resource_ref, raw_data)
+        self._reset_model(raw_data)
+
+    def commit(self, if_match=None, wait=True, timeout=None, patch=None):
         """Apply all the changes on the current model.
 
-        :param wait:    Whether to wait until the operation is completed
-        :param timeout: The maximum amount of time required for this
-                        operation to be completed.
+        :param if_match:    Whether to apply the changes only if the
+                            resource was not updated in the meantime.
+                            Otherwise the changes are merged with the
+                            latest version of the resource and sent again;
+                            the `Conflict` exception is raised if the same
+                            field was changed on both sides.
+        :param wait:        Whether to wait until the operation is completed
+        :param timeout:     The maximum amount of time required for this
+                            operation to be completed.
+        :param patch:       Whether to send only the changed fields as a
+                            JSON merge patch. If it is not provided the
+                            value of the `merge_patch` option is used.
 
         If optional :param wait: is True and timeout is None (the default),
         block if necessary until the resource is available. If timeout is a
@@ -268,21 +1222,29 @@ class _BaseHNVModel(model.Model):
         available, else raise the `NotFound` exception (timeout is ignored
         in that case).
         """
-        if not self._changes:
+        if not self._get_changes():
             LOG.debug("No changes available for %s: %s",
                       self.__class__.__name__, self.resource_id)
             return
 
         LOG.debug("Apply all the changes on the current %s: %s",
                   self.__class__.__name__, self.resource_id)
-        client = self._get_client()
-        endpoint = self._endpoint.format(
-            resource_id=self.resource_id or "",
-            parent_id=self.parent_id or "",
-            grandparent_id=self.grandparent_id or "")
-        request_body = self.dump(include_read_only=False)
-        response = client.update_resource(endpoint, data=request_body,
-                                          if_match=if_match)
+        if patch is None:
+            patch = CONFIG.HNV.merge_patch
+
+        retries = 0
+        while True:
+            try:
+                response = self._send_changes(if_match, patch)
+                break
+            except exception.PreconditionFailed:
+                retries += 1
+                if retries > CONFIG.HNV.retry_count:
+                    raise
+                LOG.debug("The %s %s was modified in the meantime, the "
+                          "changes will be applied on its latest version.",
+                          self.__class__.__name__, self.resource_id)
+                self._rebase()
 
         elapsed_time = 0
         while wait:
@@ -302,123 +1264,90 @@ class _BaseHNVModel(model.Model):
         # label = client.Model().commit()
         return self
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        raw_metadata = raw_data.get("resourceMetadata", None)
-        if raw_metadata is not None:
-            metadata = ResourceMetadata.from_raw_data(raw_metadata)
-            raw_data["resourceMetadata"] = metadata
-
-        raw_state = properties.get("configurationState", None)
-        if raw_state is not None:
-            configuration = ConfigurationState.from_raw_data(raw_state)
-            properties["configurationState"] = configuration
-
-        return super(_BaseHNVModel, cls).process_raw_data(raw_data)
+    def _send_changes(self, if_match, patch):
+        """Send the changes of the current model to the API."""
+        client = self._get_client()
+        endpoint = self._get_endpoint().url(
+            self.resource_id, self.parent_id, self.grandparent_id)
+        etag = self.etag if if_match else None
+
+        if patch and self.etag:
+            # The resource is already available, so only the changes
+            # are sent to the API.
+            request_body = self.dump(include_read_only=False,
+                                     changes_only=True)
+            try:
+                response = client.patch_resource(endpoint, data=request_body,
+                                                 if_match=etag)
+            except exception.NotSupported:
+                LOG.debug("Merge patch is not supported, the whole "
+                          "resource will be updated.")
+            else:
+                self._forget_outdated(endpoint)
+                return response
+
+        if not self.is_loaded():
+            # The fields which were not loaded would be removed by the
+            # update, so the changes are applied on the whole resource.
+            self._rebase()
+            etag = self.etag if if_match else None
 
-    def _set_fields(self, fields):
-        """Set or update the fields value."""
-        super(_BaseHNVModel, self)._set_fields(fields)
+        request_body = self.dump(include_read_only=False)
+        response = client.update_resource(endpoint, data=request_body,
+                                          if_match=etag)
+        self._forget_outdated(endpoint)
+        return response
+
+    def _forget_outdated(self, endpoint):
+        """Forget the cached content outdated by the changes sent."""
+        # The resource and its children might have been created.
+        _MISSING_RESOURCES.discard(endpoint)
+        # The content of the ancestors embeds the resource.
+        identity_map = IdentityMap.get_active()
+        if identity_map is not None:
+            identity_map.discard_ancestors(self.resource_ref)
+
+    def _rebase(self):
+        """Apply the current changes on the latest version of the resource.
+
+        The changes are merged with the ones made in the meantime on the
+        server side and the merge fails only if the same field was changed
+        on both sides.
+        """
+        changes = self._get_changes()
+        base = self._get_base(changes)
+        self.refresh()
+        self._merge_changes(changes, base)
+
+    def _finalize(self):
+        """Complete the model after the value of its fields were set."""
+        super(_BaseHNVModel, self)._finalize()
         if not self.resource_ref:
-            endpoint = self._endpoint.format(
-                resource_id=self.resource_id, parent_id=self.parent_id,
-                grandparent_id=self.grandparent_id)
-            self.resource_ref = re.sub("(/networking/v[0-9]+)", "", endpoint)
-
-
-class Resource(model.Model):
-
-    """Model for the resource references."""
-
-    _regexp = {}
-
-    resource_ref = model.Field(name="resource_ref", key="resourceRef",
-                               is_property=False, is_required=True)
-    """A relative URI to an associated resource."""
-
-    def __init__(self, **fields):
-        super(Resource, self).__init__(**fields)
-        if not self._regexp:
-            self._load_models()
-
-    def _load_models(self):
-        models = globals().copy()
-        for _, model_cls in models.iteritems():
-            endpoint = getattr(model_cls, "_endpoint", None)
-            if endpoint is not None:
-                regexp = endpoint.format(
-                    resource_id="(?P<resource_id>[^/]+)",
-                    parent_id="(?P<parent_id>[^/]+)",
-                    grandparent_id="(?P<grandparent_id>[^/]+)")
-                regexp = re.sub("(/networking/v[0-9]+)", "", regexp)
-                # Note(alexcoman): In order to avoid any false positives
-                # we will force the regexp to match the entire resource
-                # reference.
-                regexp = "^{regexp}$".format(regexp=regexp)
-                self._regexp[model_cls] = re.compile(regexp,
-                                                     flags=re.IGNORECASE)
-
-    def get_resource(self):
-        """Return the associated resource."""
-        references = {"resource_id": None, "parent_id": None,
-                      "grandparent_id": None}
-        for model_cls, regexp in self._regexp.iteritems():
-            match = regexp.search(self.resource_ref)
-            if match is not None:
-                references.update(match.groupdict())
-                return model_cls.get(**references)
-
-        raise exception.NotFound("No model available for %(resource_ref)r",
-                                 resource_ref=self.resource_ref)
+            self.resource_ref = self._get_endpoint().reference(
+                self.resource_id, self.parent_id, self.grandparent_id)
 
 
-class ResourceMetadata(model.Model):
-
-    """Model for Resource Metadata.
-
-    Structured data that the client provides to the server. This is an
-    optional element but it is suggested that all clients fill in the
-    data that is applicable to them.
-    """
-
-    client = model.Field(name="client", key="client",
-                         is_property=False, is_required=False)
-    """Indicates the client that creates or updates the resource.
-    Although this element is optional, it is strongly recommended that it
-    contain an appropriate value."""
+class Resource(model.Model):
 
-    tenant_id = model.Field(name="tenant_id", key="tenantId",
-                            is_property=False, is_required=False)
-    """The identifier of the tenant in the client environment.
-    Provides linkage between the resource in the Network Controller
-    and the tenant in the client network."""
+    """Model for the resource references."""
 
-    group_id = model.Field(name="group_id", key="groupId",
-                           is_property=False, is_required=False)
-    """The identifier of the group that the tenant belongs to within
-    the client environment. This is usually used in environments that
-    contain multiple tenants that are aggregated into groups that the
-    client manages. This provides linkage between the resource in the
-    Network Controller and the group that the tenant belongs to in the
-    client network."""
+    _key_field = "resource_ref"
 
-    resource_name = model.Field(name="resource_name", key="resourceName",
-                                is_property=False, is_required=False)
-    """Indicates the globally unique name of the resource. If it
-    is not assigned a value then it will be blank."""
+    resource_ref = model.Field(name="resource_ref", key="resourceRef",
+                               is_property=False, is_required=True)
+    """A relative URI to an associated resource."""
 
-    name = model.Field(name="name", key="name",
-                       is_property=False, is_required=False)
-    """Indicates the globally unique name of the resource. If it
-    is not assigned a value then it will be blank."""
+    def get_resource(self):
+        """Return the associated resource."""
+        route = _ROUTER.resolve(self.resource_ref)
+        if route is None:
+            raise exception.NotFound(
+                "No model available for %(resource_ref)r",
+                resource_ref=self.resource_ref)
 
-    original_href = model.Field(name="original_href", key="originalHref",
-                                is_property=False, is_required=False)
-    """The original URI of the resource if the client uses a URI based
-    system to organize resources."""
+        model_cls, resource_id, parent_id, grandparent_id = route
+        return model_cls.get(resource_id=resource_id, parent_id=parent_id,
+                             grandparent_id=grandparent_id)
 
 
 class IPPools(_BaseHNVModel):
@@ -503,8 +1432,8 @@ class LogicalSubnetworks(_BaseHNVModel):
     routes = model.Field(name="routes", key="routes", is_required=False)
     """Indicates the routes that are contained in the logical subnet."""
 
-    ip_pools = model.Field(name="ip_pools", key="ipPools",
-                           is_required=False)
+    ip_pools = model.ListField(name="ip_pools", key="ipPools",
+                               model_class=IPPools, is_required=False)
     """Indicates the IP Pools that are contained in the logical subnet."""
 
     dns_servers = model.Field(name="dns_servers", key="dnsServers",
@@ -512,14 +1441,17 @@ class LogicalSubnetworks(_BaseHNVModel):
     """Indicates one or more DNS servers that are used for resolving DNS
     queries by devices or host connected to this logical subnet."""
 
-    ip_configurations = model.Field(name="ip_configurations",
-                                    key="ipConfigurations")
+    ip_configurations = model.ListField(name="ip_configurations",
+                                        key="ipConfigurations",
+                                        model_class=Resource,
+                                        is_back_reference=True)
     """Indicates an array of IP configurations that are contained
     in the network interface."""
 
-    network_interfaces = model.Field(name="network_interfaces",
-                                     key="networkInterfaces",
-                                     is_read_only=True)
+    network_interfaces = model.ListField(
+        name="network_interfaces", key="networkInterfaces",
+        model_class=Resource, is_read_only=True,
+        is_back_reference=True)
     """Indicates an array of references to networkInterfaces resources
     that are attached to the logical subnet."""
 
@@ -538,32 +1470,6 @@ class LogicalSubnetworks(_BaseHNVModel):
     at the time of subscription and can be changed only via the Service
     administrator portal."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        ip_pools = []
-        for raw_content in properties.get("ipPools", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            raw_content["grandParentResourceID"] = raw_data["parentResourceID"]
-            ip_pools.append(IPPools.from_raw_data(raw_content))
-        properties["ipPools"] = ip_pools
-
-        ip_configurations = []
-        for raw_content in properties.get("ipConfigurations", []):
-            resource = Resource.from_raw_data(raw_content)
-            ip_configurations.append(resource)
-        properties["ipConfigurations"] = ip_configurations
-
-        network_interfaces = []
-        for raw_content in properties.get("networkInterfaces", []):
-            resource = Resource.from_raw_data(raw_content)
-            network_interfaces.append(resource)
-        properties["networkInterfaces"] = network_interfaces
-
-        return super(LogicalSubnetworks, cls).process_raw_data(raw_data)
-
 
 class LogicalNetworks(_BaseHNVModel):
 
@@ -576,8 +1482,9 @@ class LogicalNetworks(_BaseHNVModel):
 
     _endpoint = "/networking/v1/logicalNetworks/{resource_id}"
 
-    subnetworks = model.Field(name="subnetworks", key="subnets",
-                              is_required=False, default=list)
+    subnetworks = model.ListField(name="subnetworks", key="subnets",
+                                  model_class=LogicalSubnetworks,
+                                  is_required=False, default=list)
     """Indicates the subnets that are contained in the logical network."""
 
     network_virtualization_enabled = model.Field(
@@ -587,30 +1494,14 @@ class LogicalNetworks(_BaseHNVModel):
     for one or more virtual networks. Valid values are `True` or `False`.
     The default is `False`."""
 
-    virtual_networks = model.Field(
-        name="virtual_networks", key="virtualNetworks",
-        is_read_only=True, default=list)
+    virtual_networks = model.ListField(name="virtual_networks",
+                                       key="virtualNetworks",
+                                       model_class=Resource, is_read_only=True,
+                                       default=list,
+                                       is_back_reference=True)
     """Indicates an array of virtualNetwork resources that are using
     the network."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        subnetworks = []
-        for raw_subnet in properties.get("subnets", []):
-            raw_subnet["parentResourceID"] = raw_data["resourceId"]
-            subnetworks.append(LogicalSubnetworks.from_raw_data(raw_subnet))
-        properties["subnets"] = subnetworks
-
-        virtual_networks = []
-        for raw_network in properties.get("virtualNetworks", []):
-            virtual_networks.append(Resource.from_raw_data(raw_network))
-        properties["virtualNetworks"] = virtual_networks
-
-        return super(LogicalNetworks, cls).process_raw_data(raw_data)
-
 
 class IPConfiguration(_BaseHNVModel):
 
@@ -638,15 +1529,16 @@ class IPConfiguration(_BaseHNVModel):
     """Indicates a reference to an accessControlList resource that defines
     the ACLs in and out of the IP Configuration."""
 
-    backend_address_pools = model.Field(
+    backend_address_pools = model.ListField(
         name="backend_address_pools", key="loadBalancerBackendAddressPools",
-        is_required=False, is_read_only=False)
+        model_class=Resource, is_required=False, is_read_only=False)
     """Reference to backendAddressPools child resource of loadBalancers
     resource."""
 
-    inbound_nat_rules = model.Field(
-        name="loadBalancerInboundNatRules", key="loadBalancerInboundNatRules",
-        is_required=False)
+    inbound_nat_rules = model.ListField(name="loadBalancerInboundNatRules",
+                                        key="loadBalancerInboundNatRules",
+                                        model_class=Resource,
+                                        is_required=False)
     """Reference to inboundNatRules child resource of loadBalancers
     resource."""
 
@@ -660,55 +1552,22 @@ class IPConfiguration(_BaseHNVModel):
         is_required=False)
     """Indicates the allocation method (Static or Dynamic)."""
 
-    public_ip_address = model.Field(
-        name="public_ip_address", key="publicIPAddress",
+    public_ip_address = model.ModelField(
+        name="public_ip_address", key="publicIPAddress", model_class=Resource,
         is_required=False)
     """Indicates the public IP address of the IP Configuration."""
 
-    service_insertion = model.Field(
-        name="service_insertion", key="serviceInsertion",
+    service_insertion = model.ModelField(
+        name="service_insertion", key="serviceInsertion", model_class=Resource,
         is_required=False)
     """Indicates a reference to a serviceInsertion resource that defines
     the service insertion in and out of the IP Configuration."""
 
-    subnet = model.Field(name="subnet", key="subnet", is_read_only=True)
+    subnet = model.ModelField(name="subnet", key="subnet",
+                              model_class=Resource, is_read_only=True)
     """Indicates a reference to the subnet resource that the IP Configuration
     is connected to."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        address_pools = []
-        for content in properties.get("loadBalancerBackendAddressPools", []):
-            resource = Resource.from_raw_data(content)
-            address_pools.append(resource)
-        properties["loadBalancerBackendAddressPools"] = address_pools
-
-        nat_rules = []
-        for content in properties.get("loadBalancerInboundNatRules", None):
-            resource = Resource.from_raw_data(content)
-            nat_rules.append(resource)
-        properties["loadBalancerInboundNatRules"] = nat_rules
-
-        raw_content = properties.get("publicIPAddress", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["publicIPAddress"] = resource
-
-        raw_content = properties.get("serviceInsertion", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["serviceInsertion"] = resource
-
-        raw_content = properties.get("subnet", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["subnet"] = resource
-
-        return super(IPConfiguration, cls).process_raw_data(raw_data)
-
 
 class DNSSettings(model.Model):
 
@@ -804,35 +1663,9 @@ class PortSettings(model.Model):
     """Specifies the number of hardware queue pairs to be allocated
     to an SR-IOV virtual function."""
 
-    qos_settings = model.Field(name="qos_settings", key="qosSettings",
-                               is_required=False, is_property=False)
-
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        raw_settings = raw_data.get("qosSettings", {})
-        qos_settings = QosSettings.from_raw_data(raw_settings)
-        raw_data["qosSettings"] = qos_settings
-        return super(PortSettings, cls).process_raw_data(raw_data)
-
-
-class ConfigurationState(model.Model):
-
-    """Model for configuration state."""
-
-    uuid = model.Field(name="uuid", key="id",
-                       is_property=False, is_required=False)
-    status = model.Field(name="status", key="status",
-                         is_property=False, is_required=False)
-    last_update = model.Field(name="last_update", key="lastUpdatedTime",
-                              is_property=False, is_required=False)
-    detailed_info = model.Field(name="detailed_info", key="detailedInfo",
-                                is_property=False, is_required=False)
-    interface_errors = model.Field(name="interface_errors",
-                                   key="virtualNetworkInterfaceErrors",
-                                   is_property=False, is_required=False)
-    host_errors = model.Field(name="host_erros", key="hostErrors",
-                              is_property=False, is_required=False)
+    qos_settings = model.ModelField(name="qos_settings", key="qosSettings",
+                                    model_class=QosSettings, is_required=False,
+                                    is_property=False, create_empty=True)
 
 
 class NetworkInterfaces(_BaseHNVModel):
@@ -845,12 +1678,14 @@ class NetworkInterfaces(_BaseHNVModel):
 
     _endpoint = "/networking/v1/networkInterfaces/{resource_id}"
 
-    dns_settings = model.Field(name="dns_settings", key="dnsSettings",
-                               is_read_only=False)
+    dns_settings = model.ModelField(name="dns_settings", key="dnsSettings",
+                                    model_class=DNSSettings,
+                                    is_read_only=False, create_empty=True)
     """Indicates the DNS settings of this network interface."""
 
-    ip_configurations = model.Field(name="ip_configurations",
-                                    key="ipConfigurations")
+    ip_configurations = model.ListField(name="ip_configurations",
+                                        key="ipConfigurations",
+                                        model_class=IPConfiguration)
     """Indicates an array of IP configurations that are contained
     in the network interface."""
 
@@ -882,7 +1717,9 @@ class NetworkInterfaces(_BaseHNVModel):
     machine that is currently hosting the virtual machine to
     which this network interface belongs."""
 
-    port_settings = model.Field(name="port_settings", key="portSettings")
+    port_settings = model.ModelField(name="port_settings", key="portSettings",
+                                     model_class=PortSettings,
+                                     create_empty=True)
     """A PortSettings object."""
 
     mac_address = model.Field(name="mac_address", key="privateMacAddress")
@@ -899,29 +1736,6 @@ class NetworkInterfaces(_BaseHNVModel):
     """Indicates an array of serviceInsertions resources that
     this networkInterfaces resource is part of."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        ip_configurations = []
-        raw_settings = properties.get("ipConfigurations", [])
-        for raw_configuration in raw_settings:
-            raw_configuration["parentResourceID"] = raw_data["resourceId"]
-            ip_configuration = IPConfiguration.from_raw_data(raw_configuration)
-            ip_configurations.append(ip_configuration)
-        properties["ipConfigurations"] = ip_configurations
-
-        raw_settings = properties.get("dnsSettings", {})
-        dns_settings = DNSSettings.from_raw_data(raw_settings)
-        properties["dnsSettings"] = dns_settings
-
-        raw_settings = properties.get("portSettings", {})
-        port_settings = PortSettings.from_raw_data(raw_settings)
-        properties["portSettings"] = port_settings
-
-        return super(NetworkInterfaces, cls).process_raw_data(raw_data)
-
 
 class SubNetworks(_BaseHNVModel):
 
@@ -952,57 +1766,31 @@ class SubNetworks(_BaseHNVModel):
     subnets in the virtual network and must fall in the addressPrefix defined
     in the virtual network."""
 
-    access_controll_list = model.Field(name="access_controll_list",
-                                       key="accessControlList",
-                                       is_required=False)
+    access_controll_list = model.ModelField(
+        name="access_controll_list", key="accessControlList",
+        model_class=Resource, is_required=False)
     """Indicates a reference to an accessControlLists resource that defines
     the ACLs in and out of the subnet."""
 
-    service_insertion = model.Field(name="service_insertion",
-                                    key="serviceInsertion",
-                                    is_required=False)
+    service_insertion = model.ModelField(
+        name="service_insertion", key="serviceInsertion", model_class=Resource,
+        is_required=False)
     """Indicates a reference to a serviceInsertions resource that defines the
     service insertion to be applied to the subnet."""
 
-    route_table = model.Field(name="route_table", key="routeTable",
-                              is_required=False)
+    route_table = model.ModelField(name="route_table", key="routeTable",
+                                   model_class=Resource, is_required=False)
     """Indicates a reference to a routeTable resource that defines the tenant
     routes to be applied to the subnet."""
 
-    ip_configuration = model.Field(name="ip_configuration",
-                                   key="ipConfigurations",
-                                   is_read_only=False)
+    ip_configuration = model.ListField(name="ip_configuration",
+                                       key="ipConfigurations",
+                                       model_class=Resource,
+                                       is_read_only=False,
+                                       is_back_reference=True)
     """Indicates an array of references of networkInterfaces resources that
     are connected to the subnet."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        raw_content = properties.get("accessControlList", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["accessControlList"] = resource
-
-        # TODO(alexcoman): Add model for ServiceInsertion
-        raw_content = properties.get("serviceInsertion", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["serviceInsertion"] = resource
-
-        raw_content = properties.get("routeTable", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["routeTable"] = resource
-
-        ip_configurations = []
-        for raw_config in properties.get("ipConfigurations", []):
-            ip_configurations.append(Resource.from_raw_data(raw_config))
-        properties["ipConfigurations"] = ip_configurations
-
-        return super(SubNetworks, cls).process_raw_data(raw_data)
-
 
 class DHCPOptions(model.Model):
 
@@ -1047,53 +1835,27 @@ class VirtualNetworks(_BaseHNVModel):
 
     _endpoint = "/networking/v1/virtualNetworks/{resource_id}"
 
-    address_space = model.Field(name="address_space",
-                                key="addressSpace",
-                                is_required=True)
+    address_space = model.ModelField(name="address_space", key="addressSpace",
+                                     model_class=AddressSpace,
+                                     is_required=True)
     """Indicates the address space of the virtual network."""
 
-    dhcp_options = model.Field(name="dhcp_options", key="dhcpOptions",
-                               is_required=False)
+    dhcp_options = model.ModelField(name="dhcp_options", key="dhcpOptions",
+                                    model_class=DHCPOptions, is_required=False)
     """Indicates the DHCP options used by servers in the virtual
     network."""
 
-    subnetworks = model.Field(name="subnetworks", key="subnets",
-                              is_required=False, default=list)
+    subnetworks = model.ListField(name="subnetworks", key="subnets",
+                                  model_class=SubNetworks, is_required=False,
+                                  default=list)
     """Indicates the subnets that are on the virtual network."""
 
-    logical_network = model.Field(name="logical_network",
-                                  key="logicalNetwork",
-                                  is_required=True)
+    logical_network = model.ModelField(name="logical_network",
+                                       key="logicalNetwork",
+                                       model_class=Resource, is_required=True)
     """Indicates a reference to the networks resource that is the
     underlay network which the virtual network runs on."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        raw_content = properties.get("addressSpace", None)
-        if raw_content is not None:
-            address_space = AddressSpace.from_raw_data(raw_content)
-            properties["addressSpace"] = address_space
-
-        raw_content = properties.get("dhcpOptions")
-        if raw_content is not None:
-            dhcp_options = DHCPOptions.from_raw_data(raw_content)
-            properties["dhcpOptions"] = dhcp_options
-
-        raw_content = properties.get("logicalNetwork", None)
-        if raw_content is not None:
-            properties["logicalNetwork"] = Resource.from_raw_data(raw_content)
-
-        subnetworks = []
-        for raw_subnet in properties.get("subnets", []):
-            raw_subnet["parentResourceID"] = raw_data["resourceId"]
-            subnetworks.append(SubNetworks.from_raw_data(raw_subnet))
-        properties["subnets"] = subnetworks
-
-        return super(VirtualNetworks, cls).process_raw_data(raw_data)
-
 
 class ACLRules(_BaseHNVModel):
 
@@ -1190,7 +1952,8 @@ class AccessControlLists(_BaseHNVModel):
 
     _endpoint = "/networking/v1/accessControlLists/{resource_id}"
 
-    acl_rules = model.Field(name="acl_rules", key="aclRules")
+    acl_rules = model.ListField(name="acl_rules", key="aclRules",
+                                model_class=ACLRules)
     """Indicates the rules in an access control list."""
 
     inbound_action = model.Field(name="inbound_action",
@@ -1205,39 +1968,19 @@ class AccessControlLists(_BaseHNVModel):
     """Indicates the default action for Outbound Rules. Valid values are
     `Permit` and `Deny`. The default value is `Permit`."""
 
-    ip_configuration = model.Field(name="ip_configuration",
-                                   key="ipConfigurations")
+    ip_configuration = model.ListField(name="ip_configuration",
+                                       key="ipConfigurations",
+                                       model_class=Resource,
+                                       is_back_reference=True)
     """Indicates references to IP addresses of network interfaces
     resources this access control list is associated with."""
 
-    subnets = model.Field(name="subnets", key="subnets")
+    subnets = model.ListField(name="subnets", key="subnets",
+                              model_class=Resource,
+                              is_back_reference=True)
     """Indicates an array of references to subnets resources this access
     control list is associated with."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        ip_configurations = []
-        for raw_content in properties.get("ipConfigurations", []):
-            resource = Resource.from_raw_data(raw_content)
-            ip_configurations.append(resource)
-        properties["ipConfigurations"] = ip_configurations
-
-        subnetworks = []
-        for raw_subnet in properties.get("subnets", []):
-            subnetworks.append(Resource.from_raw_data(raw_subnet))
-        properties["subnets"] = subnetworks
-
-        acl_rules = []
-        for raw_rule in properties.get("aclRules", []):
-            raw_rule["parentResourceID"] = raw_data["resourceId"]
-            acl_rules.append(ACLRules.from_raw_data(raw_rule))
-        properties["aclRules"] = acl_rules
-
-        return super(AccessControlLists, cls).process_raw_data(raw_data)
-
 
 class VirtualSwtichQosSettings(model.Model):
 
@@ -1291,8 +2034,9 @@ class VirtualSwitchManager(_BaseHNVModel):
 
     _endpoint = "/networking/v1/virtualSwitchManager/configuration"
 
-    qos_settings = model.Field(name="qos_settings", key="qosSettings",
-                               is_required=False)
+    qos_settings = model.ModelField(name="qos_settings", key="qosSettings",
+                                    model_class=VirtualSwtichQosSettings,
+                                    is_required=False, create_empty=True)
 
     def __init__(self, **fields):
         qos_settings = fields.get("qos_settings", {})
@@ -1302,18 +2046,11 @@ class VirtualSwitchManager(_BaseHNVModel):
         super(VirtualSwitchManager, self).__init__(**fields)
 
     @classmethod
-    def get(cls, resource_id=None, parent_id=None, grandparent_id=None):
+    def get(cls, resource_id=None, parent_id=None, grandparent_id=None,
+            fields=None, where=None):
         """"Retrieves the required resource."""
-        return cls._get(resource_id, parent_id, grandparent_id)
-
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-        qos_settings = properties.get("qosSettings", {})
-        properties["qosSettings"] = VirtualSwtichQosSettings.from_raw_data(
-            raw_data=qos_settings)
-        return super(VirtualSwitchManager, cls).process_raw_data(raw_data)
+        return cls._get(resource_id, parent_id, grandparent_id, fields,
+                        where)
 
     @classmethod
     def remove(cls, resource_id, parent_id=None, grandparent_id=None,
@@ -1381,36 +2118,17 @@ class RouteTables(_BaseHNVModel):
 
     _endpoint = "/networking/v1/routeTables/{resource_id}"
 
-    routes = model.Field(name="routes", key="routes", is_required=False,
-                         default=list)
+    routes = model.ListField(name="routes", key="routes", model_class=Routes,
+                             is_required=False, default=list)
     """Indicates the routes in a route table, see routes resource for full
     details on this element."""
 
-    subnetworks = model.Field(name="subnetworks", key="subnets",
-                              is_read_only=True)
+    subnetworks = model.ListField(name="subnetworks", key="subnets",
+                                  model_class=Resource, is_read_only=True,
+                                  is_back_reference=True)
     """Indicates an array of references to subnets resources this route
     table is associated with."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data["properties"]
-
-        routes = []
-        raw_routes = properties.get("routes", [])
-        for raw_route in raw_routes:
-            raw_route["parentResourceID"] = raw_data["resourceId"]
-            routes.append(Routes.from_raw_data(raw_route))
-        properties["routes"] = routes
-
-        subnets = []
-        raw_subnets = properties.get("subnets", [])
-        for raw_subnet in raw_subnets:
-            subnets.append(Resource.from_raw_data(raw_subnet))
-        properties["subnets"] = subnets
-
-        return super(RouteTables, cls).process_raw_data(raw_data)
-
 
 class MainMode(model.Model):
 
@@ -1568,53 +2286,30 @@ class IPSecConfiguration(model.Model):
     Note this is write-only property and the value of this field is not
     shown in the GET of Networkconnection."""
 
-    main_mode = model.Field(
-        name="main_mode", key="mainMode",
-        is_required=False, is_read_only=False, is_property=False)
+    main_mode = model.ModelField(name="main_mode", key="mainMode",
+                                 model_class=MainMode, is_required=False,
+                                 is_read_only=False, is_property=False)
     """Main mode IPsec configuration details."""
 
-    quick_mode = model.Field(
-        name="quick_mode", key="quickMode",
-        is_required=False, is_read_only=False, is_property=False)
+    quick_mode = model.ModelField(name="quick_mode", key="quickMode",
+                                  model_class=QuickMode, is_required=False,
+                                  is_read_only=False, is_property=False)
     """Quick mode IPsec configuration."""
 
-    local_vpn_ts = model.Field(
-        name="local_vpn_ts", key="localVpnTrafficSelector",
-        is_required=False, is_read_only=False, is_property=False)
+    local_vpn_ts = model.ListField(name="local_vpn_ts",
+                                   key="localVpnTrafficSelector",
+                                   model_class=LocalVpnTrafficSelector,
+                                   is_required=False, is_read_only=False,
+                                   is_property=False)
     """Indicates collection of IPsec TrafficSelectors on the hoster side."""
 
-    remote_vpn_ts = model.Field(
-        name="remote_vpn_ts", key="remoteVpnTrafficSelector",
-        is_required=False, is_read_only=False, is_property=False)
+    remote_vpn_ts = model.ListField(name="remote_vpn_ts",
+                                    key="remoteVpnTrafficSelector",
+                                    model_class=RemoteVpnTrafficSelector,
+                                    is_required=False, is_read_only=False,
+                                    is_property=False)
     """Indicates collection of IPsec TrafficSelectors on the tenant side."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        raw_main = raw_data.get("mainMode", None)
-        if raw_main is not None:
-            main_mode = MainMode.from_raw_data(raw_main)
-            raw_data["mainMode"] = main_mode
-
-        raw_quick = raw_data.get("quickMode", None)
-        if raw_quick is not None:
-            quick_mode = QuickMode.from_raw_data(raw_quick)
-            raw_data["quickMode"] = quick_mode
-
-        local_vpn_ts = []
-        for raw_local_vpn in raw_data.get("localVpnTrafficSelector", []):
-            local_vpn_ts.append(LocalVpnTrafficSelector.from_raw_data(
-                raw_local_vpn))
-        raw_data["localVpnTrafficSelector"] = local_vpn_ts
-
-        remote_vpn_ts = []
-        for raw_remote_vpn in raw_data.get("remoteVpnTrafficSelector", []):
-            remote_vpn_ts.append(RemoteVpnTrafficSelector.from_raw_data(
-                raw_remote_vpn))
-        raw_data["remoteVpnTrafficSelector"] = remote_vpn_ts
-
-        return super(IPSecConfiguration, cls).process_raw_data(raw_data)
-
 
 class IPAddress(model.Model):
 
@@ -1772,9 +2467,9 @@ class NetworkConnections(_BaseHNVModel):
                                is_required=False, is_read_only=False)
     """Indicates maximum allowed outbound bandwidth in Kbps."""
 
-    ipsec_configuration = model.Field(name="ipsec_configuration",
-                                      key="ipSecConfiguration",
-                                      is_required=False, is_read_only=False)
+    ipsec_configuration = model.ModelField(
+        name="ipsec_configuration", key="ipSecConfiguration",
+        model_class=IPSecConfiguration, is_required=False, is_read_only=False)
     """Details of IPsec configuration."""
 
     ip_address = model.Field(name="ip_address", key="IpAddress",
@@ -1782,8 +2477,9 @@ class NetworkConnections(_BaseHNVModel):
     """Indicates ConnecTo Address to which peers connect to and which is
     the source IP address in egress direction. This would be the VIP."""
 
-    ip_addresses = model.Field(name="ip_addresses", key="ipAddresses",
-                               is_required=False, is_read_only=False)
+    ip_addresses = model.ListField(name="ip_addresses", key="ipAddresses",
+                                   model_class=IPAddress, is_required=False,
+                                   is_read_only=False)
     """IP assigned in the tenant compartment for L3 interface."""
 
     peer_ip_address = model.Field(name="peer_ip_address",
@@ -1803,8 +2499,9 @@ class NetworkConnections(_BaseHNVModel):
     """Indicates destination ip address of the tunnel. Applicable to
     IKEv2 and GRE."""
 
-    routes = model.Field(name="routes", key="routes",
-                         is_required=False, is_read_only=False)
+    routes = model.ListField(name="routes", key="routes",
+                             model_class=NetworkInterfaceRoute,
+                             is_required=False, is_read_only=False)
     """List of all the routes (static and those learned via BGP) on the
     network interface. Traffic matching the routes is transmitted on the
     network interface.
@@ -1823,8 +2520,9 @@ class NetworkConnections(_BaseHNVModel):
     Values: `Connected` or `Disconnected`.
     """
 
-    statistics = model.Field(name="statistics", key="statistics",
-                             is_required=False, is_read_only=False)
+    statistics = model.ModelField(name="statistics", key="statistics",
+                                  model_class=NetworkInterfaceStatistics,
+                                  is_required=False, is_read_only=False)
     """Statistics of the connection."""
 
     connection_uptime = model.Field(name="connection_uptime",
@@ -1845,61 +2543,20 @@ class NetworkConnections(_BaseHNVModel):
     """Indicates the reason for not being able to connect/dial in the
     previous attempt."""
 
-    gre_configuration = model.Field(name="gre_configuration",
-                                    key="greConfiguration",
-                                    is_required=False, is_read_only=False)
+    gre_configuration = model.ModelField(
+        name="gre_configuration", key="greConfiguration",
+        model_class=GREConfiguration, is_required=False, is_read_only=False)
     """Indicates details of GRE configuration."""
 
-    l3_configuration = model.Field(name="l3_configuration",
-                                   key="l3Configuration",
-                                   is_required=False, is_read_only=False)
+    l3_configuration = model.ModelField(name="l3_configuration",
+                                        key="l3Configuration",
+                                        model_class=L3Configuration,
+                                        is_required=False, is_read_only=False)
     """Indicates details of L3 configuration."""
 
-    gateway = model.Field(name="gateway", key="gateway",
-                          is_required=False, is_read_only=False)
-
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        raw_content = properties.get("ipSecConfiguration", None)
-        if raw_content is not None:
-            ip_sec = IPSecConfiguration.from_raw_data(raw_content)
-            properties["ipSecConfiguration"] = ip_sec
-
-        ip_addresses = []
-        for raw_content in properties.get("ipAddresses", []):
-            ip_addresses.append(IPAddress.from_raw_data(raw_content))
-        properties["ipAddresses"] = ip_addresses
-
-        routes = []
-        for raw_content in properties.get("routes", []):
-            routes.append(NetworkInterfaceRoute.from_raw_data(raw_content))
-        properties["routes"] = routes
-
-        raw_content = properties.get("statistics", None)
-        if raw_content is not None:
-            statistics = NetworkInterfaceStatistics.from_raw_data(
-                raw_content)
-            properties["statistics"] = statistics
-
-        raw_content = properties.get("greConfiguration", None)
-        if raw_content is not None:
-            gre_configuration = GREConfiguration.from_raw_data(raw_content)
-            properties["greConfiguration"] = gre_configuration
-
-        raw_content = properties.get("l3Configuration", None)
-        if raw_content is not None:
-            l3_configuration = L3Configuration.from_raw_data(raw_content)
-            properties["l3Configuration"] = l3_configuration
-
-        raw_content = properties.get("gateway", None)
-        if raw_content is not None:
-            gateway = Resource.from_raw_data(raw_content)
-            properties["gateway"] = gateway
-
-        return super(NetworkConnections, cls).process_raw_data(raw_data)
+    gateway = model.ModelField(name="gateway", key="gateway",
+                               model_class=Resource, is_required=False,
+                               is_read_only=False)
 
 
 class PublicIPAddresses(_BaseHNVModel):
@@ -1950,9 +2607,11 @@ class PublicIPAddresses(_BaseHNVModel):
     this value is ignored.
     """
 
-    ip_configuration = model.Field(name="ip_configuration",
-                                   key="ipConfiguration",
-                                   is_required=False, is_read_only=True)
+    ip_configuration = model.ModelField(name="ip_configuration",
+                                        key="ipConfiguration",
+                                        model_class=Resource,
+                                        is_required=False, is_read_only=True,
+                                        is_back_reference=True)
     """Reference to an ipConfigurations resource.
 
     Relative URI of the private IP address with which this public IP is
@@ -1960,18 +2619,6 @@ class PublicIPAddresses(_BaseHNVModel):
     gateways.
     """
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        raw_content = properties.get("ipConfiguration", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["ipConfiguration"] = resource
-
-        return super(PublicIPAddresses, cls).process_raw_data(raw_data)
-
 
 class BackendAddressPools(_BaseHNVModel):
 
@@ -1994,9 +2641,10 @@ class BackendAddressPools(_BaseHNVModel):
     resource.
     """
 
-    backend_ip_configurations = model.Field(
+    backend_ip_configurations = model.ListField(
         name="backend_ip_configurations", key="backendIPConfigurations",
-        is_required=False, is_read_only=False)
+        model_class=Resource, is_required=False, is_read_only=False,
+        is_back_reference=True)
     """Indicates an array of references to ipConfiguration Resources.
 
     There is no restriction on having the same IP configurations in multiple
@@ -2006,44 +2654,21 @@ class BackendAddressPools(_BaseHNVModel):
     resource.
     """
 
-    load_balancing_rules = model.Field(name="load_balancing_rules",
-                                       key="loadBalancingRules",
-                                       is_required=False, is_read_only=False)
+    load_balancing_rules = model.ListField(
+        name="load_balancing_rules", key="loadBalancingRules",
+        model_class=Resource, is_required=False, is_read_only=False,
+        is_back_reference=True)
     """Indicates an array of references to the set of loadBalancingRules
     resources that use this backend address pool.
     """
 
-    outbound_nat_rules = model.Field(name="outbound_nat_rules",
-                                     key="outboundNatRules",
-                                     is_required=False, is_read_only=False)
+    outbound_nat_rules = model.ListField(
+        name="outbound_nat_rules", key="outboundNatRules",
+        model_class=Resource, is_required=False, is_read_only=False,
+        is_back_reference=True)
     """Indicates an array of references to the set of outboundNatRules
     resources that use this backend address pool."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        backend_ip_configurations = []
-        for raw_content in properties.get("backendIPConfigurations", []):
-            resource = Resource.from_raw_data(raw_content)
-            backend_ip_configurations.append(resource)
-        properties["backendIPConfigurations"] = backend_ip_configurations
-
-        load_balancing_rules = []
-        for raw_content in properties.get("loadBalancingRules", []):
-            resource = Resource.from_raw_data(raw_content)
-            load_balancing_rules.append(resource)
-        properties["loadBalancingRules"] = load_balancing_rules
-
-        outbound_nat_rules = []
-        for raw_content in properties.get("outboundNatRules", []):
-            resource = Resource.from_raw_data(raw_content)
-            outbound_nat_rules.append(resource)
-        properties["outboundNatRules"] = outbound_nat_rules
-
-        return super(BackendAddressPools, cls).process_raw_data(raw_data)
-
 
 class FrontendIPConfigurations(_BaseHNVModel):
 
@@ -2065,21 +2690,25 @@ class FrontendIPConfigurations(_BaseHNVModel):
     resource.
     """
 
-    inbound_nat_rules = model.Field(
-        name="inbound_nat_rules", key="inboundNatRules",
-        is_required=False, is_read_only=True)
+    inbound_nat_rules = model.ListField(name="inbound_nat_rules",
+                                        key="inboundNatRules",
+                                        model_class=Resource,
+                                        is_required=False, is_read_only=True,
+                                        is_back_reference=True)
     """Indicates a reference to the inboundNatRules resource used by
     the frontEndIpConfiguration."""
 
-    load_balancing_rules = model.Field(
+    load_balancing_rules = model.ListField(
         name="load_balancing_rules", key="loadBalancingRules",
-        is_required=False, is_read_only=False)
+        model_class=Resource, is_required=False, is_read_only=False,
+        is_back_reference=True)
     """Indicates a reference to the loadBalancingRules resource used
     by the frontEndIpConfiguration."""
 
-    outbound_nat_rules = model.Field(
+    outbound_nat_rules = model.ListField(
         name="outbound_nat_rules", key="outboundNatRules",
-        is_required=False, is_read_only=True)
+        model_class=Resource, is_required=False, is_read_only=True,
+        is_back_reference=True)
     """Indicates a reference to the outboundNatRules resource used by
     the frontEndIpConfiguration."""
 
@@ -2113,8 +2742,9 @@ class FrontendIPConfigurations(_BaseHNVModel):
         is_required=False, is_read_only=False)
     """Static or Dynamic."""
 
-    subnet = model.Field(name="subnet", key="subnet",
-                         is_required=False, is_read_only=False)
+    subnet = model.ModelField(name="subnet", key="subnet",
+                              model_class=Resource, is_required=False,
+                              is_read_only=False)
     """Indicates a references to the subnet resource used by the
     frontendIpConfiguration resource. MUST be specified if a
     privateIPaddress is specified.
@@ -2126,36 +2756,6 @@ class FrontendIPConfigurations(_BaseHNVModel):
     privateIpAddress.
     """
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        load_balancing_rules = []
-        for raw_content in properties.get("loadBalancingRules", []):
-            resource = Resource.from_raw_data(raw_content)
-            load_balancing_rules.append(resource)
-        properties["loadBalancingRules"] = load_balancing_rules
-
-        inbound_nat_rules = []
-        for raw_content in properties.get("inboundNatRules", []):
-            resource = Resource.from_raw_data(raw_content)
-            inbound_nat_rules.append(resource)
-        properties["inboundNatRules"] = inbound_nat_rules
-
-        outbound_nat_rules = []
-        for raw_content in properties.get("outboundNatRules", []):
-            resource = Resource.from_raw_data(raw_content)
-            outbound_nat_rules.append(resource)
-        properties["outboundNatRules"] = outbound_nat_rules
-
-        raw_content = properties.get("subnet", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["subnet"] = resource
-
-        return super(FrontendIPConfigurations, cls).process_raw_data(raw_data)
-
 
 class InboundNATRules(_BaseHNVModel):
 
@@ -2176,9 +2776,10 @@ class InboundNATRules(_BaseHNVModel):
     resource.
     """
 
-    backend_ip_configuration = model.Field(
+    backend_ip_configuration = _ReferenceField(
         name="backend_ip_configuration", key="backendIPConfiguration",
-        is_required=False, is_read_only=False)
+        model_class=Resource, is_required=False, is_read_only=False,
+        is_back_reference=True)
     """Indicates a references to backendAddressPool resource. Traffic
     sent to frontendPort of each of the frontendIPConfigurations is
     forwarded to the backend IP.
@@ -2195,9 +2796,9 @@ class InboundNATRules(_BaseHNVModel):
     This parameter is required if the protocol is TCP or UDP.
     """
 
-    frontend_ip_configurations = model.Field(
+    frontend_ip_configurations = model.ListField(
         name="frontend_ip_configurations", key="frontendIPConfigurations",
-        is_required=True, is_read_only=False)
+        model_class=Resource, is_required=True, is_read_only=False)
     """Indicates an array of references to frontendIPConfigurations
     resources."""
 
@@ -2240,27 +2841,6 @@ class InboundNATRules(_BaseHNVModel):
     the endpoint.
     """
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        raw_ip_configuration = properties.get("backendIPConfiguration", [])
-        if isinstance(raw_ip_configuration, dict):
-            raw_ip_configuration = [raw_ip_configuration]
-
-        for raw_content in raw_ip_configuration:
-            backend_ip_configuration = Resource.from_raw_data(raw_content)
-            properties["backendIPConfiguration"] = backend_ip_configuration
-
-        frontend_ip_configurations = []
-        for raw_content in properties.get("frontendIPConfigurations", []):
-            resource = Resource.from_raw_data(raw_content)
-            frontend_ip_configurations.append(resource)
-        properties["frontendIPConfigurations"] = frontend_ip_configurations
-
-        return super(InboundNATRules, cls).process_raw_data(raw_data)
-
 
 class LoadBalancingRules(_BaseHNVModel):
 
@@ -2282,9 +2862,9 @@ class LoadBalancingRules(_BaseHNVModel):
     resource.
     """
 
-    backend_address_pool = model.Field(
+    backend_address_pool = model.ModelField(
         name="backend_address_pool", key="backendAddressPool",
-        is_required=False, is_read_only=False)
+        model_class=Resource, is_required=False, is_read_only=False)
     """Indicates an array of references to a BackendAddressPool resource.
 
     Inbound traffic is randomly load balanced across IPs in the backend pool.
@@ -2305,9 +2885,9 @@ class LoadBalancingRules(_BaseHNVModel):
     This parameter is required if the protocol is TCP or UDP.
     """
 
-    frontend_ip_configurations = model.Field(
+    frontend_ip_configurations = model.ListField(
         name="frontend_ip_configurations", key="frontendIPConfigurations",
-        is_required=True, is_read_only=False)
+        model_class=Resource, is_required=True, is_read_only=False)
     """Indicates an array of references to FrontendIPAddress resources."""
 
     frontend_port = model.Field(name="frontend_port", key="frontendPort",
@@ -2334,8 +2914,8 @@ class LoadBalancingRules(_BaseHNVModel):
     Valid values include `UDP`, `TCP`, `GRE`, `ESP` or `ALL`.
     """
 
-    probe = model.Field(name="probe", key="probe",
-                        is_required=False, is_read_only=False)
+    probe = model.ModelField(name="probe", key="probe", model_class=Resource,
+                             is_required=False, is_read_only=False)
     """Indicates a reference to the probe resource used by this
     LoadBalancingRule.
     """
@@ -2381,29 +2961,6 @@ class LoadBalancingRules(_BaseHNVModel):
     hash to map traffic to available servers
     """
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        frontend_ip_configurations = []
-        for raw_content in properties.get("frontendIPConfigurations", []):
-            resource = Resource.from_raw_data(raw_content)
-            frontend_ip_configurations.append(resource)
-        properties["frontendIPConfigurations"] = frontend_ip_configurations
-
-        raw_content = properties.get("backendAddressPool", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["backendAddressPool"] = resource
-
-        raw_content = properties.get("probe", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["probe"] = resource
-
-        return super(LoadBalancingRules, cls).process_raw_data(raw_data)
-
 
 class OutboundNATRules(_BaseHNVModel):
 
@@ -2424,17 +2981,17 @@ class OutboundNATRules(_BaseHNVModel):
     resource.
     """
 
-    frontend_ip_configurations = model.Field(
+    frontend_ip_configurations = model.ListField(
         name="frontend_ip_configurations", key="frontendIPConfigurations",
-        is_required=True, is_read_only=False)
+        model_class=Resource, is_required=True, is_read_only=False)
     """Indicates an array of frontendIpConfigurations resources.
 
     Indicates an array of references to frontendIpAddress resources.
     """
 
-    backend_address_pool = model.Field(
+    backend_address_pool = model.ModelField(
         name="backend_address_pool", key="backendAddressPool",
-        is_required=True, is_read_only=False)
+        model_class=Resource, is_required=True, is_read_only=False)
     """Indicates a reference to the backendAddressPool resource.
 
     This is the pool of IP addresses where outbound traffic originates.
@@ -2448,24 +3005,6 @@ class OutboundNATRules(_BaseHNVModel):
     Valid values include `TCP`, `UDP`, `GRE`, `ESP` or `All`.
     """
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        frontend_ip_configurations = []
-        for raw_content in properties.get("frontendIPConfigurations", []):
-            resource = Resource.from_raw_data(raw_content)
-            frontend_ip_configurations.append(resource)
-        properties["frontendIPConfigurations"] = frontend_ip_configurations
-
-        raw_content = properties.get("backendAddressPool", None)
-        if raw_content is not None:
-            resource = Resource.from_raw_data(raw_content)
-            properties["backendAddressPool"] = resource
-
-        return super(OutboundNATRules, cls).process_raw_data(raw_data)
-
 
 class Probes(_BaseHNVModel):
 
@@ -2491,9 +3030,10 @@ class Probes(_BaseHNVModel):
     15, the minimum value is 5.
     """
 
-    load_balancing_rules = model.Field(
+    load_balancing_rules = model.ListField(
         name="load_balancing_rules", key="loadBalancingRules",
-        is_required=False, is_read_only=True)
+        model_class=Resource, is_required=False, is_read_only=True,
+        is_back_reference=True)
     """Indicates an array of references to loadBalancingRule resources that
     use this probe.
     """
@@ -2532,19 +3072,6 @@ class Probes(_BaseHNVModel):
     allowed. There is no default value.
     """
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        load_balancing_rules = []
-        for raw_content in properties.get("loadBalancingRules", []):
-            resource = Resource.from_raw_data(raw_content)
-            load_balancing_rules.append(resource)
-        properties["loadBalancingRules"] = load_balancing_rules
-
-        return super(Probes, cls).process_raw_data(raw_data)
-
 
 class LoadBalancers(_BaseHNVModel):
 
@@ -2563,94 +3090,47 @@ class LoadBalancers(_BaseHNVModel):
 
     _endpoint = "/networking/v1/loadBalancers/{resource_id}"
 
-    backend_address_pools = model.Field(name="backend_address_pools",
-                                        key="backendAddressPools",
-                                        is_required=False, is_read_only=False)
+    backend_address_pools = model.ListField(
+        name="backend_address_pools", key="backendAddressPools",
+        model_class=BackendAddressPools, is_required=False, is_read_only=False)
     """Indicates the backend Address Pool of the load balancer."""
 
-    frontend_ip_configurations = model.Field(
+    frontend_ip_configurations = model.ListField(
         name="frontend_ip_configurations", key="frontendIPConfigurations",
-        is_required=True, is_read_only=False)
+        model_class=FrontendIPConfigurations, is_required=True,
+        is_read_only=False)
     """Indicates the frontend IP addresses of the load balancer."""
 
-    load_balancing_rules = model.Field(name="load_balancing_rules",
-                                       key="loadBalancingRules",
-                                       is_required=False, is_read_only=False)
+    load_balancing_rules = model.ListField(
+        name="load_balancing_rules", key="loadBalancingRules",
+        model_class=LoadBalancingRules, is_required=False, is_read_only=False)
     """A list of load balancing configurations.
 
     Each configuration describes what traffic and how it gets load balanced
     between backend IPs.
     """
 
-    inbound_nat_rules = model.Field(name="inbound_nat_rules",
-                                    key="inboundNatRules",
-                                    is_required=False, is_read_only=False)
+    inbound_nat_rules = model.ListField(name="inbound_nat_rules",
+                                        key="inboundNatRules",
+                                        model_class=InboundNATRules,
+                                        is_required=False, is_read_only=False)
     """Indicates an array of inbound NAT rules configured for the
     load balancer.
     """
 
-    outbound_nat_rules = model.Field(name="outbound_nat_rules",
-                                     key="outboundNatRules",
-                                     is_required=False, is_read_only=False)
+    outbound_nat_rules = model.ListField(
+        name="outbound_nat_rules", key="outboundNatRules",
+        model_class=OutboundNATRules, is_required=False, is_read_only=False)
     """Indicates an array of outbound NAT rules configured for the
     load balancer.
     """
 
-    probes = model.Field(name="probes", key="probes",
-                         is_required=False, is_read_only=False)
+    probes = model.ListField(name="probes", key="probes", model_class=Probes,
+                             is_required=False, is_read_only=False)
     """Indicates an array of probes configured for the
     load balancer.
     """
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        properties = raw_data.get("properties", {})
-
-        backend_address_pools = []
-        for raw_content in properties.get("backendAddressPools", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            address_pool = BackendAddressPools.from_raw_data(raw_content)
-            backend_address_pools.append(address_pool)
-        properties["backendAddressPools"] = backend_address_pools
-
-        frontend_ip_configurations = []
-        for raw_content in properties.get("frontendIPConfigurations", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            ip_configurations = FrontendIPConfigurations.from_raw_data(
-                raw_content)
-            frontend_ip_configurations.append(ip_configurations)
-        properties["frontendIPConfigurations"] = frontend_ip_configurations
-
-        inbound_nat_rules = []
-        for raw_content in properties.get("inboundNatRules", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            inbound_nat_rule = InboundNATRules.from_raw_data(raw_content)
-            inbound_nat_rules.append(inbound_nat_rule)
-        properties["inboundNatRules"] = inbound_nat_rules
-
-        outbound_nat_rules = []
-        for raw_content in properties.get("outboundNatRules", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            outbound_nat_rule = OutboundNATRules.from_raw_data(raw_content)
-            outbound_nat_rules.append(outbound_nat_rule)
-        properties["outboundNatRules"] = outbound_nat_rules
-
-        load_balancing_rules = []
-        for raw_content in properties.get("loadBalancingRules", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            balancing_rule = LoadBalancingRules.from_raw_data(raw_content)
-            load_balancing_rules.append(balancing_rule)
-        properties["loadBalancingRules"] = load_balancing_rules
-
-        probes = []
-        for raw_content in properties.get("probes", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            probe = Probes.from_raw_data(raw_content)
-            probes.append(probe)
-        properties["probes"] = probes
-
-        return super(LoadBalancers, cls).process_raw_data(raw_data)
-
 
 class _BGPPeersStatistics(model.Model):
 
@@ -2765,39 +3245,46 @@ class BGPPeersStatistics(model.Model):
         is_property=False, is_required=False, is_read_only=True)
     """Timestamp of TCP connection closed for BGP."""
 
-    open_message_stats = model.Field(
+    open_message_stats = model.ModelField(
         name="open_message_stats", key="openMessageStats",
-        is_property=False, is_required=False, is_read_only=True)
+        model_class=OpenMessageStatistics, is_property=False,
+        is_required=False, is_read_only=True)
     """Instance of OpenMessageStatistics."""
 
-    notification_message_stats = model.Field(
+    notification_message_stats = model.ModelField(
         name="notification_message_stats", key="notificationMessageStats",
-        is_property=False, is_required=False, is_read_only=True)
+        model_class=NotificationMessageStatistics, is_property=False,
+        is_required=False, is_read_only=True)
     """Instance of NotificationMessageStatistics."""
 
-    keep_alive_message_stats = model.Field(
+    keep_alive_message_stats = model.ModelField(
         name="keep_alive_message_stats", key="keepAliveMessageStats",
-        is_property=False, is_required=False, is_read_only=True)
+        model_class=KeepAliveMessageStatistics, is_property=False,
+        is_required=False, is_read_only=True)
     """Instance of KeepAliveMessageStatistics."""
 
-    route_refresh_message_stats = model.Field(
+    route_refresh_message_stats = model.ModelField(
         name="route_refresh_message_stats", key="routeRefreshMessageStats",
-        is_property=False, is_required=False, is_read_only=True)
+        model_class=RouteRefreshMessageStatistics, is_property=False,
+        is_required=False, is_read_only=True)
     """Instance of RouteRefreshMessageStatistics."""
 
-    update_message_stats = model.Field(
+    update_message_stats = model.ModelField(
         name="update_message_stats", key="updateMessageStats",
-        is_property=False, is_required=False, is_read_only=True)
+        model_class=UpdateMessageStatistics, is_property=False,
+        is_required=False, is_read_only=True)
     """Instance of UpdateMessageStatistics."""
 
-    ipv4_route_stats = model.Field(
-        name="ipv4_route_stats", key="ipv4Route",
-        is_property=False, is_required=False, is_read_only=True)
+    ipv4_route_stats = model.ModelField(name="ipv4_route_stats",
+                                        key="ipv4Route", model_class=IPV4Route,
+                                        is_property=False, is_required=False,
+                                        is_read_only=True)
     """Stats for IPv4 routes."""
 
-    ipv6_route_stats = model.Field(
-        name="ipv6_route_stats", key="ipv6Route",
-        is_property=False, is_required=False, is_read_only=True)
+    ipv6_route_stats = model.ModelField(name="ipv6_route_stats",
+                                        key="ipv6Route", model_class=IPV6Route,
+                                        is_property=False, is_required=False,
+                                        is_read_only=True)
     """Stats for IPv6 routes."""
 
     last_updated = model.Field(
@@ -2805,51 +3292,6 @@ class BGPPeersStatistics(model.Model):
         is_property=False, is_required=False, is_read_only=True)
     """Time stamp when the stats were last updated."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-
-        # pylint: disable=redefined-variable-type
-
-        raw_content = raw_data.get("updateMessageStats", None)
-        if raw_content is not None:
-            statistics = UpdateMessageStatistics.from_raw_data(raw_content)
-            raw_data["updateMessageStats"] = statistics
-
-        raw_content = raw_data.get("routeRefreshMessageStats", None)
-        if raw_content is not None:
-            statistics = RouteRefreshMessageStatistics.from_raw_data(
-                raw_content)
-            raw_data["routeRefreshMessageStats"] = statistics
-
-        raw_content = raw_data.get("keepAliveMessageStats", None)
-        if raw_content is not None:
-            statistics = KeepAliveMessageStatistics.from_raw_data(raw_content)
-            raw_data["keepAliveMessageStats"] = statistics
-
-        raw_content = raw_data.get("notificationMessageStats", None)
-        if raw_content is not None:
-            statistics = NotificationMessageStatistics.from_raw_data(
-                raw_content)
-            raw_data["notificationMessageStats"] = statistics
-
-        raw_content = raw_data.get("openMessageStats", None)
-        if raw_content is not None:
-            statistics = OpenMessageStatistics.from_raw_data(raw_content)
-            raw_data["openMessageStats"] = statistics
-
-        raw_content = raw_data.get("ipv4Route", None)
-        if raw_content is not None:
-            statistics = IPV4Route.from_raw_data(raw_content)
-            raw_data["ipv4Route"] = statistics
-
-        raw_content = raw_data.get("ipv6Route", None)
-        if raw_content is not None:
-            statistics = IPV6Route.from_raw_data(raw_content)
-            raw_data["ipv6Route"] = statistics
-
-        return super(BGPPeersStatistics, cls).process_raw_data(raw_data)
-
 
 class BGPPeers(_BaseHNVModel):
 
@@ -2898,8 +3340,9 @@ class BGPPeers(_BaseHNVModel):
                                   is_required=False, is_read_only=False)
     """IP address of the peer."""
 
-    statistics = model.Field(name="statistics", key="statistics",
-                             is_required=False, is_read_only=True)
+    statistics = model.ModelField(name="statistics", key="statistics",
+                                  model_class=BGPPeersStatistics,
+                                  is_required=False, is_read_only=True)
     """Provides statistics for this peer."""
 
     policy_map_out = model.Field(name="policy_map_out", key="policyMapOut",
@@ -2916,18 +3359,6 @@ class BGPPeers(_BaseHNVModel):
                                is_required=False, is_read_only=True)
     """This flag is set to `True` for iBGP peers."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        raw_content = properties.get("statistics", None)
-        if raw_content is not None:
-            statistics = BGPPeersStatistics.from_raw_data(raw_content)
-            properties["statistics"] = statistics
-
-        return super(BGPPeers, cls).process_raw_data(raw_data)
-
 
 class BGPRouters(_BaseHNVModel):
 
@@ -2975,23 +3406,41 @@ class BGPRouters(_BaseHNVModel):
         is_required=False, is_read_only=False)
     """Indicates IP addresses to which BGP peering can be established."""
 
-    bgp_peers = model.Field(name="bgp_peers", key="bgpPeers",
-                            is_required=False, is_read_only=False)
+    bgp_peers = model.ListField(name="bgp_peers", key="bgpPeers",
+                                model_class=BGPPeers, is_required=False,
+                                is_read_only=False)
     """Collection of BGP peers associated with the BGP Routers resource."""
 
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
 
-        bgp_peers = []
-        for raw_content in properties.get("bgpPeers", []):
-            raw_content["parentResourceID"] = raw_data["resourceId"]
-            raw_content["grandParentResourceID"] = raw_data["parentResourceID"]
-            bgp_peers.append(BGPPeers.from_raw_data(raw_content))
-        properties["bgpPeers"] = bgp_peers
+class VirtualGateways(_BaseHNVModel):
+
+    """Model for virtual gateways.
+
+    The virtualGateways resource contains the configuration of the gateway
+    service of a tenant: its connections to the external networks and the
+    BGP routers used to exchange the routing information.
+    """
+
+    _endpoint = "/networking/v1/virtualGateways/{resource_id}"
+
+    bgp_routers = model.ListField(name="bgp_routers", key="bgpRouters",
+                                  model_class=BGPRouters, is_required=False,
+                                  is_read_only=False)
+    """Collection of BGP routers associated with the virtual gateway."""
+
+    gateway_pools = model.ListField(name="gateway_pools", key="gatewayPools",
+                                    model_class=Resource, is_required=False,
+                                    is_read_only=False)
+    """Indicates the gateway pools used by the virtual gateway."""
+
+    network_connections = model.ListField(
+        name="network_connections", key="networkConnections",
+        model_class=NetworkConnections, is_required=False, is_read_only=False)
+    """Collection of network connections of the virtual gateway."""
 
-        return super(BGPRouters, cls).process_raw_data(raw_data)
+    routing_type = model.Field(name="routing_type", key="routingType",
+                               is_required=False, is_read_only=False)
+    """Indicates the routing type of the virtual gateway."""
 
 
 class LoadBalancerManager(_BaseHNVModel):
@@ -3023,26 +3472,387 @@ class LoadBalancerManager(_BaseHNVModel):
     NOTE: There is no validation that these IP addresses are known by the
     Network Controller."""
 
-    vip_ip_pools = model.Field(
-        name="vip_ip_pools", key="vipIpPools",
-        is_property=True, is_required=True, is_read_only=False)
+    vip_ip_pools = model.ListField(name="vip_ip_pools", key="vipIpPools",
+                                   model_class=Resource, is_property=True,
+                                   is_required=True, is_read_only=False)
     """An array of references to ipPool resource that will be used for the
     frontend IP Addresses.
     """
     @classmethod
-    def get(cls, resource_id=None, parent_id=None, grandparent_id=None):
+    def get(cls, resource_id=None, parent_id=None, grandparent_id=None,
+            fields=None, where=None):
         """"Retrieves the required resource."""
-        return cls._get(resource_id, parent_id, grandparent_id)
-
-    @classmethod
-    def process_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        properties = raw_data.get("properties", {})
-
-        vip_ip_pools = []
-        for raw_content in properties.get("vipIpPools", []):
-            resource = Resource.from_raw_data(raw_content)
-            vip_ip_pools.append(resource)
-        properties["vipIpPools"] = vip_ip_pools
-
-        return super(LoadBalancerManager, cls).process_raw_data(raw_data)
+        return cls._get(resource_id, parent_id, grandparent_id, fields,
+                        where)
+
+
+def _get_references(resource):
+    """Collect the references held by the received resource.
+
+    The reference of the resource is also part of the result in order
+    to link it with its ancestors. The back-reference fields, maintained
+    by the server for the resources which point to the current one, are
+    ignored as they do not describe a dependency of the resource.
+    """
+    references = set([resource.resource_ref.lower()])
+    content = [resource]
+    while content:
+        item = content.pop()
+        if isinstance(item, model.Model):
+            for field in item._meta.fields.values():
+                if field.is_back_reference:
+                    continue
+                value = item._get_value(field.key)
+                if field.key == "resourceRef":
+                    if isinstance(value, six.string_types):
+                        references.add(value.lower())
+                else:
+                    content.append(value)
+        elif isinstance(item, dict):
+            reference = item.get("resourceRef")
+            if isinstance(reference, six.string_types):
+                references.add(reference.lower())
+            content.extend(item.values())
+        elif isinstance(item, list):
+            content.extend(item)
+    return references
+
+
+def _fetch_resource(model_cls, resource_id, parent_id, grandparent_id,
+                    fields):
+    """Retrieve a single resource, if it is still available."""
+    try:
+        resource = model_cls.get(resource_id=resource_id,
+                                 parent_id=parent_id,
+                                 grandparent_id=grandparent_id,
+                                 fields=fields)
+    except exception.NotFound:
+        return {}
+    return {(resource_id or "").lower(): resource}
+
+
+def _list_resources(model_cls, parent_id, grandparent_id, resource_ids,
+                    fields):
+    """Retrieve the required resources by listing their collection."""
+    models = {}
+    try:
+        for raw_data in model_cls._get_all_raw(parent_id, grandparent_id):
+            resource_id = (raw_data.get("resourceId") or "").lower()
+            if resource_id in resource_ids:
+                models[resource_id] = model_cls._from_response(
+                    raw_data, fields, parent_id=parent_id,
+                    grandparent_id=grandparent_id)
+    except exception.NotFound:
+        # The parent resource is not available anymore.
+        pass
+    return models
+
+
+def get_resources(references, fields=None):
+    """Retrieve the resources for multiple references at once.
+
+    :param references:  The `Resource` models or the resource references
+                        which should be resolved.
+    :param fields:      The names of the fields which should be loaded,
+                        all of them if it is not provided.
+
+    The references are grouped by the collection of the resources and
+    every resource is retrieved only once. The resources from the same
+    collection are retrieved in parallel, or by listing the collection
+    once when at least `bulk_listing_threshold` of them are required.
+
+    Returns a dictionary which maps the received references to the models
+    of the resources; the resources which are not available anymore are
+    missing from it.
+    """
+    required = {}
+    for reference in references:
+        resource_ref = getattr(reference, "resource_ref", reference)
+        route = _ROUTER.resolve(resource_ref)
+        if route is None:
+            raise exception.NotFound(
+                "No model available for %(resource_ref)r",
+                resource_ref=resource_ref)
+
+        model_cls, resource_id, parent_id, grandparent_id = route
+        resources = required.setdefault(
+            (model_cls, parent_id, grandparent_id), {})
+        resources.setdefault((resource_id or "").lower(),
+                             (resource_id, set()))[1].add(resource_ref)
+
+    threshold = CONFIG.HNV.bulk_listing_threshold
+    executor = futures.ThreadPoolExecutor(max_workers=CONFIG.HNV.max_workers)
+    try:
+        tasks = {}
+        for collection, resources in required.items():
+            model_cls, parent_id, grandparent_id = collection
+            listing = threshold and len(resources) >= threshold
+            if listing and "" not in resources:
+                task = executor.submit(_in_session(_list_resources),
+                                       model_cls,
+                                       parent_id, grandparent_id,
+                                       set(resources), fields)
+                tasks[task] = resources
+                continue
+
+            for key, (resource_id, _) in resources.items():
+                task = executor.submit(_in_session(_fetch_resource),
+                                       model_cls,
+                                       resource_id, parent_id,
+                                       grandparent_id, fields)
+                tasks[task] = {key: resources[key]}
+
+        result = {}
+        for task, resources in tasks.items():
+            for key, resource in task.result().items():
+                for resource_ref in resources[key][1]:
+                    result[resource_ref] = resource
+        return result
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _list_collection(model_cls, parent_id, grandparent_id):
+    """List the resources from a collection, if it is still available."""
+    try:
+        if "{resource_id}" not in model_cls._endpoint:
+            # The model describes a single resource, not a collection.
+            return [model_cls.get()]
+        return model_cls._get_all(parent_id, grandparent_id)
+    except exception.NotFound:
+        return []
+
+
+def crawl(model_classes=None, max_workers=None):
+    """Iterate over all the resources available in the Network Controller.
+
+    :param model_classes:   The models of the top-level resources from
+                            which the crawling starts, all of them if it
+                            is not provided.
+    :param max_workers:     The maximum number of concurrent requests, the
+                            value of the `max_workers` option is used if
+                            it is not provided.
+
+    The collections are listed in parallel, following the parent-child
+    relations of the endpoints, and the resources are returned as soon
+    as their collection is retrieved. The child resources embedded in
+    the content of their parents are used as they are, without listing
+    their collections again.
+    """
+    if model_classes is None:
+        model_classes = [info.model_cls for info in _MODELS
+                         if info.parent_endpoint is None]
+
+    list_collection = _in_session(_list_collection)
+    executor = futures.ThreadPoolExecutor(
+        max_workers=max_workers or CONFIG.HNV.max_workers)
+    tasks = set(executor.submit(list_collection, model_cls, None, None)
+                for model_cls in model_classes)
+    try:
+        while tasks:
+            done, tasks = futures.wait(
+                tasks, return_when=futures.FIRST_COMPLETED)
+            resources = collections.deque()
+            for task in done:
+                resources.extend(task.result())
+
+            while resources:
+                resource = resources.popleft()
+                yield resource
+
+                model_cls = type(resource)
+                info = _MODELS.get(model_cls)
+                if info is None:
+                    continue
+
+                embedded = {}
+                for field_name in info.child_fields:
+                    field = model_cls._meta.fields[field_name]
+                    embedded[field.model_class] = field_name
+
+                for child in _MODELS.get_children(model_cls):
+                    field_name = embedded.get(child.model_cls)
+                    if field_name is None:
+                        tasks.add(executor.submit(
+                            list_collection, child.model_cls,
+                            resource.resource_id, resource.parent_id))
+                        continue
+
+                    children = getattr(resource, field_name)
+                    if isinstance(children, list):
+                        resources.extend(children)
+                    elif children is not None:
+                        resources.append(children)
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=True)
+
+
+def _get_blockers(resources):
+    """Find out which resources have to be removed before each resource.
+
+    A resource can be removed only after all the resources that reference
+    it (or one of its descendants) were removed. The children of a
+    resource are blockers for their ancestors.
+    """
+    blockers = {}
+    for resource in resources:
+        blockers[resource.resource_ref.lower()] = set()
+
+    for resource in resources:
+        resource_ref = resource.resource_ref.lower()
+        for reference in _get_references(resource):
+            if reference.startswith(resource_ref + "/"):
+                # The resource contains its own child resources.
+                continue
+
+            segments = reference.split("/")
+            for index in range(len(segments), 1, -1):
+                target = "/".join(segments[:index])
+                if target != resource_ref and target in blockers:
+                    blockers[target].add(resource_ref)
+
+    return blockers
+
+
+def _get_provisioning_states(model_cls, parent_id, grandparent_id):
+    """Map the resources from a collection to their provisioning state."""
+    states = {}
+    try:
+        for raw_data in model_cls._get_all_raw(parent_id, grandparent_id):
+            properties = raw_data.get("properties", {})
+            states[raw_data.get("resourceId")] = properties.get(
+                "provisioningState")
+    except exception.NotFound:
+        # The parent resource is not available anymore.
+        pass
+    return states
+
+
+def _wait_for_removal(executor, resources, timeout):
+    """Wait until the received resources are not listed anymore.
+
+    Instead of polling every resource, the collections that contain them
+    are listed once per iteration.
+    """
+    remaining = {}
+    for resource in resources:
+        collection = (type(resource), resource.parent_id,
+                      resource.grandparent_id)
+        remaining.setdefault(collection, set()).add(resource.resource_id)
+
+    elapsed_time = 0
+    while True:
+        tasks = {}
+        for collection in remaining:
+            task = executor.submit(_get_provisioning_states, *collection)
+            tasks[task] = collection
+
+        for task, collection in tasks.items():
+            states = task.result()
+            pending = set(resource_id
+                          for resource_id in remaining[collection]
+                          if resource_id in states)
+            for resource_id in pending:
+                if states[resource_id] == constant.FAILED:
+                    raise exception.ServiceException(
+                        "Failed to complete the required operation.")
+            if pending:
+                LOG.debug("The resources %(resources)s are still available.",
+                          {"resources": ", ".join(pending)})
+                remaining[collection] = pending
+            else:
+                remaining.pop(collection)
+
+        if not remaining:
+            LOG.debug("The resources were successfully removed.")
+            break
+
+        elapsed_time += CONFIG.HNV.retry_interval
+        if timeout and elapsed_time > timeout:
+            raise exception.TimeOut("The request timed out.")
+        time.sleep(CONFIG.HNV.retry_interval)
+
+
+def _remove_level(executor, resources, wait, timeout):
+    """Remove in parallel resources that do not depend on each other."""
+    tasks = {}
+    for resource in resources:
+        task = executor.submit(_in_session(resource.remove),
+                               resource.resource_id,
+                               parent_id=resource.parent_id,
+                               grandparent_id=resource.grandparent_id,
+                               wait=False)
+        tasks[task] = resource
+
+    removed, errors = [], []
+    for task, resource in tasks.items():
+        try:
+            task.result()
+        except exception.NotFound:
+            LOG.debug("The resource %r was already removed.",
+                      resource.resource_ref)
+            removed.append(resource)
+        except (exception.NotSupported, exception.TimeOut):
+            raise
+        except Exception as exc:   # pylint: disable=broad-except
+            LOG.debug("Failed to remove %(resource)r: %(reason)s",
+                      {"resource": resource.resource_ref, "reason": exc})
+            errors.append(sys.exc_info())
+        else:
+            removed.append(resource)
+
+    if wait and removed:
+        _wait_for_removal(executor, removed, timeout)
+    return removed, errors
+
+
+def remove_resources(resources, wait=True, timeout=None):
+    """Delete multiple resources, honouring the references between them.
+
+    :param resources:   The models of the resources that should be removed.
+    :param wait:        Whether to wait until the operation is completed
+    :param timeout:     The maximum amount of time required for each
+                        set of resources to be removed.
+
+    The resources are removed in levels: a resource is removed only after
+    all the resources that reference it (or its descendants) are gone.
+    The resources from the same level are removed in parallel and the
+    deletion is confirmed by listing their collections.
+
+    When the references are circular the resources with the fewest
+    dependencies are removed first; the ones that cannot be removed yet
+    are retried as long as the other resources are removed successfully.
+    """
+    resources_map = {}
+    for resource in resources:
+        resources_map[resource.resource_ref.lower()] = resource
+    pending = _get_blockers(list(resources_map.values()))
+
+    executor = futures.ThreadPoolExecutor(max_workers=CONFIG.HNV.max_workers)
+    try:
+        while pending:
+            level = [reference for reference, blockers in pending.items()
+                     if not blockers]
+            if not level:
+                fewest = min(len(blockers) for blockers in pending.values())
+                level = [reference for reference, blockers in pending.items()
+                         if len(blockers) == fewest]
+                LOG.debug("Circular references found for %s",
+                          ", ".join(level))
+
+            removed, errors = _remove_level(
+                executor, [resources_map[reference] for reference in level],
+                wait=wait, timeout=timeout)
+            if not removed:
+                six.reraise(*errors[0])
+
+            removed = set(resource.resource_ref.lower()
+                          for resource in removed)
+            for reference in removed:
+                pending.pop(reference)
+            for blockers in pending.values():
+                blockers.difference_update(removed)
+    finally:
+        executor.shutdown(wait=True)
@@ -20,6 +20,8 @@ PUT = "PUT"
 PATCH = "PATCH"
 DELETE = "DELETE"
 
+MERGE_PATCH_CONTENT_TYPE = "application/merge-patch+json; charset=UTF-8"
+
 DELETING = "Deleting"
 FAILED = "Failed"
 SUCCEEDED = "Succeeded"
@@ -58,6 +58,14 @@ class DataProcessingError(HNVException):
     template = "The provided information is incomplete or invalid."
 
 
+class NotLoaded(DataProcessingError):
+
+    """The field was left out when the model was loaded."""
+
+    template = ("The field %(field)r was not loaded for %(model)s, the "
+                "model should be refreshed in order to use it.")
+
+
 class ServiceException(HNVException):
 
     """Base exception for all the API interaction related errors."""
@@ -96,3 +104,17 @@ class NotSupported(ServiceException):
     """The functionality required is not available in the current context."""
 
     template = "%(feature)s is not available for %(context)s."
+
+
+class PreconditionFailed(ServiceException):
+
+    """The resource was modified since it was retrieved."""
+
+    template = "The resource %(resource)r was modified in the meantime."
+
+
+class Conflict(ServiceException):
+
+    """The same fields were changed both locally and on the server."""
+
+    template = "The following fields were changed concurrently: %(fields)s."
@@ -16,7 +16,9 @@
 
 # pylint: disable=protected-access
 
+import collections
 import copy
+import threading
 
 from oslo_log import log as logging
 import six
@@ -25,6 +27,32 @@ from hnv.common import exception
 
 LOG = logging.getLogger(__name__)
 
+_NOT_SET = object()
+"""Marks the fields missing from the loaded state of a model."""
+
+_NOT_LOADED = object()
+"""Marks the fields which were left out when the model was loaded."""
+
+
+class _LazyValue(object):
+
+    """The raw content of a nested model which was not created yet.
+
+    The models are created from the raw content the first time the
+    field is used.
+    """
+
+    __slots__ = ("_field", "_raw_data", "_inherited")
+
+    def __init__(self, field, raw_data, inherited):
+        self._field = field
+        self._raw_data = raw_data
+        self._inherited = inherited
+
+    def load(self):
+        """Create the models for the raw content."""
+        return self._field.load(self._raw_data, self._inherited, lazy=True)
+
 
 class _FieldDescriptor(object):
 
@@ -37,6 +65,7 @@ class _FieldDescriptor(object):
     def __init__(self, field):
         self._field = field
         self._attribute = field.key
+        self._index = None
 
     @property
     def field(self):
@@ -44,9 +73,40 @@ class _FieldDescriptor(object):
         return self._field
 
     def __get__(self, instance, instance_type=None):
-        if instance is not None:
-            return instance._data.get(self._attribute)
-        return self._field
+        if instance is None:
+            return self._field
+
+        changes = instance._changes
+        if changes and self._attribute in changes:
+            return changes[self._attribute]
+
+        value = instance._data[self._index]
+        if value is _NOT_SET:
+            return None
+        if type(value) is _LazyValue:
+            value = instance._data[self._index] = value.load()
+        elif value is _NOT_LOADED:
+            raise exception.NotLoaded(field=self._field.name,
+                                      model=instance.__class__.__name__)
+
+        if not instance.provision_done:
+            return value
+
+        if isinstance(value, (list, dict)):
+            # The container can be changed in place, so a copy of it is
+            # handed out in order to keep the loaded state untouched.
+            value = _copy_containers(value, instance._shared, tracked=True)
+            instance._get_changes_container(modified=False)[
+                self._attribute] = value
+        elif isinstance(value, Model):
+            if instance._shared:
+                # The model is shared with the clones of the current one.
+                value = value.clone()
+            # The submodel can be changed by the caller, so it is copied
+            # for the clones of the current model created from now on.
+            instance._get_changes_container(modified=False)[
+                self._attribute] = value
+        return value
 
     def __set__(self, instance, value):
         if instance.provision_done:
@@ -54,10 +114,288 @@ class _FieldDescriptor(object):
                 raise TypeError("%r does not support item assignment" %
                                 self._field.name)
 
-        # Update the value of the field
-        instance._data[self._attribute] = value
-        # Keep track of the changes
-        instance._changes[self._attribute] = value
+        # Keep track of the changes, the loaded state remains untouched
+        instance._get_changes_container()[self._attribute] = value
+
+
+_CONTENT = "content"
+_DUMP = (True, False)
+"""The keys of the values cached by the models."""
+
+
+class _Counter(object):
+
+    """Counter which can be increased from multiple threads."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def increase(self):
+        """Increase the value of the counter."""
+        with self._lock:
+            self.value += 1
+
+
+_MODIFICATIONS = _Counter()
+"""Changes every time a model with cached values is modified."""
+
+
+def _notify_modification():
+    """Mark the values cached by the models as possibly outdated."""
+    _MODIFICATIONS.increase()
+
+
+def _tracked(method):
+    """Wrap a method which changes a container in place."""
+    def _method(self, *args, **kwargs):
+        _notify_modification()
+        return method(self, *args, **kwargs)
+    _method.__name__ = method.__name__
+    _method.__doc__ = method.__doc__
+    return _method
+
+
+class _TrackedList(list):
+
+    """List handed out by a model, which reports its modifications."""
+
+    __slots__ = ()
+
+
+class _TrackedDict(dict):
+
+    """Dictionary handed out by a model, which reports its modifications."""
+
+    __slots__ = ()
+
+
+for _name in ("__setitem__", "__delitem__", "__setslice__", "__delslice__",
+              "__iadd__", "__imul__", "append", "extend", "insert", "pop",
+              "remove", "reverse", "sort", "clear"):
+    if hasattr(list, _name):
+        setattr(_TrackedList, _name, _tracked(getattr(list, _name)))
+for _name in ("__setitem__", "__delitem__", "clear", "pop", "popitem",
+              "setdefault", "update"):
+    setattr(_TrackedDict, _name, _tracked(getattr(dict, _name)))
+del _name
+
+
+_LEAF_TYPES = frozenset((six.text_type, six.binary_type, float, bool,
+                         type(None)) + six.integer_types)
+"""The types of the values which are dumped as they are."""
+
+
+def _unpack(value, children):
+    """Obtain the raw representation of the received value.
+
+    :param children:  A list which receives a (model, key, content)
+                      item for each of the models found in the value.
+    """
+    if type(value) in _LEAF_TYPES:
+        return value
+
+    if isinstance(value, Model):
+        content = value._get_cached(_DUMP)
+        children.append((value, _DUMP, content))
+        return content
+
+    if isinstance(value, list):
+        for item in value:
+            if type(item) not in _LEAF_TYPES:
+                return [_unpack(item, children) for item in value]
+        return list(value)
+
+    if isinstance(value, dict):
+        for item in value.values():
+            if type(item) not in _LEAF_TYPES:
+                return dict((key, _unpack(item, children))
+                            for key, item in value.items())
+        return dict(value)
+
+    return value
+
+
+def _freeze(value, children):
+    """Get a hashable representation of the received value.
+
+    :param children:  A list which receives a (model, key, content)
+                      item for each of the models found in the value.
+    """
+    if type(value) in _LEAF_TYPES:
+        return value
+
+    if isinstance(value, Model):
+        content = value._get_cached(_CONTENT)
+        children.append((value, _CONTENT, content))
+        return content
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item, children) for item in value)
+
+    if isinstance(value, dict):
+        return frozenset((key, _freeze(item, children))
+                         for key, item in value.items())
+
+    return value
+
+
+Change = collections.namedtuple("Change", ["path", "old", "new"])
+"""A difference between two models.
+
+The `path` is a tuple with the names of the fields which lead to the
+changed value, and with the keys of the models from keyed lists. A
+model added to a keyed list has no `old` value, while a removed one
+has no `new` value.
+"""
+
+
+def _diff_models(new, old, path, changes, include_read_only):
+    """Collect the differences between two models of the same type."""
+    if not include_read_only:
+        # The content of the models leaves out the read-only fields.
+        new_content = new._get_cached(_CONTENT)
+        old_content = old._get_cached(_CONTENT)
+        if hash(new_content) == hash(old_content):
+            if new_content == old_content:
+                return
+
+    for field in new._meta.fields.values():
+        if field.is_volatile or field.is_back_reference:
+            continue
+        if field.is_read_only and not include_read_only:
+            continue
+
+        position = new._meta.positions[field.key]
+        new_value = new._get_current(position, field.key)
+        old_value = old._get_current(position, field.key)
+        if new_value is _NOT_LOADED or old_value is _NOT_LOADED:
+            continue
+        _diff_values(new_value, old_value, path + (field.name, ), changes,
+                     include_read_only)
+
+
+def _get_keyed_items(items):
+    """Map the models from the received list to their keys.
+
+    Returns `None` if the items can not be identified by their keys.
+    """
+    keyed_items = collections.OrderedDict()
+    for item in items:
+        if not isinstance(item, Model) or item._key_field is None:
+            return None
+        key = getattr(item, item._key_field)
+        if key is None or key in keyed_items:
+            return None
+        keyed_items[key] = item
+    return keyed_items
+
+
+def _diff_values(new, old, path, changes, include_read_only):
+    """Collect the differences between two values of a field."""
+    if type(new) in _LEAF_TYPES or type(old) in _LEAF_TYPES:
+        if new != old:
+            changes.append(Change(path, old, new))
+        return
+
+    if isinstance(new, Model) and type(new) is type(old):
+        _diff_models(new, old, path, changes, include_read_only)
+        return
+
+    if isinstance(new, list) and isinstance(old, list):
+        new_items = _get_keyed_items(new)
+        old_items = _get_keyed_items(old)
+        if new_items is not None and old_items is not None:
+            # The models are matched by their keys, their order is
+            # not relevant.
+            for key, item in new_items.items():
+                old_item = old_items.get(key)
+                if old_item is None:
+                    changes.append(Change(path + (key, ), None, item))
+                else:
+                    _diff_values(item, old_item, path + (key, ), changes,
+                                 include_read_only)
+            for key, item in old_items.items():
+                if key not in new_items:
+                    changes.append(Change(path + (key, ), item, None))
+            return
+
+    if _freeze(new, []) != _freeze(old, []):
+        changes.append(Change(path, old, new))
+
+
+def _copy_containers(value, clone_models=False, tracked=False):
+    """Copy the lists and dictionaries from the received value.
+
+    The models are shared, they keep track of their own changes, unless
+    `clone_models` is set. The `tracked` copies report their changes,
+    so the values cached by the models are checked again.
+    """
+    if isinstance(value, list):
+        items = [item if type(item) in _LEAF_TYPES
+                 else _copy_containers(item, clone_models, tracked)
+                 for item in value]
+        return _TrackedList(items) if tracked else items
+    if isinstance(value, dict):
+        items = {key: item if type(item) in _LEAF_TYPES
+                 else _copy_containers(item, clone_models, tracked)
+                 for key, item in value.items()}
+        return _TrackedDict(items) if tracked else items
+    if clone_models and isinstance(value, Model):
+        return value.clone()
+    return value
+
+
+def _is_modified(value, loaded_value):
+    """Check if the value differs from the loaded one."""
+    if isinstance(value, Model):
+        if value is loaded_value:
+            return bool(value._get_changes())
+        if not isinstance(loaded_value, Model):
+            return True
+        content = value._get_cached(_DUMP)
+        return content != loaded_value._get_cached(_DUMP)
+
+    if isinstance(value, (list, tuple)):
+        if not isinstance(loaded_value, (list, tuple)):
+            return True
+        if len(value) != len(loaded_value):
+            return True
+        for item, loaded_item in zip(value, loaded_value):
+            if _is_modified(item, loaded_item):
+                return True
+        return False
+
+    if isinstance(value, dict):
+        if not isinstance(loaded_value, dict):
+            return True
+        if set(value) != set(loaded_value):
+            return True
+        for key, item in value.items():
+            if _is_modified(item, loaded_value[key]):
+                return True
+        return False
+
+    return value != loaded_value
+
+
+def _get_snapshot(value, loaded=False):
+    """Get a plain representation of the received value.
+
+    :param loaded: whether to ignore the changes made on the models
+    """
+    if isinstance(value, Model):
+        fields = dict(value._get_loaded_items())
+        if not loaded and value._changes:
+            fields.update(value._changes)
+        return dict((key, _get_snapshot(item, loaded))
+                    for key, item in fields.items())
+    if isinstance(value, (list, tuple)):
+        return [_get_snapshot(item, loaded) for item in value]
+    if isinstance(value, dict):
+        return dict((key, _get_snapshot(item, loaded))
+                    for key, item in value.items())
+    return value
 
 
 class Field(object):
@@ -76,10 +414,20 @@ class Field(object):
                           propriety of the model. (default: `True`)
     :param is_read_only:  Whether the current piece of information can
                           be updated. (Default: `False`)
+    :param is_volatile:   Whether the current piece of information
+                          describes the state of the resource instead of
+                          its content, so it is not used when models are
+                          compared. (Default: `False`)
+    :param is_back_reference: Whether the current piece of information
+                              contains the references maintained by the
+                              server to the resources which point to the
+                              model, so it is not used when models are
+                              compared. (Default: `False`)
     """
 
     def __init__(self, name, key, default=None, is_required=False,
-                 is_property=True, is_read_only=False, is_static=False):
+                 is_property=True, is_read_only=False, is_static=False,
+                 is_volatile=False, is_back_reference=False):
         self._name = name
         self._key = key
         self._default = default
@@ -87,6 +435,8 @@ class Field(object):
         self._is_property = is_property
         self._is_read_only = is_read_only
         self._is_static = is_static
+        self._is_volatile = is_volatile
+        self._is_back_reference = is_back_reference
 
     @property
     def name(self):
@@ -123,6 +473,16 @@ class Field(object):
         """Whether the value of the current field can be changed."""
         return self._is_static
 
+    @property
+    def is_volatile(self):
+        """Whether the current field is ignored when comparing models."""
+        return self._is_volatile
+
+    @property
+    def is_back_reference(self):
+        """Whether the current field points back to other resources."""
+        return self._is_back_reference
+
     def add_to_class(self, model_class):
         """Replace the `Field` attribute with a named `_FieldDescriptor`.
 
@@ -133,6 +493,58 @@ class Field(object):
         setattr(model_class, self.name, _FieldDescriptor(self))
 
 
+class ModelField(Field):
+
+    """Field whose content is described by another model.
+
+    :param model_class:   The model used for the content of the field.
+    :param create_empty:  Whether to create an empty model when the field
+                          is missing from the raw data. (default: `False`)
+
+    The other parameters are the same as the ones used by `Field`.
+    """
+
+    def __init__(self, name, key, model_class, create_empty=False,
+                 **kwargs):
+        super(ModelField, self).__init__(name, key, **kwargs)
+        self._model_class = model_class
+        self._create_empty = create_empty
+
+    @property
+    def model_class(self):
+        """The model used for the content of the current field."""
+        return self._model_class
+
+    def load(self, raw_data, inherited=(), lazy=False):
+        """Create the model for the received raw data.
+
+        :param raw_data:   The raw content of the field.
+        :param inherited:  The values of the fields inherited from the
+                           model that contains the current field, as
+                           (position, value) pairs.
+        :param lazy:       Whether to postpone the creation of the models
+                           nested in the current one until they are used.
+        """
+        if raw_data is None:
+            if not self._create_empty:
+                return None
+            raw_data = {}
+        return self._model_class._load(raw_data, inherited, lazy)
+
+
+class ListField(ModelField):
+
+    """Field which contains a list of models.
+
+    A missing field is loaded as an empty list.
+    """
+
+    def load(self, raw_data, inherited=(), lazy=False):
+        """Create the models for the received raw data."""
+        load = self._model_class._load
+        return [load(item, inherited, lazy) for item in raw_data or ()]
+
+
 class _ModelOptions(object):
 
     """Container for all the model options.
@@ -149,11 +561,94 @@ class _ModelOptions(object):
         self._defaults = {}
         self._default_callables = {}
 
+        self._keys = ()
+        self._names = ()
+        self._positions = {}
+        self._storage = []
+        self._callables = ()
+        self._dump_fields = {}
+        self._content_fields = ()
+        self._parser = None
+        self._parsers = {}
+
     @property
     def fields(self):
         """All the available fields for the current model."""
         return self._fields
 
+    @property
+    def keys(self):
+        """The keys of the fields, in the order they are stored."""
+        return self._keys
+
+    @property
+    def names(self):
+        """The names of the fields, in the order they are stored."""
+        return self._names
+
+    @property
+    def positions(self):
+        """The position in the model storage for each field key."""
+        return self._positions
+
+    @property
+    def parser(self):
+        """The function used for loading the raw data into the storage."""
+        return self._parser
+
+    def set_layout(self):
+        """Assign to each field a position in the model storage."""
+        fields = sorted(self._fields.values(), key=lambda field: field.name)
+        self._keys = tuple(field.key for field in fields)
+        self._names = tuple(field.name for field in fields)
+        self._positions = dict((key, index)
+                               for index, key in enumerate(self._keys))
+        for field in fields:
+            descriptor = self._model_class.__dict__[field.name]
+            descriptor._index = self._positions[field.key]
+
+        # The values computed by the callable defaults are different for
+        # each model, so they are set only when the storage is created
+        # and only for the fields whose value is missing.
+        self._storage = [_NOT_SET] * len(self._keys)
+        for field_key, default in self._defaults.items():
+            self._storage[self._positions[field_key]] = default
+        self._callables = tuple(
+            (self._positions[field.key], field.name, field.default)
+            for field in fields if field.key in self._default_callables)
+        self._dump_fields = {}
+        self._content_fields = tuple(
+            (self._positions[field.key], field.key)
+            for field in fields if not any((field.is_volatile,
+                                            field.is_read_only,
+                                            field.is_back_reference)))
+
+    @property
+    def content_fields(self):
+        """The (position, key) items for the fields used when the models
+        are compared, the same ones as for `diff`."""
+        return self._content_fields
+
+    def get_dump_fields(self, include_read_only=True, include_static=False):
+        """Get the fields which are part of the dump of the model.
+
+        The result is a tuple of (position, key, is_property, is_required)
+        items, computed once for each combination of arguments.
+        """
+        flags = (include_read_only, include_static)
+        fields = self._dump_fields.get(flags)
+        if fields is None:
+            fields = []
+            for field in self._fields.values():
+                if field.is_read_only and not include_read_only:
+                    continue
+                if field.is_static and not include_static:
+                    continue
+                fields.append((self._positions[field.key], field.key,
+                               field.is_property, field.is_required))
+            fields = self._dump_fields[flags] = tuple(fields)
+        return fields
+
     def add_field(self, field):
         """Add the received field to the model."""
         self.remove_field(field.name)
@@ -181,6 +676,153 @@ class _ModelOptions(object):
             defaults[field_key] = default()
         return defaults
 
+    def set_parser(self):
+        """Create the function which loads the raw data of the model."""
+        self._parser = self._create_parser()
+        self._parsers = {}
+
+    def get_parser(self, field_names=None):
+        """Get the function which loads only the received fields.
+
+        :param field_names: The names of the fields which should be
+                            loaded, all of them if it is not provided.
+        """
+        if field_names is None:
+            return self._parser
+
+        field_names = frozenset(field_names)
+        parser = self._parsers.get(field_names)
+        if parser is None:
+            unknown = field_names.difference(self._fields)
+            if unknown:
+                raise exception.DataProcessingError(
+                    "Unknown fields %(fields)s for %(model)s.",
+                    fields=", ".join(sorted(unknown)), model=self._name)
+            parser = self._parsers[field_names] = self._create_parser(
+                field_names)
+        return parser
+
+    def _create_parser(self, field_names=None):
+        """Create the function which loads the raw data of the model.
+
+        All the information required for parsing is computed once, so
+        the function only has to copy the values in the model storage.
+
+        :param field_names: The names of the fields which should be
+                            loaded, the other ones are marked as not
+                            loaded.
+        """
+        fields, properties, submodels = [], [], []
+        known_fields, known_properties = set(["properties"]), set()
+        default_storage = list(self._storage)
+        default_callables = []
+        for field in self._fields.values():
+            position = self._positions[field.key]
+            if field.is_property:
+                known_properties.add(field.key)
+            else:
+                known_fields.add(field.key)
+
+            if field_names is not None and field.name not in field_names:
+                default_storage[position] = _NOT_LOADED
+                continue
+
+            if field.key in self._default_callables:
+                default_callables.append(
+                    (position, self._default_callables[field.key]))
+
+            if isinstance(field, ModelField):
+                # The values inherited from the current model by the
+                # models created for the field.
+                child_meta = field.model_class._meta
+                inherited = tuple(
+                    (child_meta.positions[child_meta.fields[name].key],
+                     self._positions[self._fields[source].key])
+                    for name, source in field.model_class._inherited_fields
+                    if source in self._fields and name in child_meta.fields)
+                submodels.append((position, field.key, field.is_property,
+                                  field, inherited))
+            elif field.is_property:
+                properties.append((position, field.key))
+            else:
+                fields.append((position, field.key))
+
+        callables = tuple(default_callables)
+        empty_storage = [_NOT_SET if value is not _NOT_LOADED else value
+                         for value in default_storage]
+        model_name = self._name
+
+        def parse(raw_data, overrides=(), defaults=True, lazy=False):
+            """Create the model storage for the received raw data.
+
+            :param raw_data:   The raw content of the model.
+            :param overrides:  The values which take precedence over the
+                               raw data, as (position, value) pairs.
+            :param defaults:   Whether to use the default values for the
+                               fields missing from the raw data.
+            :param lazy:       Whether to keep the raw content of the
+                               nested models until they are used.
+            """
+            storage = list(default_storage if defaults else empty_storage)
+            raw_properties = raw_data.get("properties") or {}
+            for position, key in fields:
+                value = raw_data.get(key)
+                if value or storage[position] is _NOT_SET:
+                    storage[position] = value
+
+            for position, key in properties:
+                value = raw_properties.get(key)
+                if value or storage[position] is _NOT_SET:
+                    storage[position] = value
+
+            if defaults:
+                for position, default in callables:
+                    if not storage[position]:
+                        storage[position] = default()
+
+            for position, value in overrides:
+                storage[position] = value
+
+            for position, key, is_property, field, inherited in submodels:
+                content = raw_properties if is_property else raw_data
+                content = content.get(key)
+                values = [(index, storage[source])
+                          for index, source in inherited]
+                if lazy and content:
+                    storage[position] = _LazyValue(field, content, values)
+                    continue
+
+                value = field.load(content, values, lazy)
+                if value or storage[position] is _NOT_SET:
+                    storage[position] = value
+
+            if LOG.isEnabledFor(logging.DEBUG):
+                unknown = set(raw_data) - known_fields
+                if unknown:
+                    LOG.debug("Unrecognized fields: %r for %r",
+                              sorted(unknown), model_name)
+                unknown = set(raw_properties) - known_properties
+                if unknown:
+                    LOG.debug("Unrecognized properties: %r for %r",
+                              sorted(unknown), model_name)
+
+            return storage
+
+        return parse
+
+    def get_storage(self, fields=None):
+        """Get the initial content of the storage for a new model.
+
+        :param fields:  The values received for the new model, the
+                        callable defaults are used only for the fields
+                        without a value.
+        """
+        storage = list(self._storage)
+        for position, field_name, default in self._callables:
+            if not fields or not fields.get(field_name):
+                storage[position] = default()
+        return storage
+
 
 class _BaseModel(type):
 
@@ -195,6 +837,10 @@ class _BaseModel(type):
                                                    _FieldDescriptor):
                     attrs[key] = copy.deepcopy(attribute.field)
 
+        # The models keep their content in the slots defined by the
+        # base model, so the instances do not need a `__dict__`.
+        attrs.setdefault("__slots__", ())
+
         # Initialize the new class and set the magic attributes
         cls = super(_BaseModel, mcs).__new__(mcs, name, bases, attrs)
 
@@ -205,6 +851,9 @@ class _BaseModel(type):
         for name, field in list(cls.__dict__.items()):
             if not name.startswith("_") and isinstance(field, Field):
                 field.add_to_class(cls)
+        cls._meta.set_layout()
+        cls._meta.set_parser()
+        cls._prepare_class()
 
         # Create string representation for the current model before finalizing
         setattr(cls, '__str__', lambda self: '%s' % cls.__name__)
@@ -214,54 +863,179 @@ class _BaseModel(type):
 @six.add_metaclass(_BaseModel)
 class Model(object):
 
-    """Container for meta information regarding the data structure."""
+    """Container for meta information regarding the data structure.
+
+    The state loaded from the API is kept apart from the changes made by
+    the user; the later ones are stored in `_changes` and the model is
+    considered modified only if they differ from the loaded state.
+
+    The loaded state is kept in `_data`, a list with a slot for each
+    field of the model, while `_changes` is created only when needed.
+    The content returned by `dump` and the one used for comparing models
+    are cached in `_cache` as long as the model and its submodels do not
+    change.
+
+    The loaded state and the submodels of a model are shared with its
+    clones, in which case `_shared` is set and the submodels are cloned
+    before they are handed out.
+    """
+
+    __slots__ = ("_data", "_changes", "_cache", "_shared",
+                 "_provision_done", "__weakref__")
+
+    _inherited_fields = ()
+    """The fields taken from the model which contains the current one,
+    as pairs of (field name, name of the field from the container)."""
+
+    _key_field = None
+    """The name of the field which identifies the model in a list."""
 
     def __init__(self, **fields):
-        self._data = self._meta.get_defaults()
-        self._changes = {}
+        self._data = self._meta.get_storage(fields)
+        self._changes = None
+        self._cache = None
+        self._shared = False
 
         self._provision_done = False
         self._set_fields(fields)
+        self._finalize()
         self._provision_done = True
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
+        if other is self:
+            return True
+
+        my_content = self._get_cached(_CONTENT)
+        other_content = other._get_cached(_CONTENT)
+        if hash(my_content) != hash(other_content):
+            return False
+        return my_content == other_content
 
-        my_properties = self.dump().get("properties", {})
-        other_properties = other.dump().get("properties", {})
-        for properties in (my_properties, other_properties):
-            for ignore_key in ("provisioningState", ):
-                properties.pop(ignore_key, None)
-        return my_properties == other_properties
+    def __hash__(self):
+        return self.fingerprint
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
-    def _unpack(self, value):
-        """Obtain the raw representation of the received object."""
-        if isinstance(value, Model):
-            return value.dump()
+    def _get_changes_container(self, modified=True):
+        """Get the container for the changes, creating it if needed.
 
-        if isinstance(value, list):
-            container_list = []
-            for item in value:
-                container_list.append(self._unpack(item))
-            return container_list
+        :param modified: Whether the model is changed. The copies of the
+                         loaded values handed out for reading are kept
+                         in the same container, but they do not change
+                         the model until they are updated.
+        """
+        if modified and self._cache is not None:
+            # The values cached by the models which contain the current
+            # one have to be checked again.
+            _notify_modification()
+        if self._changes is None:
+            self._changes = {}
+        return self._changes
+
+    def _get_loaded(self, key, default=None):
+        """Get the loaded value for the received field key."""
+        position = self._meta.positions[key]
+        value = self._data[position]
+        if type(value) is _LazyValue:
+            value = self._data[position] = value.load()
+        elif value is _NOT_SET or value is _NOT_LOADED:
+            return default
+        return value
 
-        if isinstance(value, dict):
-            container_dict = {}
-            for key, item in value.items():
-                container_dict[key] = self._unpack(item)
-            return container_dict
+    def _get_loaded_items(self):
+        """Get the (key, value) pairs from the loaded state."""
+        return [(key, self._get_loaded(key)) for key, value
+                in zip(self._meta.keys, self._data)
+                if value is not _NOT_SET and value is not _NOT_LOADED]
+
+    def _is_loaded(self, key):
+        """Whether the value of the received field key is available."""
+        if self._data[self._meta.positions[key]] is not _NOT_LOADED:
+            return True
+        return bool(self._changes) and key in self._changes
+
+    def _get_value(self, key):
+        """Get the current value for the received field key."""
+        if self._changes and key in self._changes:
+            return self._changes[key]
+        return self._get_loaded(key)
+
+    def _get_changes(self):
+        """Get the fields whose value differs from the loaded state."""
+        changes = {}
+        for key, value in (self._changes or {}).items():
+            loaded = self._get_loaded(key, _NOT_SET)
+            if loaded is _NOT_SET or _is_modified(value, loaded):
+                changes[key] = value
+
+        for key, value in zip(self._meta.keys, self._data):
+            # The submodels can be updated without the current model
+            # being aware of it, unless they were not created yet.
+            if isinstance(value, Model) and key not in (self._changes or {}):
+                if value._get_changes():
+                    changes[key] = value
+
+        return changes
+
+    def _get_base(self, keys):
+        """Get the loaded state of the received fields.
+
+        The fields which were not loaded are left out.
+        """
+        positions = self._meta.positions
+        return dict((key, _get_snapshot(self._get_loaded(key), loaded=True))
+                    for key in keys
+                    if self._data[positions[key]] is not _NOT_LOADED)
 
-        return value
+    def _merge_changes(self, changes, base):
+        """Apply the received changes on top of the loaded state.
+
+        :param changes: The changes made on an older state of the model.
+        :param base:    The older state of the changed fields, as returned
+                        by `_get_base`. The fields missing from it were
+                        not known, so they can not be in conflict.
+
+        :raises Conflict: if any of the changed fields was also updated
+                          in the loaded state.
+        """
+        conflicts = []
+        for key, value in changes.items():
+            if key not in base:
+                continue
+            current = _get_snapshot(self._get_loaded(key), loaded=True)
+            if current != base[key] and current != _get_snapshot(value):
+                conflicts.append(key)
+
+        if conflicts:
+            raise exception.Conflict(fields=", ".join(sorted(conflicts)))
+        self._get_changes_container().update(changes)
+
+    def _apply_changes(self):
+        """Make the changes part of the loaded state of the model."""
+        if not self._changes:
+            self._changes = None
+            return
+
+        positions = self._meta.positions
+        for key, value in self._changes.items():
+            self._data[positions[key]] = value
+        self._changes = None
+        if self._cache is not None:
+            _notify_modification()
+            self._cache = None
+
+    def _finalize(self):
+        """Complete the model after the value of its fields were set."""
+        pass
 
     def _set_fields(self, fields):
         """Set or update the fields value."""
         for field in self._meta.fields.values():
             value = fields.pop(field.name, None)
-            if field.key not in self._data or value:
+            if self._get_loaded(field.key, _NOT_SET) is _NOT_SET or value:
                 setattr(self, field.name, value)
 
         if fields:
@@ -269,42 +1043,127 @@ class Model(object):
 
     @classmethod
     def process_raw_data(cls, raw_data):
-        """Process the received data in order to be understood by the model."""
-        content = {}
-        properties = raw_data.pop("properties", {})
+        """Process the received data in order to be understood by the model.
 
-        for field_name, field in cls._meta.fields.items():
-            if field.is_property:
-                value = properties.pop(field.key, None)
-            else:
-                value = raw_data.pop(field.key, None)
-            content[field_name] = value
+        The received data is not changed, so it can be shared.
+        """
+        meta = cls._meta
+        return dict(zip(meta.names, meta.parser(raw_data, defaults=False)))
 
-        if raw_data:
-            LOG.debug("Unrecognized fields: %r for %r",
-                      raw_data, cls.__name__)
+    @classmethod
+    def _load(cls, raw_data, overrides=(), lazy=False, field_names=None):
+        """Create a new model using raw API response.
+
+        :param overrides:   The values which take precedence over the
+                            raw data, as (position, value) pairs.
+        :param lazy:        Whether to create the nested models only
+                            when they are used.
+        :param field_names: The names of the fields which should be
+                            loaded, all of them if it is not provided.
+        """
+        meta = cls._meta
+        if cls.process_raw_data.__func__ is not _PROCESS_RAW_DATA:
+            content = cls.process_raw_data(raw_data)
+            for position, value in overrides:
+                content[meta.names[position]] = value
+            model = cls(**content)
+            # The received content represents the loaded state of the model
+            model._apply_changes()
+            return model
+
+        model = cls.__new__(cls)
+        parser = meta.get_parser(field_names)
+        model._data = parser(raw_data, overrides, lazy=lazy)
+        model._changes = None
+        model._cache = None
+        model._shared = False
+        model._provision_done = False
+        model._finalize()
+        # The received content represents the loaded state of the model
+        model._apply_changes()
+        model._provision_done = True
+        return model
 
-        if properties:
-            LOG.debug("Unrecognized properties: %r for %r",
-                      properties, cls.__name__)
+    @classmethod
+    def from_raw_data(cls, raw_data, **fields):
+        """Create a new model using raw API response.
 
-        return content
+        :param raw_data:  The raw content of the model.
+        :param fields:    Values for some of the fields, which take
+                          precedence over the ones from the raw data.
+
+        .. note::
+            The content is loaded directly in the storage of the model
+            so the `__init__` method is not called, unless the model
+            has its own `process_raw_data` method.
+
+            If `_lazy_loading` is enabled, the nested models keep their
+            raw content until the first time they are used.
+        """
+        return cls.from_partial_data(raw_data, None, **fields)
+
+    @classmethod
+    def from_partial_data(cls, raw_data, field_names, **fields):
+        """Create a new model which contains only some of the fields.
+
+        :param raw_data:     The raw content of the model.
+        :param field_names:  The names of the fields which should be
+                             loaded. Reading one of the other fields
+                             raises `NotLoaded`.
+        :param fields:       Values for some of the fields, which take
+                             precedence over the ones from the raw data.
+        """
+        return cls._load(raw_data, cls._get_overrides(fields),
+                         cls._lazy_loading(), field_names)
 
     @classmethod
-    def from_raw_data(cls, raw_data):
-        """Create a new model using raw API response."""
-        content = cls.process_raw_data(raw_data)
-        return cls(**content)
+    def _get_overrides(cls, fields):
+        """Get the (position, value) pairs for the received fields."""
+        meta = cls._meta
+        overrides = []
+        for field_name, value in fields.items():
+            field = meta.fields.get(field_name)
+            if field is None:
+                LOG.debug("Ignored field: %r", field_name)
+                continue
+            overrides.append((meta.positions[field.key], value))
+        return overrides
+
+    @classmethod
+    def _prepare_class(cls):
+        """Complete the setup of the model class.
+
+        Called by the metaclass, once for every new model, after its
+        fields were processed.
+        """
+        pass
+
+    @classmethod
+    def _lazy_loading(cls):
+        """Whether to create the nested models only when they are used."""
+        return False
 
     @property
     def provision_done(self):
         """Whether the creation of the model is complete."""
         return self._provision_done
 
+    def is_loaded(self, field_name=None):
+        """Whether the received field was loaded.
+
+        :param field_name: The name of the field, if it is not provided
+                           the result refers to all the fields.
+        """
+        if field_name is not None:
+            return self._is_loaded(self._meta.fields[field_name].key)
+        return all(self._is_loaded(key) for key in self._meta.keys)
+
     def validate(self):
         """Check if the current model was properly created."""
         for field_name, field in self._meta.fields.items():
-            if field.is_required and self._data.get(field.name) is None:
+            if not self._is_loaded(field.key):
+                continue
+            if field.is_required and self._get_value(field.key) is None:
                 raise exception.DataProcessingError(
                     "The required field %(field)r is missing.",
                     field=field_name)
@@ -312,38 +1171,266 @@ class Model(object):
     def update(self, fields=None):
         """Update the value of one or more fields."""
         if fields and isinstance(fields, dict):
+            changes = self._get_changes_container()
             for field_name, field in self._meta.fields.items():
                 if field_name in fields:
-                    self._changes[field.key] = fields[field_name]
-        self._data.update(self._changes)
+                    changes[field.key] = fields[field_name]
 
     def commit(self, if_match=None, wait=False, timeout=None):
         """Apply all the changes on the current model."""
         # pylint: disable=unused-argument
-        self._data.update(self._changes)
-        self._changes.clear()
+        self._apply_changes()
 
-    def dump(self, include_read_only=True, include_static=False):
-        """Create a dictionary with the content of the current model."""
-        content = {}
-        for field in self._meta.fields.values():
-            if field.is_read_only and not include_read_only:
+    def _get_cached(self, key):
+        """Get a value computed from the content of the model.
+
+        :param key: The kind of the value: `_CONTENT` or the flags used
+                    for `_dump`.
+
+        The value is cached only while the model has no changes; the
+        copies of the loaded values handed out for reading are not
+        changes until they are updated. It is reused right away if no
+        model, or copy handed out by a model, was changed in the
+        meantime, otherwise only if the model is still unchanged and the
+        submodels used for it still have the same values.
+        """
+        # The modifications made while the value is computed make it
+        # outdated right away.
+        modifications = _MODIFICATIONS.value
+        cache = self._cache
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            value, children, cached_modifications = cached
+            if cached_modifications == modifications:
+                return value
+            if not self._is_changed():
+                for model, child_key, child_value in children:
+                    if model._get_cached(child_key) is not child_value:
+                        break
+                else:
+                    cache[key] = (value, children, self._check_children(
+                        children, modifications))
+                    return value
+
+        children = []
+        if key == _CONTENT:
+            value = self._build_content(children)
+        else:
+            value = self._build_dump(key, children)
+
+        if not self._is_changed():
+            if self._cache is None:
+                self._cache = {}
+            self._cache[key] = (value, children,
+                                self._check_children(children,
+                                                     modifications))
+        return value
+
+    def _is_changed(self):
+        """Whether the model differs from its loaded state.
+
+        The containers received from the user do not report their
+        changes, so they are considered changes as they are.
+        """
+        if not self._changes:
+            return False
+        for value in self._changes.values():
+            if isinstance(value, (_TrackedList, _TrackedDict)):
                 continue
+            if isinstance(value, (list, dict)):
+                return True
+        return bool(self._get_changes())
+
+    @staticmethod
+    def _check_children(children, modifications):
+        """Get the received value of `_MODIFICATIONS` if the values of
+        all the submodels are cached for it, otherwise `None`."""
+        for model, child_key, _ in children:
+            cached = model._cache and model._cache.get(child_key)
+            if not cached or cached[2] != modifications:
+                return None
+        return modifications
+
+    def _get_current(self, position, key):
+        """Get the current value of a field, or `_NOT_LOADED`."""
+        changes = self._changes
+        if changes and key in changes:
+            return changes[key]
+
+        value = self._data[position]
+        if value is _NOT_SET:
+            return None
+        if type(value) is _LazyValue:
+            value = self._data[position] = value.load()
+        return value
+
+    def _build_content(self, children):
+        """Create a hashable representation of the content of the model.
+
+        The volatile, the read-only and the back-reference fields are
+        ignored.
+        """
+        content = []
+        for position, key in self._meta.content_fields:
+            value = self._get_current(position, key)
+            if value is not None and value is not _NOT_LOADED:
+                content.append((key, _freeze(value, children)))
+        return frozenset(content)
+
+    @property
+    def fingerprint(self):
+        """A hash of the content of the model, the volatile, the
+        read-only and the back-reference fields are ignored.
 
-            if field.is_static and not include_static:
+        The value is computed again only if the model was changed. As
+        for the built-in hashes, the value is valid only for the current
+        process.
+        """
+        # The hash of the frozen content is computed only once.
+        return hash(self._get_cached(_CONTENT))
+
+    def _dump(self, include_read_only=True, include_static=False):
+        """Create a dictionary with the content of the current model.
+
+        The content is cached while the model and its submodels are
+        not changed, so it should not be updated by the caller.
+        """
+        return self._get_cached((include_read_only, include_static))
+
+    def _build_dump(self, flags, children):
+        """Create a dictionary with the content of the current model."""
+        content = {}
+        for position, key, is_property, is_required in (
+                self._meta.get_dump_fields(*flags)):
+            value = self._get_current(position, key)
+            if value is _NOT_LOADED:
+                # The value of this field is not known
                 continue
 
-            value = self._unpack(self._data.get(field.key))
-            if not field.is_required and value is None:
+            if value is None and not is_required:
                 # The value of this field is not relevant
                 continue
 
-            if field.is_property:
+            value = _unpack(value, children)
+            if is_property:
                 # The current field is a property and its value should
                 # be stored into the `properties` key.
-                properties = content.setdefault("properties", {})
-                properties[field.key] = value
+                content.setdefault("properties", {})[key] = value
             else:
-                content[field.key] = value
+                content[key] = value
 
         return content
+
+    def clone(self):
+        """Create a copy of the current model.
+
+        The copy shares the loaded state and the submodels with the
+        current model, they are copied only when one of them is
+        handed out in order to be changed. The submodels which were
+        already handed out are copied right away.
+        """
+        model = self.__class__.__new__(self.__class__)
+        model._data = list(self._data)
+        model._changes = None
+        if self._changes:
+            model._changes = _copy_containers(self._changes,
+                                              clone_models=True,
+                                              tracked=True)
+        model._cache = dict(self._cache) if self._cache else None
+        model._shared = self._shared = True
+        model._provision_done = self._provision_done
+        return model
+
+    def diff(self, other, include_read_only=False):
+        """Get the differences between the current model and another one.
+
+        :param other:               The model which is compared with the
+                                    current one, usually the state
+                                    received from the API.
+        :param include_read_only:   Whether to compare the fields that can
+                                    not be updated.
+
+        The result is a list of `Change` items with the values from the
+        other model as `old` and the values from the current model as
+        `new`. The volatile fields and the back-references are ignored,
+        the nested models are compared field by field and the lists of
+        models with a `_key_field` are compared by matching their keys.
+        """
+        changes = []
+        if type(other) is not type(self):
+            changes.append(Change((), other, self))
+        else:
+            _diff_models(self, other, (), changes, include_read_only)
+        return changes
+
+    def apply_diff(self, changes):
+        """Apply the changes returned by `diff` on the current model.
+
+        Only the fields which lead to the changed values are updated,
+        so committing the model with a merge patch sends only them.
+        """
+        for change in changes:
+            if not change.path:
+                raise exception.DataProcessingError(
+                    "The whole model was replaced.")
+
+            container, path = self, change.path
+            while len(path) > 1:
+                value = getattr(container, path[0])
+                if isinstance(value, Model):
+                    container, path = value, path[1:]
+                    continue
+
+                items = _get_keyed_items(value or [])
+                if items is None or (len(path) > 2 and path[1] not in items):
+                    raise exception.DataProcessingError(
+                        "The value of %(path)r can not be changed.",
+                        path=change.path)
+
+                if len(path) > 2:
+                    container, path = items[path[1]], path[2:]
+                    continue
+
+                # A model is added, replaced or removed from the list
+                old_item = items.get(path[1])
+                value[:] = [item for item in value if item is not old_item]
+                if change.new is not None:
+                    value.append(change.new)
+                break
+            else:
+                setattr(container, path[0], change.new)
+
+    def dump(self, include_read_only=True, include_static=False,
+             changes_only=False):
+        """Create a dictionary with the content of the current model.
+
+        :param include_read_only:   Whether to include the fields that can
+                                    not be updated.
+        :param include_static:      Whether to include the fields whose
+                                    value can not be changed.
+        :param changes_only:        Whether to include only the fields
+                                    that were changed. The fields which
+                                    were cleared are kept in order to
+                                    be removed by the API.
+        """
+        if not changes_only:
+            return _copy_containers(self._dump(include_read_only,
+                                               include_static))
+
+        content = {}
+        changes = self._get_changes()
+        for _, key, is_property, _ in self._meta.get_dump_fields(
+                include_read_only, include_static):
+            if key not in changes:
+                continue
+
+            value = _unpack(self._get_value(key), [])
+            if is_property:
+                content.setdefault("properties", {})[key] = value
+            else:
+                content[key] = value
+
+        return content
+
+
+_PROCESS_RAW_DATA = Model.process_raw_data.__func__
@@ -0,0 +1,259 @@
+# Copyright 2017 Cloudbase Solutions Srl
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Predicates used for filtering the raw content of the resources.
+
+The predicates are evaluated on the raw content received from the API,
+before the models are created, and can also be translated into an OData
+`$filter` expression for the API which supports it.
+
+Example:
+::
+    where = query.Equal("resourceMetadata.tenantId", "tenant-1")
+    where &= query.Prefix("properties.privateMacAddress", "00-15-5D")
+"""
+
+import abc
+
+import six
+
+from hnv.common import exception
+
+_MISSING = object()
+
+
+def _get_values(raw_data, keys):
+    """Get the values found at the received path in the raw content.
+
+    If a list is found on the path, the values are taken from all its
+    items.
+    """
+    items = [raw_data]
+    for key in keys:
+        values = []
+        for item in items:
+            if isinstance(item, list):
+                values.extend(element.get(key, _MISSING)
+                              for element in item
+                              if isinstance(element, dict))
+            elif isinstance(item, dict):
+                values.append(item.get(key, _MISSING))
+        items = [value for value in values if value is not _MISSING]
+
+    values = []
+    for item in items:
+        if isinstance(item, list):
+            values.extend(item)
+        else:
+            values.append(item)
+    return values
+
+
+def _odata_literal(value):
+    """Get the OData representation of the received value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, six.string_types):
+        return "'%s'" % value.replace("'", "''")
+    return str(value)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Predicate(object):
+
+    """Base class for the predicates on a field of the raw content.
+
+    :param path:    The path of the field, the keys from the raw content
+                    separated by dots (for example `properties.port`).
+
+    The predicate is true if one of the values found at the received path
+    matches it.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._keys = tuple(path.split("."))
+
+    @property
+    def path(self):
+        """The path of the field used by the predicate."""
+        return self._path
+
+    def __call__(self, raw_data):
+        for value in _get_values(raw_data, self._keys):
+            if self._match(value):
+                return True
+        return False
+
+    def __and__(self, other):
+        return All(self, other)
+
+    @abc.abstractmethod
+    def _match(self, value):
+        """Check if the received value matches the predicate."""
+        pass
+
+    def _odata_path(self):
+        """The path of the field in an OData expression."""
+        return "/".join(self._keys)
+
+    @abc.abstractmethod
+    def to_odata(self):
+        """Get the OData `$filter` expression for the predicate."""
+        pass
+
+
+class Equal(Predicate):
+
+    """The value of the field is equal to the received one."""
+
+    def __init__(self, path, value):
+        super(Equal, self).__init__(path)
+        self._value = value
+
+    def _match(self, value):
+        return value == self._value
+
+    def to_odata(self):
+        """Get the OData `$filter` expression for the predicate."""
+        return "%s eq %s" % (self._odata_path(), _odata_literal(self._value))
+
+
+class In(Predicate):
+
+    """The value of the field is one of the received ones."""
+
+    def __init__(self, path, values):
+        super(In, self).__init__(path)
+        self._values = tuple(values)
+        try:
+            self._lookup = frozenset(self._values)
+        except TypeError:
+            self._lookup = self._values
+
+    def _match(self, value):
+        try:
+            return value in self._lookup
+        except TypeError:
+            # The value is not hashable.
+            return value in self._values
+
+    def to_odata(self):
+        """Get the OData `$filter` expression for the predicate."""
+        path = self._odata_path()
+        return "(%s)" % " or ".join(
+            "%s eq %s" % (path, _odata_literal(value))
+            for value in self._values)
+
+
+class Prefix(Predicate):
+
+    """The value of the field starts with the received prefix."""
+
+    def __init__(self, path, prefix):
+        super(Prefix, self).__init__(path)
+        self._prefix = prefix
+
+    def _match(self, value):
+        if not isinstance(value, six.string_types):
+            return False
+        return value.startswith(self._prefix)
+
+    def to_odata(self):
+        """Get the OData `$filter` expression for the predicate."""
+        return "startswith(%s, %s)" % (self._odata_path(),
+                                       _odata_literal(self._prefix))
+
+
+class All(object):
+
+    """All the received predicates are true."""
+
+    def __init__(self, *predicates):
+        self._predicates = []
+        for predicate in predicates:
+            if isinstance(predicate, All):
+                self._predicates.extend(predicate.predicates)
+            else:
+                self._predicates.append(predicate)
+
+    @property
+    def predicates(self):
+        """The predicates which should be true."""
+        return tuple(self._predicates)
+
+    def __call__(self, raw_data):
+        for predicate in self._predicates:
+            if not predicate(raw_data):
+                return False
+        return True
+
+    def __and__(self, other):
+        return All(self, other)
+
+    def to_odata(self):
+        """Get the OData `$filter` expression for the predicates."""
+        return " and ".join("(%s)" % predicate.to_odata()
+                            for predicate in self._predicates)
+
+
+def select(where, function):
+    """Get the predicates whose path is accepted by the received function.
+
+    :param where:       The filter, as described by `build`.
+    :param function:    Receives the path of each predicate and returns
+                        whether the predicate should be kept.
+
+    Returns None if none of the predicates is kept.
+    """
+    where = build(where)
+    if where is None:
+        return None
+
+    predicates = where.predicates if isinstance(where, All) else [where]
+    predicates = [predicate for predicate in predicates
+                  if function(predicate.path)]
+    if not predicates:
+        return None
+    return All(*predicates)
+
+
+def build(where):
+    """Build the predicate described by the received value.
+
+    :param where:   A predicate, a dictionary which maps the field paths
+                    to the expected values, or a list with any of them,
+                    in which case all of them should be true.
+
+    Returns None if the value does not describe any condition.
+    """
+    if where is None or isinstance(where, (Predicate, All)):
+        return where
+
+    if isinstance(where, dict):
+        predicates = [Equal(path, value)
+                      for path, value in sorted(where.items())]
+    elif isinstance(where, (list, tuple)):
+        predicates = [build(item) for item in where]
+        predicates = [predicate for predicate in predicates
+                      if predicate is not None]
+    else:
+        raise exception.DataProcessingError(
+            "Invalid filter %(where)r.", where=where)
+
+    if not predicates:
+        return None
+    return All(*predicates)
@@ -16,6 +16,7 @@
 
 import json
 import sys
+import threading
 import time
 
 from oslo_log import log as logging
@@ -53,7 +54,8 @@ class _HNVClient(object):
         self._credentials = (username, password)
         self._https_allow_insecure = allow_insecure
         self._https_ca_bundle = ca_bundle
-        self._http_session = None
+        self._local = threading.local()
+        self._merge_patch = True
 
     @property
     def _session(self):
@@ -65,18 +67,22 @@ class _HNVClient(object):
         So if you're making several requests to the same host, the underlying
         TCP connection will be reused, which can result in a significant
         performance increase.
+
+        Each thread uses its own session, as the sessions are not meant
+        to be shared between threads.
         """
-        if self._http_session is None:
-            self._http_session = requests.Session()
-            self._http_session.headers.update(self._get_headers())
-            self._http_session.verify = self._verify_https_request()
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self._get_headers())
+            session.verify = self._verify_https_request()
 
             if all(self._credentials):
                 username, password = self._credentials
-                self._http_session.auth = requests_ntlm.HttpNtlmAuth(
+                session.auth = requests_ntlm.HttpNtlmAuth(
                     username=username, password=password)
 
-        return self._http_session
+        return session
 
     @staticmethod
     def _get_headers():
@@ -105,15 +111,22 @@ class _HNVClient(object):
             return not self._https_allow_insecure
 
     def _http_request(self, resource, method=constant.GET, body=None,
-                      if_match=False):
+                      if_match=False, headers=None):
         if not resource.startswith("http"):
             url = requests.compat.urljoin(self._base_url, resource)
         else:
             url = resource
 
+        extra_headers = headers
         headers = self._get_headers()
+        headers.update(extra_headers or {})
+        if method == constant.PATCH:
+            headers["Content-Type"] = constant.MERGE_PATCH_CONTENT_TYPE
+
         if method in (constant.PUT, constant.PATCH):
-            if if_match:
+            if isinstance(if_match, six.string_types):
+                headers["If-Match"] = if_match
+            elif if_match:
                 etag = (body or {}).get("etag", None)
                 if etag is not None:
                     headers["If-Match"] = etag
@@ -130,7 +143,7 @@ class _HNVClient(object):
             except (requests.ConnectionError,
                     requests.RequestException) as exc:
                 attemts += 1
-                self._http_session = None
+                self._local.session = None
                 LOG.debug("Request failed: %s", exc)
                 if attemts > CONFIG.HNV.retry_count:
                     if isinstance(exc, requests.exceptions.SSLError):
@@ -157,13 +170,26 @@ class _HNVClient(object):
             if status_code == 404:
                 raise exception.NotFound(
                     "Resource %(resource)r was not found.", resource=resource)
+            if status_code == 405:
+                raise exception.NotSupported(feature=method, context=resource)
+            if status_code == 412:
+                raise exception.PreconditionFailed(resource=resource)
             raise
 
         return response
 
-    def get_resource(self, path):
-        """Getting the required information from the API."""
-        response = self._http_request(path)
+    def get_resource(self, path, headers=None):
+        """Getting the required information from the API.
+
+        :param path:    The path of the resource.
+        :param headers: Additional HTTP headers for the request.
+
+        Returns None if the resource was not modified, when the request
+        is conditioned by the `If-None-Match` header.
+        """
+        response = self._http_request(path, headers=headers)
+        if response.status_code == 304:
+            return None
         try:
             return response.json()
         except ValueError:
@@ -178,6 +204,30 @@ class _HNVClient(object):
         except ValueError:
             raise exception.ServiceException("Invalid service response.")
 
+    def patch_resource(self, path, data, if_match=None):
+        """Update only the received fields of the required resource.
+
+        The content is sent as a JSON merge patch (RFC 7396). If the
+        Network Controller does not accept the PATCH requests the
+        `NotSupported` exception is raised and the following calls will
+        fail without contacting the API.
+        """
+        if not self._merge_patch:
+            raise exception.NotSupported(feature=constant.PATCH,
+                                         context=self._base_url)
+        try:
+            response = self._http_request(resource=path,
+                                          method=constant.PATCH,
+                                          body=data, if_match=if_match)
+        except exception.NotSupported:
+            self._merge_patch = False
+            raise
+
+        try:
+            return response.json()
+        except ValueError:
+            raise exception.ServiceException("Invalid service response.")
+
     def remove_resource(self, path):
         """Delete the received resource."""
         return self._http_request(path, method="DELETE")
@@ -59,6 +59,48 @@ class HVNOptions(config_base.Options):
                 "http_request_timeout", default=None,
                 help=("Number of seconds until network requests stop waiting "
                       "for a response")),
+            cfg.IntOpt(
+                "max_workers", default=8,
+                help=("Max. number of concurrent requests issued by "
+                      "the bulk operations")),
+            cfg.IntOpt(
+                "bulk_listing_threshold", default=10, min=0,
+                help=("Min. number of resources from the same collection "
+                      "which are retrieved by listing the collection once, "
+                      "instead of a request for each of them (0 disables "
+                      "the listing)")),
+            cfg.BoolOpt(
+                "merge_patch", default=False,
+                help=("Whether to update the existing resources by sending "
+                      "only the changed fields as a JSON merge patch, when "
+                      "the Network Controller supports it.")),
+            cfg.BoolOpt(
+                "lazy_loading", default=False,
+                help=("Whether to create the nested resources only when "
+                      "they are used, instead of when the resource is "
+                      "retrieved.")),
+            cfg.FloatOpt(
+                "negative_cache_ttl", default=0, min=0,
+                help=("Number of seconds for which a resource that was not "
+                      "found is reported as missing without querying the "
+                      "Network Controller API again (0 disables the "
+                      "cache)")),
+            cfg.BoolOpt(
+                "odata_filter", default=False,
+                help=("Whether to send the filters used for listing the "
+                      "resources as OData $filter query options, when "
+                      "the Network Controller supports them. The filters "
+                      "are always applied by the client as well.")),
+            cfg.IntOpt(
+                "page_size", default=0, min=0,
+                help=("Max. number of resources requested for each page of "
+                      "a listing, through the `Prefer: odata.maxpagesize` "
+                      "header (0 lets the Network Controller decide)")),
+            cfg.IntOpt(
+                "prefetch_depth", default=0, min=0,
+                help=("Number of pages of a listing which are retrieved in "
+                      "a background thread while the current page is "
+                      "processed (0 disables the prefetching)")),
             cfg.StrOpt(
                 "logical_network", default=None,
                 help=("Logical network to use as a medium for tenant network "
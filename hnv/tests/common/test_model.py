@@ -23,23 +23,53 @@ except ImportError:
 
 from hnv.common import exception
 from hnv.common import model
+from hnv.tests import utils as test_utils
 
 
 class TestFieldDescriptor(unittest.TestCase):
 
-    def test_field_access(self):
+    @staticmethod
+    def _get_instance(data):
         instance = mock.Mock()
+        instance._data = data
+        instance._changes = {}
+        instance._get_changes_container.return_value = instance._changes
+        return instance
+
+    def test_field_access(self):
+        instance = self._get_instance([mock.sentinel.loaded])
         field = mock.Mock()
+        field.key = mock.sentinel.key
         field_descriptor = model._FieldDescriptor(field)
+        field_descriptor._index = 0
 
         self.assertIs(field, field_descriptor.__get__(None))
+        self.assertIs(field_descriptor.__get__(instance),
+                      mock.sentinel.loaded)
+
+        instance._changes[field.key] = mock.sentinel.changed
+        self.assertIs(field_descriptor.__get__(instance),
+                      mock.sentinel.changed)
+
+        instance._data[0] = model._NOT_SET
+        instance._changes.clear()
+        self.assertIsNone(field_descriptor.__get__(instance))
 
-        field_descriptor.__get__(instance)
-        instance._data.get.assert_called_once_with(field.key)
+    def test_field_access_container(self):
+        instance = self._get_instance([[{"key": [1]}]])
+        field = mock.Mock()
+        field.key = mock.sentinel.key
+        field_descriptor = model._FieldDescriptor(field)
+        field_descriptor._index = 0
+
+        value = field_descriptor.__get__(instance)
+        value[0]["key"].append(2)
+
+        self.assertEqual(instance._data[0], [{"key": [1]}])
+        self.assertIs(instance._changes[field.key], value)
 
     def test_set_field(self):
-        instance = mock.MagicMock()
-        instance._changes = {}
+        instance = self._get_instance([])
 
         field = mock.Mock()
         field.is_read_only = False
@@ -171,6 +201,35 @@ class TestBaseModel(unittest.TestCase):
         self.assertTrue(hasattr(_Test, "_meta"))
         self.assertEqual(_Test().field1, 1)
 
+    def test_compact_storage(self):
+
+        class _Test(model.Model):
+            field2 = model.Field(name="field2", key="key2", default=2)
+            field1 = model.Field(name="field1", key="key1")
+
+        test = _Test.from_raw_data({"properties": {"key1": 1}})
+
+        self.assertFalse(hasattr(test, "__dict__"))
+        self.assertEqual(_Test._meta.keys, ("key1", "key2"))
+        self.assertEqual(test._data, [1, 2])
+        self.assertIsNone(test._changes)
+        self.assertRaises(AttributeError, setattr, test, "field3", 3)
+
+    def test_callable_defaults(self):
+        default = mock.Mock(return_value="default")
+
+        class _Test(model.Model):
+            field1 = model.Field(name="field1", key="key1", default=default)
+
+        self.assertEqual(_Test(field1="value").field1, "value")
+        self.assertEqual(_Test.from_raw_data(
+            {"properties": {"key1": "value"}}).field1, "value")
+        self.assertFalse(default.called)
+
+        self.assertEqual(_Test().field1, "default")
+        self.assertEqual(_Test.from_raw_data({}).field1, "default")
+        self.assertEqual(default.call_count, 2)
+
     def test_inherit_fields(self):
 
         class _TestBase(model.Model):
@@ -215,6 +274,34 @@ class TestModel(unittest.TestCase):
         self.assertTrue(test == test)
         self.assertFalse(test == test2)
 
+    def test_model_hash(self):
+
+        class _Test(model.Model):
+            field1 = model.Field(name="field1", key="key1")
+            field2 = model.Field(name="field2", key="key2",
+                                 is_volatile=True)
+            field3 = model.Field(name="field3", key="key3",
+                                 is_property=False)
+
+        test = _Test.from_raw_data({"key3": 1, "properties": {
+            "key1": {"items": [1, 2]}, "key2": "Updating"}})
+        test2 = _Test(field1={"items": [1, 2]}, field2="Succeeded",
+                      field3=1)
+        test3 = _Test(field1={"items": [1, 3]}, field3=1)
+        test4 = _Test(field1={"items": [1, 2]}, field3=2)
+
+        self.assertEqual(test, test2)
+        self.assertEqual(hash(test), hash(test2))
+        self.assertEqual(len(set([test, test2, test3, test4])), 3)
+        self.assertNotEqual(test, test3)
+        self.assertNotEqual(test, test4)
+
+        fingerprint = test.fingerprint
+        self.assertEqual(test.fingerprint, fingerprint)
+        test.field1["items"].append(3)
+        self.assertNotEqual(test.fingerprint, fingerprint)
+        self.assertNotEqual(test, test2)
+
     def test_validate(self):
         test = self._Test(field1=1, key="test_validate")
         self.assertRaises(exception.DataProcessingError, test.validate)
@@ -231,8 +318,427 @@ class TestModel(unittest.TestCase):
         test = self._Test(field1=1, field2=2, field3=3)
         self.assertEqual(test.dump(), self._raw_data)
 
+    def test_dump_changes_only(self):
+        test = self._Test.from_raw_data(self._raw_data)
+        test.field1 = 1
+        test.field2 = None
+        test.field3 = 4
+
+        self.assertEqual(test.dump(changes_only=True),
+                         {"key2": None, "properties": {"key3": 4}})
+
+    def test_get_changes(self):
+        test = self._Test(field1=1, field2=2, field3=3)
+        self.assertEqual(test._get_changes(),
+                         {"key1": 1, "key2": 2, "key3": 3})
+
+        test = self._Test.from_raw_data(self._raw_data)
+        self.assertEqual(test._get_changes(), {})
+
+        test.field2 = 3
+        test.field2 = 2
+        self.assertEqual(test._get_changes(), {})
+
+        test.field3 = 4
+        self.assertEqual(test._get_changes(), {"key3": 4})
+
+        test.commit()
+        self.assertEqual(test._get_changes(), {})
+        self.assertEqual(test.field3, 4)
+
+    def test_get_changes_containers(self):
+        test = self._Test.from_raw_data({"key1": [{"key": "value"}],
+                                         "properties": {}})
+
+        test.field1.append({"key": "value"})
+        test.field1[0]["key"] = "new_value"
+        self.assertEqual(test._get_changes(),
+                         {"key1": [{"key": "new_value"}, {"key": "value"}]})
+
+        test.field1[0]["key"] = "value"
+
+        test.field1.pop()
+        self.assertEqual(test._get_changes(), {})
+
+    def test_get_changes_submodel(self):
+        submodels = [self._Test.from_raw_data(dict(self._raw_data))
+                     for _ in range(2)]
+        test = self._Test.from_raw_data({"key1": [submodels[0]],
+                                         "key2": submodels[1],
+                                         "properties": {}})
+
+        test.field2.field1 = 2
+        self.assertEqual(test._get_changes(), {"key2": submodels[1]})
+
+        submodels[1].field1 = 1
+        test.field1[0].field2 = 3
+        self.assertEqual(list(test._get_changes()), ["key1"])
+
+    def test_merge_changes(self):
+        test = self._Test.from_raw_data(self._raw_data)
+        test.field1 = 2
+        test.field3 = 4
+        changes = test._get_changes()
+        base = test._get_base(changes)
+
+        latest = self._Test.from_raw_data(
+            {"key1": 1, "key2": 3, "properties": {"key3": 4}})
+        latest._merge_changes(changes, base)
+
+        self.assertEqual(latest.dump(),
+                         {"key1": 2, "key2": 3, "properties": {"key3": 4}})
+
+    def test_merge_changes_conflict(self):
+        test = self._Test.from_raw_data(self._raw_data)
+        test.field1 = 2
+        test.field2 = 3
+        changes = test._get_changes()
+        base = test._get_base(changes)
+
+        latest = self._Test.from_raw_data(
+            {"key1": 3, "key2": 4, "properties": {"key3": 3}})
+        with self.assertRaises(exception.Conflict) as context:
+            latest._merge_changes(changes, base)
+
+        self.assertIn("key1, key2", str(context.exception))
+        self.assertEqual(latest._get_changes(), {})
+
     def test_from_raw_data(self):
         test = self._Test.from_raw_data(self._raw_data)
         self.assertEqual(test.field1, 1)
         self.assertEqual(test.field2, 2)
         self.assertEqual(test.field3, 3)
+
+    def test_from_raw_data_fields(self):
+        test = self._Test.from_raw_data(self._raw_data, field2=4, field4=5)
+        self.assertEqual(test.field2, 4)
+        self.assertEqual(test._get_changes(), {})
+
+    def test_from_raw_data_unknown_fields(self):
+        self._raw_data["key4"] = 4
+        self._raw_data["properties"]["key5"] = 5
+        with test_utils.LogSnatcher("hnv.common.model") as logging:
+            self._Test.from_raw_data(self._raw_data)
+
+        self.assertEqual(logging.output, [
+            "Unrecognized fields: ['key4'] for '_Test'",
+            "Unrecognized properties: ['key5'] for '_Test'"])
+
+    def test_from_raw_data_process_raw_data(self):
+
+        class _Test(self._Test):
+
+            @classmethod
+            def process_raw_data(cls, raw_data):
+                content = super(_Test, cls).process_raw_data(raw_data)
+                content["field2"] = mock.sentinel.field2
+                return content
+
+        test = _Test.from_raw_data(self._raw_data)
+        self.assertIs(test.field2, mock.sentinel.field2)
+        self.assertEqual(test.field3, 3)
+
+    def test_process_raw_data(self):
+        self.assertEqual(self._Test.process_raw_data(self._raw_data),
+                         {"field1": 1, "field2": 2, "field3": 3})
+
+
+class _Child(model.Model):
+
+    _inherited_fields = (("parent", "name"), ("missing", "missing"))
+
+    name = model.Field(name="name", key="name", is_property=False)
+    parent = model.Field(name="parent", key="parent", is_property=False)
+
+
+class _Parent(model.Model):
+
+    name = model.Field(name="name", key="name", is_property=False)
+    child = model.ModelField(name="child", key="child", model_class=_Child)
+    settings = model.ModelField(name="settings", key="settings",
+                                model_class=_Child, create_empty=True)
+    children = model.ListField(name="children", key="children",
+                               model_class=_Child, is_property=False)
+
+
+class TestModelField(unittest.TestCase):
+
+    def test_from_raw_data(self):
+        raw_data = {"name": "test",
+                    "children": [{"name": "child1"}, {"name": "child2"}],
+                    "properties": {"child": {"name": "child3"}}}
+        test = _Parent.from_raw_data(raw_data)
+
+        self.assertEqual([child.name for child in test.children],
+                         ["child1", "child2"])
+        self.assertEqual(test.child.name, "child3")
+        self.assertIsNone(test.settings.name)
+        for child in test.children + [test.child, test.settings]:
+            self.assertIsInstance(child, _Child)
+            self.assertEqual(child.parent, "test")
+        self.assertEqual(test.dump(), {
+            "name": "test",
+            "children": [{"name": "child1", "parent": "test"},
+                         {"name": "child2", "parent": "test"}],
+            "properties": {"child": {"name": "child3", "parent": "test"},
+                           "settings": {"parent": "test"}}})
+
+    def test_from_raw_data_missing(self):
+        test = _Parent.from_raw_data({"name": "test"})
+
+        self.assertEqual(test.children, [])
+        self.assertIsNone(test.child)
+        self.assertIsInstance(test.settings, _Child)
+
+    def test_lazy_loading(self):
+        raw_data = {"name": "test",
+                    "children": [{"name": "child1"}, {"name": "child2"}],
+                    "properties": {"child": {"name": "child3"}}}
+        test = _Parent._load(raw_data, lazy=True)
+
+        positions = _Parent._meta.positions
+        for key in ("child", "children"):
+            self.assertIsInstance(test._data[positions[key]],
+                                  model._LazyValue)
+        self.assertIsInstance(test._data[positions["settings"]], _Child)
+        self.assertEqual(test._get_changes(), {})
+
+        self.assertEqual(test.child.name, "child3")
+        self.assertIs(test.child, test._data[positions["child"]])
+        self.assertIsInstance(test._data[positions["children"]],
+                              model._LazyValue)
+        self.assertEqual(test.dump(), _Parent.from_raw_data(raw_data).dump())
+
+    @mock.patch("hnv.common.model.Model._lazy_loading")
+    def test_from_raw_data_lazy(self, mock_lazy_loading):
+        mock_lazy_loading.return_value = True
+        test = _Parent.from_raw_data({"name": "test",
+                                      "properties": {"child": {"name": "c"}}})
+
+        self.assertIsInstance(test._data[_Parent._meta.positions["child"]],
+                              model._LazyValue)
+        self.assertEqual(test.child.parent, "test")
+
+    def test_from_partial_data(self):
+        raw_data = {"name": "test", "children": [{"name": "child1"}],
+                    "properties": {"child": {"name": "child2"}}}
+        test = _Parent.from_partial_data(raw_data, ["children"])
+
+        self.assertEqual(test.children[0].name, "child1")
+        self.assertRaises(exception.NotLoaded, getattr, test, "child")
+        self.assertTrue(test.is_loaded("children"))
+        self.assertFalse(test.is_loaded("name"))
+        self.assertEqual(test.dump(), {"children": [{"name": "child1"}]})
+
+        test.name = "new-test"
+        self.assertTrue(test.is_loaded("name"))
+        self.assertEqual(test.name, "new-test")
+
+    def test_from_partial_data_unknown_fields(self):
+        self.assertRaises(exception.DataProcessingError,
+                          _Parent.from_partial_data, {}, ["unknown"])
+
+    def test_dump_cache(self):
+        test = _Parent.from_raw_data({"name": "test",
+                                      "children": [{"name": "child1"}],
+                                      "properties": {"child": {}}})
+        content = test.dump()
+        content["children"].append({"name": "child2"})
+        self.assertIs(test._dump(), test._dump())
+        self.assertEqual(len(test.dump()["children"]), 1)
+
+        test.settings.name = "settings"
+        self.assertEqual(test.dump()["properties"]["settings"]["name"],
+                         "settings")
+
+        test.settings.commit()
+        test.child.update({"name": "child"})
+        test.child.commit()
+        content = test.dump()
+        self.assertEqual(content["properties"]["settings"]["name"],
+                         "settings")
+        self.assertEqual(content["properties"]["child"]["name"], "child")
+
+        test.children.append(_Child(name="child2"))
+        self.assertEqual(len(test.dump()["children"]), 2)
+
+    def test_dump_cache_read(self):
+        raw_data = {"name": "test", "children": [{"name": "child1"}]}
+        test = _Parent.from_raw_data(raw_data)
+        test2 = _Parent.from_raw_data(raw_data)
+        content = test._dump()
+        self.assertEqual(test, test2)
+
+        modifications = model._MODIFICATIONS.value
+        children = test.children
+        self.assertEqual(model._MODIFICATIONS.value, modifications)
+        with mock.patch.object(_Parent, "_build_dump") as mock_build_dump, \
+                mock.patch.object(_Parent,
+                                  "_build_content") as mock_build_content:
+            self.assertIs(test._dump(), content)
+            self.assertEqual(test, test2)
+        self.assertFalse(mock_build_dump.called)
+        self.assertFalse(mock_build_content.called)
+
+        children.append(_Child(name="child2"))
+        self.assertEqual(len(test.dump()["children"]), 2)
+        self.assertNotEqual(test, test2)
+        self.assertEqual(test._get_changes(), {"children": children})
+
+    def test_dump_read_only(self):
+        test = _Parent.from_raw_data({"name": "test"})
+        test.dump()
+
+        self.assertEqual(test.dump(include_read_only=False),
+                         test.dump())
+        self.assertEqual(set(_Parent._meta._dump_fields),
+                         set([(True, False), (False, False)]))
+
+    def test_model_eq(self):
+        raw_data = {"name": "test", "children": [{"name": "child1"}],
+                    "properties": {"child": {"name": "child2"}}}
+        test = _Parent.from_raw_data(raw_data)
+        test2 = _Parent.from_raw_data(raw_data)
+        self.assertEqual(test, test2)
+
+        test2.child.name = "child3"
+        self.assertNotEqual(test, test2)
+        test2.child.commit()
+        self.assertNotEqual(test, test2)
+
+        test2.child.update({"name": "child2"})
+        self.assertEqual(test, test2)
+
+    def test_model_eq_nested_containers(self):
+
+        class _Settings(model.Model):
+            items = model.Field(name="items", key="items")
+
+        class _Test(model.Model):
+            settings = model.ModelField(name="settings", key="settings",
+                                        model_class=_Settings)
+
+        raw_data = {"properties": {"settings": {
+            "properties": {"items": [1, 2]}}}}
+        test = _Test.from_raw_data(raw_data)
+        test2 = _Test.from_raw_data(raw_data)
+        self.assertEqual(test, test2)
+
+        items = test.settings.items
+        self.assertEqual(test, test2)
+        items.append(3)
+        self.assertNotEqual(test, test2)
+        self.assertEqual(test.dump()["properties"]["settings"],
+                         {"properties": {"items": [1, 2, 3]}})
+
+
+class _Rule(model.Model):
+
+    _key_field = "name"
+
+    name = model.Field(name="name", key="name", is_property=False)
+    action = model.Field(name="action", key="action")
+    state = model.Field(name="state", key="state", is_volatile=True)
+
+
+class _Rules(model.Model):
+
+    name = model.Field(name="name", key="name", is_property=False)
+    rules = model.ListField(name="rules", key="rules", model_class=_Rule)
+    default = model.ModelField(name="default", key="default",
+                               model_class=_Rule)
+
+
+class TestModelDiff(unittest.TestCase):
+
+    def setUp(self):
+        self._raw_data = {"name": "rules", "properties": {
+            "default": {"name": "default", "properties": {"action": "deny"}},
+            "rules": [
+                {"name": "rule1", "properties": {"action": "allow"}},
+                {"name": "rule2", "properties": {"action": "allow"}},
+            ]}}
+
+    def test_diff_equal(self):
+        actual = _Rules.from_raw_data(self._raw_data)
+        desired = _Rules.from_raw_data(self._raw_data)
+        desired.rules.reverse()
+        desired.default.state = "Updating"
+
+        self.assertEqual(desired.diff(actual), [])
+
+    def test_diff(self):
+        actual = _Rules.from_raw_data(self._raw_data)
+        desired = _Rules.from_raw_data(self._raw_data)
+        rule3 = _Rule(name="rule3", action="deny")
+        desired.rules = [desired.rules[1], rule3]
+        desired.rules[0].action = "deny"
+        desired.default.action = "allow"
+
+        changes = desired.diff(actual)
+
+        self.assertEqual(
+            sorted((change.path, change.old, change.new)
+                   for change in changes
+                   if not isinstance(change.old or change.new, model.Model)),
+            [(("default", "action"), "deny", "allow"),
+             (("rules", "rule2", "action"), "allow", "deny")])
+        self.assertIn(model.Change(("rules", "rule3"), None, rule3), changes)
+        self.assertIn(model.Change(("rules", "rule1"), actual.rules[0],
+                                   None), changes)
+
+        actual.apply_diff(changes)
+        self.assertEqual(actual.diff(desired), [])
+        self.assertEqual(desired.diff(actual), [])
+        self.assertEqual(sorted(actual.dump(changes_only=True)["properties"]),
+                         ["default", "rules"])
+
+    def test_diff_other_model(self):
+        actual = _Rule(name="rule1")
+        desired = _Rules(name="rule1")
+
+        self.assertEqual(desired.diff(actual),
+                         [model.Change((), actual, desired)])
+        self.assertRaises(exception.DataProcessingError,
+                          actual.apply_diff, desired.diff(actual))
+
+    def test_clone(self):
+        template = _Rules.from_raw_data(self._raw_data)
+        template.name = "template"
+
+        variant = template.clone()
+        self.assertIs(variant._data[_Rules._meta.positions["rules"]],
+                      template._data[_Rules._meta.positions["rules"]])
+        self.assertEqual(variant.name, "template")
+        self.assertEqual(variant.diff(template), [])
+
+        variant.rules[0].action = "deny"
+        variant.rules.append(_Rule(name="rule3"))
+        variant.default.action = "allow"
+        variant.name = "variant"
+
+        self.assertEqual(template.name, "template")
+        self.assertEqual([rule.action for rule in template.rules],
+                         ["allow", "allow"])
+        self.assertEqual(template.default.action, "deny")
+        self.assertEqual(
+            sorted(change.path for change in variant.diff(template)),
+            [("default", "action"), ("name", ), ("rules", "rule1", "action"),
+             ("rules", "rule3")])
+
+        template.rules[1].action = "deny"
+        self.assertEqual(variant.rules[1].action, "allow")
+
+    def test_clone_handed_out(self):
+        template = _Rules.from_raw_data(self._raw_data)
+        default = template.default
+        rules = template.rules
+
+        variant = template.clone()
+        default.action = "allow"
+        rules[0].action = "deny"
+
+        self.assertEqual(variant.default.action, "deny")
+        self.assertEqual(variant.rules[0].action, "allow")
+        self.assertEqual(template.default.action, "allow")
+        self.assertEqual(template.rules[0].action, "deny")
@@ -0,0 +1,99 @@
+# Copyright 2017 Cloudbase Solutions Srl
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+# pylint: disable=protected-access, missing-docstring
+
+import unittest
+
+from hnv.common import exception
+from hnv.common import query
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self):
+        self._raw_data = {
+            "resourceId": "nic-1",
+            "resourceMetadata": {"tenantId": "tenant-1"},
+            "properties": {
+                "privateMacAddress": "00-15-5D-01-02-03",
+                "ipConfigurations": [
+                    {"properties": {"privateIPAddress": "10.0.0.4"}},
+                    {"properties": {"privateIPAddress": "10.0.1.4"}},
+                ],
+            },
+        }
+
+    def test_predicate_abstract(self):
+        self.assertRaises(TypeError, query.Predicate, "resourceId")
+
+    def test_equal(self):
+        self.assertTrue(query.Equal("resourceMetadata.tenantId",
+                                    "tenant-1")(self._raw_data))
+        self.assertFalse(query.Equal("resourceMetadata.tenantId",
+                                     "tenant-2")(self._raw_data))
+        self.assertFalse(query.Equal("resourceMetadata.groupId",
+                                     "tenant-1")(self._raw_data))
+        self.assertFalse(query.Equal("resourceId.tenantId",
+                                     "nic-1")(self._raw_data))
+
+    def test_in(self):
+        self.assertTrue(query.In("resourceId",
+                                 ["nic-1", "nic-2"])(self._raw_data))
+        self.assertFalse(query.In("resourceId", ["nic-2"])(self._raw_data))
+        self.assertFalse(query.In("properties",
+                                  ["nic-1"])(self._raw_data))
+
+    def test_prefix(self):
+        path = "properties.ipConfigurations.properties.privateIPAddress"
+        self.assertTrue(query.Prefix(path, "10.0.1.")(self._raw_data))
+        self.assertFalse(query.Prefix(path, "10.0.2.")(self._raw_data))
+        self.assertFalse(query.Prefix("properties", "00")(self._raw_data))
+
+    def test_build(self):
+        predicate = query.build([
+            {"resourceMetadata.tenantId": "tenant-1"},
+            query.Prefix("properties.privateMacAddress", "00-15-5D"),
+            None])
+
+        self.assertTrue(predicate(self._raw_data))
+        self.assertFalse(query.build({"resourceId": "nic-2"})(self._raw_data))
+        self.assertIsNone(query.build(None))
+        self.assertIsNone(query.build([{}]))
+        self.assertRaises(exception.DataProcessingError, query.build, "nic")
+
+    def test_to_odata(self):
+        predicate = query.Equal("resourceMetadata.tenantId", "tenant's")
+        predicate &= query.In("properties.port", [80, 443])
+        predicate &= query.Prefix("resourceId", "nic-")
+
+        self.assertEqual(
+            predicate.to_odata(),
+            "(resourceMetadata/tenantId eq 'tenant''s') and "
+            "((properties/port eq 80 or properties/port eq 443)) and "
+            "(startswith(resourceId, 'nic-'))")
+
+    def test_select(self):
+        predicate = query.build({"resourceId": "nic-1",
+                                 "properties.ipConfigurations": "ip"})
+
+        selected = query.select(predicate, lambda path: "." not in path)
+
+        self.assertEqual(selected.to_odata(), "(resourceId eq 'nic-1')")
+        self.assertIsNone(query.select(predicate, lambda path: False))
+        self.assertIsNone(query.select(None, lambda path: True))
+        self.assertEqual(
+            query.select(query.Prefix("resourceId", "nic-"),
+                         lambda path: True).to_odata(),
+            "(startswith(resourceId, 'nic-'))")
@@ -14,6 +14,7 @@
 
 # pylint: disable=protected-access, missing-docstring
 
+import threading
 import unittest
 try:
     import unittest.mock as mock
@@ -64,6 +65,21 @@ class TestHNVClient(unittest.TestCase):
         mock_auth.assert_called_once_with(username=mock.sentinel.username,
                                           password=mock.sentinel.password)
 
+    @mock.patch("hnv.common.utils._HNVClient._verify_https_request")
+    @mock.patch("requests.Session")
+    def test_session_per_thread(self, mock_get_session, mock_verify):
+        mock_get_session.side_effect = lambda: mock.Mock(headers={})
+        client = self._get_client(password=None)
+        sessions = []
+
+        thread = threading.Thread(
+            target=lambda: sessions.append(client._session))
+        thread.start()
+        thread.join()
+
+        self.assertIs(client._session, client._session)
+        self.assertIsNot(client._session, sessions[0])
+
     def test_verify_https_request(self):
         ca_bundle_client = self._get_client(allow_insecure=None)
         insecure_client = self._get_client(ca_bundle=None)
@@ -120,6 +136,14 @@ class TestHNVClient(unittest.TestCase):
                 self.assertRaises(exception.NotFound,
                                   client._http_request,
                                   "/fake/resource", method, body, if_match)
+            elif status_code == 405:
+                self.assertRaises(exception.NotSupported,
+                                  client._http_request,
+                                  "/fake/resource", method, body, if_match)
+            elif status_code == 412:
+                self.assertRaises(exception.PreconditionFailed,
+                                  client._http_request,
+                                  "/fake/resource", method, body, if_match)
             elif status_code != 200:
                 self.assertRaises(requests.HTTPError,
                                   client._http_request,
@@ -131,8 +155,15 @@ class TestHNVClient(unittest.TestCase):
         mock_join.assert_called_once_with(mock.sentinel.url,
                                           "/fake/resource")
         mock_headers.assert_called_once_with()
+        if method == constant.PATCH:
+            self.assertEqual(headers["Content-Type"],
+                             constant.MERGE_PATCH_CONTENT_TYPE)
+
         if not method == constant.GET and if_match:
-            etag = (body or {}).get("etag", None)
+            if isinstance(if_match, str):
+                etag = if_match
+            else:
+                etag = (body or {}).get("etag", None)
             if etag is None:
                 self.assertNotIn("If-Match", headers)
             else:
@@ -168,6 +199,14 @@ class TestHNVClient(unittest.TestCase):
                                 status_code=200,
                                 if_match=True)
 
+    def test_http_request_patch(self):
+        response = [mock.MagicMock()]
+        self._test_http_request(method=constant.PATCH,
+                                body={"tags": mock.sentinel.tags},
+                                response=response,
+                                status_code=200,
+                                if_match="fake-etag")
+
     def test_http_request_with_connection_error(self):
         response = [requests.ConnectionError(), mock.MagicMock()]
         with test_utils.ConfigPatcher('retry_count', 1, "HNV"):
@@ -212,6 +251,22 @@ class TestHNVClient(unittest.TestCase):
                                 status_code=400,
                                 if_match=False)
 
+    def test_http_request_not_supported(self):
+        response = [mock.MagicMock()]
+        self._test_http_request(method=constant.PATCH,
+                                body=mock.sentinel.body,
+                                response=response,
+                                status_code=405,
+                                if_match=False)
+
+    def test_http_request_precondition_failed(self):
+        response = [mock.MagicMock()]
+        self._test_http_request(method=constant.PUT,
+                                body={"etag": mock.sentinel.etag},
+                                response=response,
+                                status_code=412,
+                                if_match=True)
+
     def test_http_request_server_error(self):
         response = [mock.MagicMock()]
         self._test_http_request(method=constant.GET,
@@ -231,10 +286,23 @@ class TestHNVClient(unittest.TestCase):
 
         self.assertIs(client.get_resource(mock.sentinel.path),
                       mock.sentinel.response)
-        mock_http_request.assert_called_once_with(mock.sentinel.path)
+        mock_http_request.assert_called_once_with(mock.sentinel.path,
+                                                  headers=None)
         self.assertRaises(exception.ServiceException,
                           client.get_resource, mock.sentinel.path)
 
+    @mock.patch("hnv.common.utils._HNVClient._http_request")
+    def test_get_resource_not_modified(self, mock_http_request):
+        mock_http_request.return_value.status_code = 304
+        headers = {"If-None-Match": mock.sentinel.etag}
+
+        client = self._get_client()
+
+        self.assertIsNone(client.get_resource(mock.sentinel.path,
+                                              headers=headers))
+        mock_http_request.assert_called_once_with(mock.sentinel.path,
+                                                  headers=headers)
+
     @mock.patch("hnv.common.utils._HNVClient._http_request")
     def test_update_resource(self, mock_http_request):
         response = mock.Mock()
@@ -254,6 +322,36 @@ class TestHNVClient(unittest.TestCase):
                           client.update_resource,
                           mock.sentinel.path, mock.sentinel.data)
 
+    @mock.patch("hnv.common.utils._HNVClient._http_request")
+    def test_patch_resource(self, mock_http_request):
+        response = mock.Mock()
+        response.json.return_value = mock.sentinel.response
+        mock_http_request.return_value = response
+
+        client = self._get_client()
+        response = client.patch_resource(mock.sentinel.path,
+                                         mock.sentinel.data,
+                                         if_match=mock.sentinel.etag)
+
+        self.assertIs(response, mock.sentinel.response)
+        mock_http_request.assert_called_once_with(
+            resource=mock.sentinel.path, method=constant.PATCH,
+            body=mock.sentinel.data, if_match=mock.sentinel.etag)
+
+    @mock.patch("hnv.common.utils._HNVClient._http_request")
+    def test_patch_resource_not_supported(self, mock_http_request):
+        mock_http_request.side_effect = exception.NotSupported
+
+        client = self._get_client()
+        for _ in range(2):
+            self.assertRaises(exception.NotSupported,
+                              client.patch_resource,
+                              mock.sentinel.path, mock.sentinel.data)
+
+        mock_http_request.assert_called_once_with(
+            resource=mock.sentinel.path, method=constant.PATCH,
+            body=mock.sentinel.data, if_match=None)
+
     @mock.patch("hnv.common.utils._HNVClient._http_request")
     def test_remove_resource(self, mock_http_request):
         mock_http_request.return_value = mock.sentinel.response
@@ -14,6 +14,10 @@
 
 # pylint: disable=protected-access
 
+import collections
+import copy
+import gc
+import threading
 import unittest
 
 try:
@@ -21,7 +25,10 @@ try:
 except ImportError:
     import mock
 
+import requests
+
 from hnv import client
+from hnv.common import constant
 from hnv.common import exception
 from hnv import config as hnv_config
 from hnv.tests.fake import fake_response
@@ -75,6 +82,90 @@ class TestBaseHNVModel(unittest.TestCase):
         get_resource.assert_called_once_with("/")
         self.assertEqual(resources, [{} for _ in range(10)])
 
+    @mock.patch("time.sleep")
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_iter_all_resume(self, mock_get_client, mock_sleep):
+        server_error = requests.HTTPError(response=mock.Mock(status_code=503))
+        pages = {
+            "/": {"value": [{"resourceId": "1"}, {"resourceId": "2"}],
+                  "nextLink": "page-2"},
+            "page-2": {"value": [{"resourceId": "3"}]},
+        }
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = [
+            pages["/"], server_error, server_error, pages["page-2"]]
+
+        resources = client._BaseHNVModel.iter_all()
+        self.assertEqual(next(resources).resource_id, "1")
+        self.assertEqual(next(resources).resource_id, "2")
+        with test_utils.ConfigPatcher("retry_count", 1, "HNV"):
+            self.assertRaises(requests.HTTPError, next, resources)
+        self.assertEqual(resources.cursor, ("page-2", 0))
+        self.assertEqual(mock_sleep.call_count, 1)
+
+        self.assertEqual([resource.resource_id for resource in resources],
+                         ["3"])
+        self.assertEqual(resources.cursor, (None, 0))
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_iter_all_prefetch(self, mock_get_client):
+        not_found = requests.HTTPError(response=mock.Mock(status_code=404))
+        pages = [
+            {"value": [{"resourceId": "1"}, {"resourceId": "2"}],
+             "nextLink": "page-2"},
+            not_found,
+            {"value": [{"resourceId": "3"}, {"resourceId": "4"}],
+             "nextLink": "page-3"},
+            {"value": [{"resourceId": "5"}]},
+        ]
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = pages
+
+        resources = client._BaseHNVModel.iter_all(page_size=2,
+                                                  prefetch_depth=2)
+        self.assertEqual(next(resources).resource_id, "1")
+        self.assertEqual(next(resources).resource_id, "2")
+        self.assertRaises(requests.HTTPError, next, resources)
+        self.assertEqual(resources.cursor, ("page-2", 0))
+
+        self.assertEqual([resource.resource_id for resource in resources],
+                         ["3", "4", "5"])
+        headers = {"Prefer": "odata.maxpagesize=2"}
+        self.assertEqual(get_resource.call_args_list, [
+            mock.call("/", headers=headers),
+            mock.call("page-2", headers=headers),
+            mock.call("page-2", headers=headers),
+            mock.call("page-3", headers=headers)])
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_iter_all_prefetch_stopped(self, mock_get_client):
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = lambda link: {
+            "value": [{"resourceId": link}], "nextLink": link + "-next"}
+        threads = set(threading.enumerate())
+
+        for resource in client._BaseHNVModel.iter_all(prefetch_depth=1):
+            break
+        workers = set(threading.enumerate()).difference(threads)
+        self.assertEqual(len(workers), 1)
+
+        gc.collect()
+        for worker in workers:
+            worker.join(timeout=5)
+            self.assertFalse(worker.is_alive())
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_iter_all_cursor(self, mock_get_client):
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.return_value = {
+            "value": [{"resourceId": "1"}, {"resourceId": "2"}]}
+
+        resources = client._BaseHNVModel.iter_all(cursor=("page-2", 1))
+
+        self.assertEqual([resource.resource_id for resource in resources],
+                         ["2"])
+        get_resource.assert_called_once_with("page-2")
+
     @mock.patch("time.sleep")
     @mock.patch("hnv.client._BaseHNVModel._get")
     @mock.patch("hnv.client._BaseHNVModel._get_client")
@@ -191,6 +282,218 @@ class TestBaseHNVModel(unittest.TestCase):
         self._test_commit(loop_count=1, timeout=False,
                           failed=False, invalid_response=True)
 
+    @mock.patch("hnv.client._BaseHNVModel._reset_model")
+    @mock.patch("hnv.client._BaseHNVModel.dump")
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def _test_commit_patch(self, mock_get_client, mock_dump,
+                           mock_reset_model, supported):
+        http_client = mock_get_client.return_value = mock.Mock()
+        patch_resource = http_client.patch_resource
+        update_resource = http_client.update_resource
+        if not supported:
+            patch_resource.side_effect = exception.NotSupported
+        mock_dump.side_effect = lambda **kwargs: kwargs
+
+        model = client._BaseHNVModel(resource_id="hnv-client",
+                                     parent_id="test", etag="fake-etag")
+        model.commit(if_match=True, wait=False, patch=True)
+
+        patch_resource.assert_called_once_with(
+            "test/hnv-client", if_match="fake-etag",
+            data={"include_read_only": False, "changes_only": True})
+        if supported:
+            self.assertFalse(update_resource.called)
+            mock_reset_model.assert_called_once_with(
+                patch_resource.return_value)
+        else:
+            update_resource.assert_called_once_with(
+                "test/hnv-client", if_match="fake-etag",
+                data={"include_read_only": False})
+            mock_reset_model.assert_called_once_with(
+                update_resource.return_value)
+
+    def test_commit_patch(self):
+        self._test_commit_patch(supported=True)
+
+    def test_commit_patch_not_supported(self):
+        self._test_commit_patch(supported=False)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def _test_commit_conflict(self, mock_get_client, latest_tags, conflict):
+        http_client = mock_get_client.return_value = mock.Mock()
+        update_resource = http_client.update_resource
+        update_resource.side_effect = [exception.PreconditionFailed,
+                                       {"etag": "etag-3"}]
+        http_client.get_resource.return_value = {
+            "resourceId": "hnv-client", "etag": "etag-2",
+            "instanceId": "instance-2", "tags": latest_tags,
+            "properties": {}}
+
+        model = client._BaseHNVModel.from_raw_data(
+            {"resourceId": "hnv-client", "parentResourceID": "test",
+             "etag": "etag-1", "instanceId": "instance-1",
+             "tags": {"key": "value"}, "properties": {}})
+        model.tags["owner"] = "hnv-client"
+
+        if conflict:
+            self.assertRaises(exception.Conflict, model.commit,
+                              if_match=True, wait=False)
+            self.assertEqual(update_resource.call_count, 1)
+            return
+
+        model.commit(if_match=True, wait=False)
+
+        self.assertEqual(update_resource.call_count, 2)
+        self.assertEqual(update_resource.call_args[1]["if_match"], "etag-2")
+        request_body = update_resource.call_args[1]["data"]
+        self.assertEqual(request_body["tags"],
+                         {"key": "value", "owner": "hnv-client"})
+        self.assertEqual(request_body["instanceId"], "instance-2")
+        self.assertEqual(model.etag, "etag-3")
+
+    def test_commit_conflict_merged(self):
+        self._test_commit_conflict(latest_tags={"key": "value"},
+                                   conflict=False)
+
+    def test_commit_conflict(self):
+        self._test_commit_conflict(latest_tags={"key": "new_value"},
+                                   conflict=True)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_commit_without_changes(self, mock_get_client):
+        http_client = mock_get_client.return_value = mock.Mock()
+        model = client._BaseHNVModel.from_raw_data(
+            {"resourceId": "hnv-client", "parentResourceID": "test",
+             "tags": {"key": "value"}, "properties": {}})
+
+        model.tags["key"] = "value"
+        model.commit()
+
+        self.assertFalse(http_client.update_resource.called)
+        self.assertFalse(http_client.patch_resource.called)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_fields(self, mock_get_client):
+        http_client = mock_get_client.return_value = mock.Mock()
+        http_client.get_resource.return_value = {
+            "resourceId": "hnv-client", "etag": "etag-1",
+            "instanceId": "instance-1", "tags": {"key": "value"},
+            "properties": {"provisioningState": "Succeeded"}}
+
+        model = client._BaseHNVModel.get(resource_id="hnv-client",
+                                         fields=["tags"])
+
+        self.assertEqual(model.tags, {"key": "value"})
+        self.assertEqual(model.etag, "etag-1")
+        self.assertFalse(model.is_loaded("instance_id"))
+        self.assertFalse(model.is_loaded())
+        self.assertRaises(exception.NotLoaded, getattr, model,
+                          "provisioning_state")
+        self.assertNotIn("instanceId", model.dump())
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_commit_partial(self, mock_get_client):
+        http_client = mock_get_client.return_value = mock.Mock()
+        update_resource = http_client.update_resource
+        update_resource.return_value = {"etag": "etag-2"}
+        http_client.get_resource.return_value = {
+            "resourceId": "hnv-client", "etag": "etag-1",
+            "instanceId": "instance-1", "tags": {"key": "value"},
+            "properties": {}}
+
+        model = client._BaseHNVModel.get(resource_id="hnv-client",
+                                         fields=["tags"])
+        model.tags["owner"] = "hnv-client"
+        model.commit(wait=False)
+
+        request_body = update_resource.call_args[1]["data"]
+        self.assertEqual(request_body["tags"],
+                         {"key": "value", "owner": "hnv-client"})
+        self.assertEqual(request_body["instanceId"], "instance-1")
+        self.assertTrue(model.is_loaded())
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_identity_map(self, mock_get_client):
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = lambda _: {
+            "resourceId": "hnv-client", "resourceRef": "/hnv-client",
+            "etag": etags[0], "tags": {}, "properties": {}}
+        etags = ["etag-1"]
+
+        with client.IdentityMap() as identity_map:
+            model = client._BaseHNVModel.get(resource_id="hnv-client")
+            self.assertIs(client._BaseHNVModel.get(resource_id="hnv-client"),
+                          model)
+            self.assertIs(client._BaseHNVModel.get(resource_id="hnv-client",
+                                                   fields=["tags"]),
+                          model)
+            etags[0] = "etag-2"
+            updated = client._BaseHNVModel.get(resource_id="hnv-client")
+            self.assertIsNot(updated, model)
+            self.assertEqual(updated.etag, "etag-2")
+            self.assertEqual(len(identity_map), 1)
+
+            del model, updated
+            self.assertEqual(len(identity_map), 0)
+
+        self.assertIsNone(client.IdentityMap.get_active())
+        self.assertIsNot(client._BaseHNVModel.get(resource_id="hnv-client"),
+                         client._BaseHNVModel.get(resource_id="hnv-client"))
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_identity_map_unknown_fields(self, mock_get_client):
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.return_value = {
+            "resourceId": "hnv-client", "resourceRef": "/hnv-client",
+            "etag": "etag-1", "tags": {}, "properties": {}}
+
+        with client.IdentityMap():
+            model = client._BaseHNVModel.get(resource_id="hnv-client")
+            self.assertRaises(exception.DataProcessingError,
+                              client._BaseHNVModel.get,
+                              resource_id="hnv-client", fields=["unknown"])
+            del model
+
+    def test_identity_map_per_thread(self):
+        active = []
+        thread = threading.Thread(
+            target=lambda: active.append(client.IdentityMap.get_active()))
+
+        with client.IdentityMap() as identity_map:
+            thread.start()
+            thread.join()
+            self.assertIs(client.IdentityMap.get_active(), identity_map)
+            self.assertIs(identity_map.bind(client.IdentityMap.get_active)(),
+                          identity_map)
+
+        self.assertEqual(active, [None])
+        self.assertIsNone(client.IdentityMap.get_active())
+
+    @mock.patch("time.time")
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_not_found_cached(self, mock_get_client, mock_time):
+        http_client = mock_get_client.return_value
+        http_client.get_resource.side_effect = exception.NotFound
+        http_client.update_resource.return_value = {
+            "resourceId": "missing", "etag": "etag-1"}
+        mock_time.return_value = 100
+
+        with test_utils.ConfigPatcher("negative_cache_ttl", 10, "HNV"):
+            for _ in range(3):
+                self.assertRaises(exception.NotFound,
+                                  client._BaseHNVModel.get, "missing")
+            self.assertEqual(http_client.get_resource.call_count, 1)
+
+            mock_time.return_value = 111
+            self.assertRaises(exception.NotFound,
+                              client._BaseHNVModel.get, "missing")
+            self.assertEqual(http_client.get_resource.call_count, 2)
+
+            client._BaseHNVModel(resource_id="missing").commit(wait=False)
+            self.assertRaises(exception.NotFound,
+                              client._BaseHNVModel.get, "missing")
+            self.assertEqual(http_client.get_resource.call_count, 3)
+
     @mock.patch("hnv.client._BaseHNVModel._reset_model")
     @mock.patch("hnv.client._BaseHNVModel._get_client")
     def test_refresh(self, mock_get_client, mock_reset_model):
@@ -206,6 +509,149 @@ class TestBaseHNVModel(unittest.TestCase):
         mock_reset_model.assert_called_once_with(mock.sentinel.response)
 
 
+class TestModelRegistry(unittest.TestCase):
+
+    def test_registry_child_registered_later(self):
+        registry = client._MODELS.__class__()
+        registry.add(client.VirtualNetworks, client.VirtualNetworks._endpoint)
+        self.assertEqual(registry.get(client.VirtualNetworks).child_fields, ())
+
+        registry.add(client.SubNetworks, client.SubNetworks._endpoint)
+
+        info = registry.get(client.VirtualNetworks)
+        self.assertEqual(info.child_fields, ("subnetworks", ))
+        self.assertIs(registry.get_by_name("VirtualNetworks"), info)
+        self.assertIs(registry.get_by_endpoint(info.endpoint), info)
+        self.assertIs(registry.get_parent(client.SubNetworks), info)
+
+    def test_registry(self):
+        registry = client._MODELS
+        info = registry.get(client.LogicalSubnetworks)
+
+        self.assertEqual(info.endpoint, client.LogicalSubnetworks._endpoint)
+        self.assertEqual(info.child_fields, ("ip_pools", ))
+        self.assertIs(registry.get_by_name("LogicalSubnetworks"), info)
+        self.assertIs(registry.get_by_endpoint(info.endpoint), info)
+        self.assertIs(registry.get_parent(client.LogicalSubnetworks),
+                      registry.get(client.LogicalNetworks))
+        self.assertEqual(registry.get_children(client.LogicalSubnetworks),
+                         [registry.get(client.IPPools)])
+        self.assertIs(registry.get_parent(client.BGPPeers).model_cls,
+                      client.BGPRouters)
+        self.assertIsNone(registry.get_parent(client.LoadBalancers))
+        self.assertIsNone(registry.get(client._BaseHNVModel))
+        self.assertIn(client.VirtualSwitchManager,
+                      [item.model_cls for item in registry])
+
+
+class TestResource(unittest.TestCase):
+
+    def test_endpoint_template(self):
+        endpoint = client._EndpointTemplate.get(client.IPPools._endpoint)
+
+        self.assertIs(client.IPPools._get_endpoint(), endpoint)
+        self.assertEqual(endpoint.url("pool", "subnet", "network"),
+                         "/networking/v1/logicalNetworks/network"
+                         "/subnets/subnet/ipPools/pool")
+        self.assertEqual(endpoint.url(parent_id="subnet",
+                                      grandparent_id="network"),
+                         "/networking/v1/logicalNetworks/network"
+                         "/subnets/subnet/ipPools/")
+        self.assertEqual(endpoint.reference("pool", "subnet", "network"),
+                         "/logicalNetworks/network/subnets/subnet"
+                         "/ipPools/pool")
+
+    def test_resolve(self):
+        self.assertEqual(
+            client._ROUTER.resolve("/logicalNetworks/ln/subnets/sn/ipPools/p"),
+            (client.IPPools, "p", "sn", "ln"))
+        self.assertEqual(client._ROUTER.resolve("/LOADBALANCERS/lb"),
+                         (client.LoadBalancers, "lb", None, None))
+        self.assertEqual(client._ROUTER.resolve("/loadBalancers/lb/probes/p"),
+                         (client.Probes, "p", "lb", None))
+        self.assertEqual(
+            client._ROUTER.resolve("/virtualSwitchManager/configuration"),
+            (client.VirtualSwitchManager, None, None, None))
+        for resource_ref in ("/loadBalancers/lb/", "/loadBalancers",
+                             "loadBalancers/lb", "/unknown/lb"):
+            self.assertIsNone(client._ROUTER.resolve(resource_ref))
+
+    @mock.patch("hnv.client.Probes.get")
+    def test_get_resource(self, mock_get):
+        mock_get.return_value = mock.sentinel.probe
+        resource = client.Resource(resource_ref="/loadBalancers/lb/probes/p")
+
+        self.assertIs(resource.get_resource(), mock.sentinel.probe)
+        mock_get.assert_called_once_with(resource_id="p", parent_id="lb",
+                                         grandparent_id=None)
+
+    def test_get_resource_not_found(self):
+        resource = client.Resource(resource_ref="/unknown/resource")
+        self.assertRaises(exception.NotFound, resource.get_resource)
+
+    @mock.patch("hnv.client.Probes.get")
+    def test_get_resources(self, mock_get):
+        def get_probe(resource_id, parent_id, grandparent_id, fields):
+            if resource_id == "missing":
+                raise exception.NotFound()
+            return (resource_id, parent_id)
+        mock_get.side_effect = get_probe
+        probe = client.Resource(resource_ref="/loadBalancers/lb/probes/p2")
+        references = ["/loadBalancers/lb/probes/p1", probe,
+                      "/loadBalancers/lb/PROBES/P1",
+                      "/loadBalancers/lb/probes/missing"]
+
+        with test_utils.ConfigPatcher("bulk_listing_threshold", 0, "HNV"):
+            resources = client.get_resources(references)
+
+        self.assertEqual(resources, {
+            "/loadBalancers/lb/probes/p1": ("p1", "lb"),
+            "/loadBalancers/lb/PROBES/P1": ("p1", "lb"),
+            "/loadBalancers/lb/probes/p2": ("p2", "lb")})
+        self.assertEqual(mock_get.call_count, 3)
+
+    @mock.patch("hnv.client.Probes.get")
+    @mock.patch("hnv.client.Probes._get_all_raw")
+    def test_get_resources_listing(self, mock_get_all_raw, mock_get):
+        mock_get_all_raw.return_value = [
+            {"resourceId": "p%d" % index, "etag": "etag",
+             "resourceRef": "/loadBalancers/lb/probes/p%d" % index,
+             "properties": {"protocol": "Tcp", "port": 80}}
+            for index in range(3)]
+        references = ["/loadBalancers/lb/probes/p0",
+                      "/loadBalancers/lb/probes/p2",
+                      "/loadBalancers/lb/probes/missing"]
+
+        with test_utils.ConfigPatcher("bulk_listing_threshold", 3, "HNV"):
+            resources = client.get_resources(references, fields=["port"])
+
+        self.assertEqual(sorted(resources), references[:2])
+        probe = resources["/loadBalancers/lb/probes/p2"]
+        self.assertEqual((probe.resource_id, probe.parent_id, probe.port),
+                         ("p2", "lb", 80))
+        self.assertFalse(probe.is_loaded("protocol"))
+        mock_get_all_raw.assert_called_once_with("lb", None)
+        self.assertFalse(mock_get.called)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_resources_identity_map(self, mock_get_client):
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = lambda path: {
+            "resourceId": path.rsplit("/", 1)[-1], "etag": "etag",
+            "resourceRef": "/loadBalancers/lb/probes/p1",
+            "properties": {"protocol": "Tcp", "port": 80}}
+
+        with client.IdentityMap() as identity_map:
+            with test_utils.ConfigPatcher("bulk_listing_threshold", 0,
+                                          "HNV"):
+                resources = client.get_resources(
+                    ["/loadBalancers/lb/probes/p1"])
+            probe = resources["/loadBalancers/lb/probes/p1"]
+            self.assertEqual(len(identity_map), 1)
+            self.assertIs(client.Probes.get(resource_id="p1",
+                                            parent_id="lb"), probe)
+
+
 class TestClient(unittest.TestCase):
 
     def setUp(self):
@@ -381,6 +827,373 @@ class TestClient(unittest.TestCase):
             self._test_get_resource(model=client.LoadBalancers,
                                     raw_data=raw_data)
 
+    def test_load_balancers_lazy_loading(self):
+        resources = self._response.load_balancers()
+        for raw_data in resources.get("value", []):
+            with test_utils.ConfigPatcher("lazy_loading", True, "HNV"):
+                resource = client.LoadBalancers.from_raw_data(raw_data)
+            expected = client.LoadBalancers.from_raw_data(raw_data)
+
+            self.assertEqual(resource.resource_id, expected.resource_id)
+            self.assertEqual(resource.dump(), expected.dump())
+            for rule in resource.load_balancing_rules:
+                self.assertEqual(rule.parent_id, resource.resource_id)
+
+    def test_load_balancers_eq(self):
+        resources = self._response.load_balancers()
+        models = [client.LoadBalancers.from_raw_data(raw_data)
+                  for raw_data in resources.get("value", [])]
+        for resource, raw_data in zip(models, resources.get("value", [])):
+            raw_data = copy.deepcopy(raw_data)
+            raw_data["etag"] = "new-etag"
+            raw_data["properties"]["provisioningState"] = "Updating"
+            self.assertEqual(resource,
+                             client.LoadBalancers.from_raw_data(raw_data))
+        self.assertEqual(len(set(models)), len(models))
+
+    def test_resources_hash(self):
+        references = [client.Resource(resource_ref="/virtualNetworks/a"),
+                      client.Resource(resource_ref="/virtualNetworks/b"),
+                      client.Resource(resource_ref="/virtualNetworks/a")]
+        self.assertEqual(len(set(references)), 2)
+
+        raw_data = self._response.network_interfaces()["value"][0]
+        other_data = copy.deepcopy(raw_data)
+        other_data["resourceId"] = "other-nic"
+        nic = client.NetworkInterfaces.from_raw_data(raw_data)
+        other_nic = client.NetworkInterfaces.from_raw_data(other_data)
+        self.assertNotEqual(nic, other_nic)
+        self.assertEqual(len(set([nic, other_nic])), 2)
+
+    def test_eq_read_only(self):
+        raw_data = self._response.network_interfaces()["value"][0]
+        actual = client.NetworkInterfaces.from_raw_data(raw_data)
+        desired = client.NetworkInterfaces.from_raw_data(
+            actual.dump(include_read_only=False))
+
+        self.assertEqual(desired, actual)
+        self.assertEqual(hash(desired), hash(actual))
+        self.assertEqual(desired.diff(actual), [])
+        self.assertNotEqual(desired.diff(actual, include_read_only=True),
+                            [])
+
+    def test_acl_diff(self):
+        raw_data = self._response.acl()["value"][0]
+        actual = client.AccessControlLists.from_raw_data(raw_data)
+        desired = client.AccessControlLists.from_raw_data(raw_data)
+        rule = desired.acl_rules[0]
+        rule.description = "hnv-client"
+        desired.acl_rules.reverse()
+
+        changes = desired.diff(actual)
+
+        self.assertEqual(
+            [(change.path, change.new) for change in changes],
+            [(("acl_rules", rule.resource_id, "description"), "hnv-client")])
+        actual.apply_diff(changes)
+        self.assertEqual(actual, desired)
+        self.assertEqual(list(actual.dump(changes_only=True)["properties"]),
+                         ["aclRules"])
+
+    def test_acl_diff_local(self):
+        raw_data = copy.deepcopy(self._response.acl()["value"][0])
+        rule = raw_data["properties"]["aclRules"][0]
+        rule["resourceRef"] = rule["resourceRef"].replace("\n", "")
+        properties = rule["properties"]
+        actual = client.AccessControlLists.from_raw_data(raw_data)
+        desired = client.AccessControlLists(
+            resource_id=actual.resource_id,
+            acl_rules=[client.ACLRules(
+                resource_id=rule["resourceId"],
+                parent_id=actual.resource_id,
+                protocol=properties["protocol"],
+                source_port_range=properties["sourcePortRange"],
+                destination_port_range=properties["destinationPortRange"],
+                action=properties["action"],
+                source_prefix=properties["sourceAddressPrefix"],
+                destination_prefix=properties["destinationAddressPrefix"],
+                priority=properties["priority"],
+                rule_type=properties["type"],
+                logging=properties["logging"])])
+
+        self.assertEqual(desired.diff(actual), [])
+        self.assertEqual(desired, actual)
+
+        desired.acl_rules[0].priority = "300"
+        self.assertEqual(
+            [(change.path, change.new) for change in desired.diff(actual)],
+            [(("acl_rules", rule["resourceId"], "priority"), "300")])
+
+    def _test_raw_data_unchanged(self, model, raw_data):
+        expected = copy.deepcopy(raw_data)
+        for lazy_loading in (False, True):
+            with test_utils.ConfigPatcher("lazy_loading", lazy_loading,
+                                          "HNV"):
+                resource = model.from_raw_data(raw_data,
+                                               parent_id="fake-parent-id")
+            resource.dump()
+            resource.update({"parent_id": "other-parent-id"})
+            for field_name in model._meta.fields:
+                value = getattr(resource, field_name)
+                if isinstance(value, list):
+                    del value[:]
+                elif isinstance(value, dict):
+                    value.clear()
+        self.assertEqual(raw_data, expected)
+
+    def test_raw_data_unchanged(self):
+        for model, resources in (
+                (client.LoadBalancers, self._response.load_balancers()),
+                (client.NetworkInterfaces,
+                 self._response.network_interfaces()),
+                (client.AccessControlLists, self._response.acl()),
+                (client.BGPRouters, self._response.bgp_routers())):
+            for raw_data in resources.get("value", []):
+                self._test_raw_data_unchanged(model, raw_data)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_iter_all_shared_page(self, mock_get_client):
+        page = self._response.load_balancers()
+        expected = copy.deepcopy(page)
+        mock_get_client.return_value.get_resource.return_value = page
+
+        first = list(client.LoadBalancers.iter_all(parent_id="parent-1"))
+        second = list(client.LoadBalancers.iter_all(parent_id="parent-2"))
+
+        self.assertEqual(page, expected)
+        self.assertEqual(set(resource.parent_id for resource in first),
+                         set(["parent-1"]))
+        self.assertEqual(set(resource.parent_id for resource in second),
+                         set(["parent-2"]))
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_crawl(self, mock_get_client):
+        pages = {
+            "/networking/v1/loadBalancers/": self._response.load_balancers(),
+            "/networking/v1/virtualSwitchManager/configuration":
+                exception.NotFound(),
+        }
+
+        def get_page(endpoint):
+            if isinstance(pages[endpoint], Exception):
+                raise pages[endpoint]
+            return pages[endpoint]
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = get_page
+
+        resources = list(client.crawl([client.LoadBalancers,
+                                       client.VirtualSwitchManager]))
+
+        load_balancers = [resource for resource in resources
+                          if isinstance(resource, client.LoadBalancers)]
+        probes = [resource for resource in resources
+                  if isinstance(resource, client.Probes)]
+        self.assertEqual(len(load_balancers), 2)
+        self.assertEqual(
+            sorted(probe.parent_id for probe in probes),
+            sorted(resource.resource_id for resource in load_balancers))
+        self.assertEqual(get_resource.call_count, 2)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_crawl_child_collections(self, mock_get_client):
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = lambda endpoint: (
+            self._response.acl() if endpoint.endswith("Lists/")
+            else {"value": []})
+        info = client._MODELS.get(client.AccessControlLists)
+
+        with mock.patch.dict(client._MODELS._models, {
+                client.AccessControlLists: info._replace(child_fields=())}):
+            resources = list(client.crawl([client.AccessControlLists]))
+
+        self.assertTrue(all(isinstance(resource, client.AccessControlLists)
+                            for resource in resources))
+        endpoints = sorted(call[0][0]
+                           for call in get_resource.call_args_list)
+        expected = ["/networking/v1/accessControlLists/%s/aclRules/" %
+                    resource.resource_id for resource in resources]
+        expected.append("/networking/v1/accessControlLists/")
+        self.assertEqual(endpoints, sorted(expected))
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_crawl_virtual_gateways(self, mock_get_client):
+        gateways = {"value": [{
+            "resourceId": "gateway", "etag": "etag",
+            "resourceRef": "/virtualGateways/gateway",
+            "properties": {
+                "networkConnections":
+                    self._response.network_connections()["value"],
+                "bgpRouters": self._response.bgp_routers()["value"]}}]}
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = lambda endpoint: (
+            gateways if endpoint == "/networking/v1/virtualGateways/"
+            else {"value": []})
+
+        resources = list(client.crawl())
+
+        found = collections.defaultdict(list)
+        for resource in resources:
+            found[type(resource)].append(resource)
+        self.assertEqual(len(found[client.VirtualGateways]), 1)
+        self.assertTrue(found[client.NetworkConnections])
+        self.assertTrue(found[client.BGPRouters])
+        self.assertTrue(found[client.BGPPeers])
+        children = found[client.NetworkConnections]
+        children.extend(found[client.BGPRouters])
+        self.assertTrue(all(resource.parent_id == "gateway"
+                            for resource in children))
+        self.assertTrue(all(peer.grandparent_id == "gateway"
+                            for peer in found[client.BGPPeers]))
+        endpoints = [call[0][0] for call in get_resource.call_args_list]
+        self.assertIn("/networking/v1/virtualGateways/", endpoints)
+        self.assertFalse([endpoint for endpoint in endpoints
+                          if endpoint.startswith(
+                              "/networking/v1/virtualGateways/gateway")])
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_embedded(self, mock_get_client):
+        acl = self._response.acl()["value"][0]
+        acl_id = acl["resourceId"]
+        acl_endpoint = "/networking/v1/accessControlLists/%s" % acl_id
+
+        def _get_resource(endpoint, headers=None):
+            if endpoint != acl_endpoint:
+                return {"value": []}
+            if headers and headers["If-None-Match"] == acl["etag"]:
+                return None
+            return acl
+
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.side_effect = _get_resource
+
+        with client.IdentityMap() as identity_map:
+            rules = client.ACLRules.get(parent_id=acl_id)
+            self.assertEqual(len(rules), len(acl["properties"]["aclRules"]))
+            self.assertTrue(all(rule.parent_id == acl_id for rule in rules))
+
+            # The kept content of the parent is used again.
+            self.assertEqual(client.ACLRules.get(parent_id=acl_id), rules)
+            self.assertEqual(get_resource.call_count, 1)
+
+            # The kept content is revalidated when the parent is refreshed.
+            parent = client.AccessControlLists.get(resource_id=acl_id)
+            parent.refresh()
+            get_resource.assert_called_with(
+                acl_endpoint, headers={"If-None-Match": acl["etag"]})
+            self.assertEqual(parent.etag, acl["etag"])
+
+            acl = copy.deepcopy(acl)
+            acl["etag"] = "new-etag"
+            rule = acl["properties"]["aclRules"][0]
+            rule["etag"] = "new-etag"
+            rule["properties"]["description"] = "hnv-client"
+            self.assertEqual(client.ACLRules.get(parent_id=acl_id), rules)
+            parent.refresh()
+            self.assertEqual(parent.etag, "new-etag")
+            calls = get_resource.call_count
+            rules = client.ACLRules.get(parent_id=acl_id)
+            self.assertEqual(rules[0].description, "hnv-client")
+            self.assertEqual(get_resource.call_count, calls)
+
+            identity_map.discard_ancestors(
+                "/accessControlLists/%s/aclRules/rule" % acl_id)
+            client.ACLRules.get(parent_id=acl_id)
+            get_resource.assert_called_with(acl_endpoint)
+
+        self.assertEqual(client.ACLRules.get(parent_id=acl_id), [])
+        get_resource.assert_called_with(
+            "/networking/v1/accessControlLists/%s/aclRules/" % acl_id)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_embedded_from_parent(self, mock_get_client):
+        network = self._response.virtual_networks()["value"][0]
+        network_id = network["resourceId"]
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.return_value = network
+
+        with client.IdentityMap():
+            client.VirtualNetworks.get(resource_id=network_id)
+            first = client.SubNetworks.get(parent_id=network_id)
+            second = client.SubNetworks.get(parent_id=network_id)
+
+        self.assertEqual(len(first), len(network["properties"]["subnets"]))
+        self.assertEqual(first, second)
+        get_resource.assert_called_once_with(
+            "/networking/v1/virtualNetworks/%s" % network_id)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_embedded_fields_where(self, mock_get_client):
+        acl = self._response.acl()["value"][0]
+        rule = acl["properties"]["aclRules"][0]
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.return_value = acl
+
+        with client.IdentityMap():
+            rules = client.ACLRules.get(
+                parent_id=acl["resourceId"], fields=["protocol"],
+                where={"resourceId": rule["resourceId"]})
+
+        self.assertEqual([resource.resource_id for resource in rules],
+                         [rule["resourceId"]])
+        self.assertEqual(rules[0].protocol, rule["properties"]["protocol"])
+        self.assertFalse(rules[0].is_loaded("description"))
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_where(self, mock_get_client):
+        page = self._response.load_balancers()
+        resource_id = page["value"][1]["resourceId"]
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.return_value = page
+
+        with test_utils.ConfigPatcher("odata_filter", True, "HNV"):
+            resources = client.LoadBalancers.get(
+                where={"resourceId": resource_id})
+
+        self.assertEqual([resource.resource_id for resource in resources],
+                         [resource_id])
+        get_resource.assert_called_once_with(
+            "/networking/v1/loadBalancers/?%%24filter=%%28resourceId+eq+"
+            "%%27%s%%27%%29" % resource_id)
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_where_list_path(self, mock_get_client):
+        page = self._response.load_balancers()
+        resource = page["value"][1]
+        probe_id = resource["properties"]["probes"][0]["resourceId"]
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.return_value = page
+
+        with test_utils.ConfigPatcher("odata_filter", True, "HNV"):
+            resources = client.LoadBalancers.get(where={
+                "resourceId": resource["resourceId"],
+                "properties.probes.resourceId": probe_id})
+
+        self.assertEqual([item.resource_id for item in resources],
+                         [resource["resourceId"]])
+        # Only the predicate on the scalar field is sent to the API.
+        get_resource.assert_called_once_with(
+            "/networking/v1/loadBalancers/?%%24filter=%%28resourceId+eq+"
+            "%%27%s%%27%%29" % resource["resourceId"])
+
+    @mock.patch("hnv.client._BaseHNVModel._get_client")
+    def test_get_resource_where(self, mock_get_client):
+        raw_data = self._response.load_balancers()["value"][0]
+        resource_id = raw_data["resourceId"]
+        get_resource = mock_get_client.return_value.get_resource
+        get_resource.return_value = raw_data
+
+        resource = client.LoadBalancers.get(
+            resource_id=resource_id, where={"resourceId": resource_id})
+        self.assertEqual(resource.resource_id, resource_id)
+        self.assertRaises(exception.NotFound, client.LoadBalancers.get,
+                          resource_id=resource_id,
+                          where={"resourceId": "other"})
+
+        get_resource.return_value = self._response.virtual_switch_manager()
+        self.assertRaises(exception.NotFound,
+                          client.VirtualSwitchManager.get,
+                          where={"resourceId": "other"})
+
     def test_bgp_peers(self):
         resources = self._response.bgp_peers()
         for raw_data in resources.get("value", []):
@@ -400,3 +1213,164 @@ class TestClient(unittest.TestCase):
         raw_data = self._response.load_balancer_manager()
         self._test_get_resource(model=client.LoadBalancerManager,
                                 raw_data=raw_data)
+
+
+class TestRemoveResources(unittest.TestCase):
+
+    _SUBNET = "/virtualNetworks/vnet/subnets/subnet"
+    _IP_CONFIGURATION = "/networkInterfaces/nic/ipConfigurations/ip"
+
+    def setUp(self):
+        # The payloads contain the back-references maintained by the
+        # server, which should not be followed.
+        self._acl = client.AccessControlLists.from_raw_data({
+            "resourceRef": "/accessControlLists/acl",
+            "resourceId": "acl",
+            "properties": {
+                "ipConfigurations": [
+                    {"resourceRef": self._IP_CONFIGURATION}
+                ],
+                "subnets": [{"resourceRef": self._SUBNET}],
+            }
+        })
+        self._vnet = client.VirtualNetworks.from_raw_data({
+            "resourceRef": "/virtualNetworks/vnet",
+            "resourceId": "vnet",
+            "properties": {
+                "subnets": [{
+                    "resourceRef": self._SUBNET,
+                    "resourceId": "subnet",
+                    "properties": {
+                        "accessControlList": {
+                            "resourceRef": "/accessControlLists/acl"
+                        },
+                        "ipConfigurations": [
+                            {"resourceRef": self._IP_CONFIGURATION}
+                        ],
+                    }
+                }]
+            }
+        })
+        self._nic = client.NetworkInterfaces.from_raw_data({
+            "resourceRef": "/networkInterfaces/nic",
+            "resourceId": "nic",
+            "properties": {
+                "ipConfigurations": [{
+                    "resourceRef": self._IP_CONFIGURATION,
+                    "resourceId": "ip",
+                    "properties": {
+                        "subnet": {"resourceRef": self._SUBNET}
+                    }
+                }]
+            }
+        })
+
+    def test_get_references(self):
+        self.assertEqual(client._get_references(self._nic), set([
+            "/networkinterfaces/nic",
+            "/networkinterfaces/nic/ipconfigurations/ip",
+            "/virtualnetworks/vnet/subnets/subnet",
+        ]))
+
+    def test_get_references_back_references(self):
+        self.assertEqual(client._get_references(self._acl),
+                         set(["/accesscontrollists/acl"]))
+
+    def test_get_blockers(self):
+        blockers = client._get_blockers([self._acl, self._vnet, self._nic])
+
+        self.assertEqual(blockers, {
+            "/accesscontrollists/acl": set(["/virtualnetworks/vnet"]),
+            "/virtualnetworks/vnet": set(["/networkinterfaces/nic"]),
+            "/networkinterfaces/nic": set(),
+        })
+
+    def test_get_blockers_children(self):
+        subnet = client.SubNetworks.from_raw_data({
+            "resourceRef": self._SUBNET,
+            "resourceId": "subnet",
+            "parentResourceID": "vnet",
+        })
+
+        blockers = client._get_blockers([self._vnet, subnet])
+
+        self.assertEqual(blockers["/virtualnetworks/vnet"],
+                         set(["/virtualnetworks/vnet/subnets/subnet"]))
+
+    @mock.patch("hnv.client._remove_level")
+    def test_remove_resources(self, mock_remove_level):
+        levels = []
+
+        def _remove_level(executor, resources, wait, timeout):
+            levels.append(resources)
+            return resources, []
+
+        mock_remove_level.side_effect = _remove_level
+
+        client.remove_resources([self._acl, self._vnet, self._nic],
+                                timeout=mock.sentinel.timeout)
+
+        self.assertEqual(levels, [[self._nic], [self._vnet], [self._acl]])
+
+    @mock.patch("hnv.client._remove_level")
+    @mock.patch("hnv.client._get_blockers")
+    def test_remove_resources_circular(self, mock_get_blockers,
+                                       mock_remove_level):
+        mock_get_blockers.return_value = {
+            "/accesscontrollists/acl": set(["/virtualnetworks/vnet"]),
+            "/virtualnetworks/vnet": set(["/networkinterfaces/nic",
+                                          "/accesscontrollists/acl"]),
+            "/networkinterfaces/nic": set(["/accesscontrollists/acl"]),
+        }
+        error = (exception.ServiceException,
+                 exception.ServiceException("in use"), None)
+        mock_remove_level.side_effect = [
+            ([self._acl], []),
+            ([self._nic], []),
+            ([self._vnet], [error]),
+        ]
+
+        client.remove_resources([self._acl, self._vnet, self._nic])
+
+        self.assertEqual(mock_remove_level.call_count, 3)
+
+    @mock.patch("hnv.client._remove_level")
+    def test_remove_resources_failed(self, mock_remove_level):
+        error = (exception.ServiceException,
+                 exception.ServiceException("in use"), None)
+        mock_remove_level.return_value = ([], [error])
+
+        self.assertRaises(exception.ServiceException,
+                          client.remove_resources, [self._acl])
+
+    @mock.patch("time.sleep")
+    @mock.patch("hnv.client._get_provisioning_states")
+    def _test_wait_for_removal(self, mock_get_states, mock_sleep,
+                               states, timeout=None):
+        executor = mock.Mock()
+        executor.submit.side_effect = lambda function, *args: mock.Mock(
+            result=lambda: function(*args))
+        mock_get_states.side_effect = states
+
+        client._wait_for_removal(executor, [self._nic], timeout=timeout)
+
+        self.assertEqual(mock_get_states.call_count, len(states))
+        self.assertEqual(mock_sleep.call_count, len(states) - 1)
+
+    def test_wait_for_removal(self):
+        self._test_wait_for_removal(states=[
+            {"nic": constant.DELETING, "other": constant.SUCCEEDED},
+            {"nic": constant.DELETING, "other": constant.SUCCEEDED},
+            {"other": constant.SUCCEEDED},
+        ])
+
+    def test_wait_for_removal_failed(self):
+        self.assertRaises(exception.ServiceException,
+                          self._test_wait_for_removal,
+                          states=[{"nic": constant.FAILED}])
+
+    def test_wait_for_removal_timeout(self):
+        self.assertRaises(exception.TimeOut,
+                          self._test_wait_for_removal,
+                          states=[{"nic": constant.DELETING}] * 3,
+                          timeout=CONFIG.HNV.retry_interval)
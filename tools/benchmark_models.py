@@ -0,0 +1,312 @@
+# Copyright 2017 Cloudbase Solutions Srl
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Micro-benchmarks for the HNV client models.
+
+The benchmarks are using the fake API responses from the unit tests, so
+the package should be importable (for example after `pip install -e .`):
+
+    python tools/benchmark_models.py [--number NUMBER] [BENCHMARK ...]
+"""
+
+from __future__ import print_function
+
+import argparse
+import copy
+import time
+import timeit
+
+from hnv import client
+from hnv.tests.fake import fake_response
+
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    """Register the received function as a benchmark."""
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def _get_page(resource):
+    """Get a private copy of a page from the fake API responses."""
+    return copy.deepcopy(getattr(fake_response.FakeResponse(), resource)())
+
+
+@benchmark
+def parse_load_balancers():
+    """Create the models for a page of load balancers."""
+    pages = []
+
+    def setup():
+        pages.append(_get_page("load_balancers"))
+
+    def run():
+        for raw_data in pages.pop()["value"]:
+            client.LoadBalancers.from_raw_data(raw_data)
+
+    return setup, run
+
+
+@benchmark
+def parse_load_balancers_lazy():
+    """Create the models for a page of load balancers and read their
+    state, without creating the nested models."""
+    pages = []
+
+    def setup():
+        pages.append(_get_page("load_balancers"))
+
+    def run():
+        states = []
+        for raw_data in pages.pop()["value"]:
+            resource = client.LoadBalancers._load(raw_data, lazy=True)
+            states.append(resource.provisioning_state)
+
+    return setup, run
+
+
+@benchmark
+def parse_fixtures():
+    """Create the models for all the pages from the fake API responses."""
+    resources = (
+        ("logical_networks", client.LogicalNetworks),
+        ("logical_subnets", client.LogicalSubnetworks),
+        ("ip_pools", client.IPPools),
+        ("network_interfaces", client.NetworkInterfaces),
+        ("ip_configurations", client.IPConfiguration),
+        ("virtual_networks", client.VirtualNetworks),
+        ("virtual_subnetworks", client.SubNetworks),
+        ("acl_rules", client.ACLRules),
+        ("acl", client.AccessControlLists),
+        ("routes", client.Routes),
+        ("route_tables", client.RouteTables),
+        ("network_connections", client.NetworkConnections),
+        ("public_ip_addresses", client.PublicIPAddresses),
+        ("backend_address_pools", client.BackendAddressPools),
+        ("frontend_ip_configurations", client.FrontendIPConfigurations),
+        ("inbound_nat_rules", client.InboundNATRules),
+        ("load_balancing_rules", client.LoadBalancingRules),
+        ("outbound_nat_rules", client.OutboundNATRules),
+        ("probes", client.Probes),
+        ("load_balancers", client.LoadBalancers),
+        ("bgp_peers", client.BGPPeers),
+        ("bgp_routers", client.BGPRouters),
+    )
+    pages = [(model_cls, _get_page(resource))
+             for resource, model_cls in resources]
+
+    def setup():
+        pass
+
+    def run():
+        for model_cls, page in pages:
+            for raw_data in page["value"]:
+                model_cls.from_raw_data(raw_data)
+
+    return setup, run
+
+
+@benchmark
+def create_virtual_networks():
+    """Create 100 virtual networks with known resource ids."""
+
+    def setup():
+        pass
+
+    def run():
+        for index in range(100):
+            client.VirtualNetworks(resource_id="vnet-%d" % index,
+                                   subnetworks=[], address_space={})
+
+    return setup, run
+
+
+@benchmark
+def create_probes():
+    """Create 1000 probes for a load balancer, which requires building
+    their resource references."""
+
+    def setup():
+        pass
+
+    def run():
+        for index in range(1000):
+            client.Probes(resource_id="probe-%d" % index, parent_id="lb",
+                          protocol="Tcp", port=80)
+
+    return setup, run
+
+
+def _dump_models(resource, model_cls):
+    """Dump all the models created for a page."""
+    models = [model_cls.from_raw_data(raw_data)
+              for raw_data in _get_page(resource)["value"]]
+
+    def setup():
+        pass
+
+    def run():
+        for model in models:
+            model.dump()
+
+    return setup, run
+
+
+@benchmark
+def dump_load_balancers():
+    """Dump the models for a page of load balancers."""
+    return _dump_models("load_balancers", client.LoadBalancers)
+
+
+@benchmark
+def dump_access_control_lists():
+    """Dump the models for a page of access control lists."""
+    return _dump_models("acl", client.AccessControlLists)
+
+
+@benchmark
+def compare_access_control_lists():
+    """Compare the models for a page of access control lists."""
+    page = _get_page("acl")["value"]
+    desired = [client.AccessControlLists.from_raw_data(raw_data)
+               for raw_data in page]
+    actual = [client.AccessControlLists.from_raw_data(raw_data)
+              for raw_data in page]
+
+    def setup():
+        pass
+
+    def run():
+        for model in desired:
+            for other in actual:
+                model == other  # pylint: disable=pointless-statement
+
+    return setup, run
+
+
+@benchmark
+def compare_read_access_control_lists():
+    """Compare the models for a page of access control lists, after
+    reading their rules."""
+    page = _get_page("acl")["value"]
+    desired = [client.AccessControlLists.from_raw_data(raw_data)
+               for raw_data in page]
+    actual = [client.AccessControlLists.from_raw_data(raw_data)
+              for raw_data in page]
+    for model in desired + actual:
+        model.acl_rules  # pylint: disable=pointless-statement
+
+    def setup():
+        pass
+
+    def run():
+        for model in desired:
+            for other in actual:
+                model == other  # pylint: disable=pointless-statement
+
+    return setup, run
+
+
+@benchmark
+def clone_access_control_lists():
+    """Create 100 variants of an access control list, each of them with
+    one changed rule."""
+    template = client.AccessControlLists.from_raw_data(
+        _get_page("acl")["value"][0])
+
+    def setup():
+        pass
+
+    def run():
+        for index in range(100):
+            variant = template.clone()
+            variant.acl_rules[0].priority = index
+
+    return setup, run
+
+
+class _SlowClient(object):
+
+    """Client which serves the pages of a listing with a fixed latency."""
+
+    def __init__(self, pages, latency):
+        self._pages = pages
+        self._latency = latency
+
+    def get_resource(self, path, headers=None):
+        time.sleep(self._latency)
+        return self._pages[path]
+
+
+def _list_load_balancers(prefetch_depth):
+    """List 4 pages of 20 load balancers each, served with 2 ms of
+    latency for each page."""
+    resources = _get_page("load_balancers")["value"] * 10
+    pages = {}
+    for index in range(4):
+        pages["page-%d" % index] = {"value": resources,
+                                    "nextLink": "page-%d" % (index + 1)}
+    pages["page-3"].pop("nextLink")
+    slow_client = _SlowClient(pages, latency=0.002)
+    get_client = client._BaseHNVModel.__dict__["_get_client"]
+
+    def setup():
+        client._BaseHNVModel._get_client = staticmethod(lambda: slow_client)
+
+    def run():
+        try:
+            list(client.LoadBalancers.iter_all(
+                cursor=("page-0", 0), prefetch_depth=prefetch_depth))
+        finally:
+            client._BaseHNVModel._get_client = get_client
+
+    return setup, run
+
+
+@benchmark
+def list_load_balancers():
+    """List the load balancers, one page after the other."""
+    return _list_load_balancers(prefetch_depth=0)
+
+
+@benchmark
+def list_load_balancers_prefetch():
+    """List the load balancers, while the next page is retrieved in the
+    background."""
+    return _list_load_balancers(prefetch_depth=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=1000,
+                        help="The number of runs for each benchmark.")
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help="The benchmarks to run: %s (default: all)." %
+                        ", ".join(sorted(BENCHMARKS)))
+    args = parser.parse_args()
+
+    for name in args.benchmarks or sorted(BENCHMARKS):
+        setup, run = BENCHMARKS[name]()
+        elapsed = 0
+        for _ in range(args.number):
+            setup()
+            start = timeit.default_timer()
+            run()
+            elapsed += timeit.default_timer() - start
+        print("%-30s %10.2f us" % (name, elapsed / args.number * 10 ** 6))
+
+
+if __name__ == "__main__":
+    main()